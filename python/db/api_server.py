@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Local read-only JSON API over AsyncTipitakaDAL
+A small asyncio HTTP/1.1 server (standard library only). Queries run on the
+async DAL's thread pool, where each worker thread holds its own read-only
+connection; responses are kept in an LRU cache with ETags and served gzipped when accepted
+
+Endpoints (GET/HEAD):
+    /books?basket=&category=             books
+    /tocs/<book_id>                      table of contents of a book
+    /pages/<book_id>/<page>              one page with its text
+    /paragraphs/<book_id>?first_page=&last_page=
+                                         paragraph <-> page mapping of a book
+    /dictionary/<word>                   dictionary entries (inflection tolerant)
+    /commentary/<book_id>/<paragraph>?level=
+                                         aṭṭhakathā/ṭīkā pages of a paragraph
+    /search?q=&book=&limit=&offset=      full-text search
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from http import HTTPStatus
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from async_tipitaka_dal import AsyncTipitakaDAL
+
+# Bodies smaller than this are not worth compressing
+GZIP_MIN_SIZE = 512
+MAX_HEADER_LINES = 100
+
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: Optional[str] = None):
+        super().__init__(message or status.phrase)
+        self.status = status
+        self.message = message or status.phrase
+
+
+class CachedResponse:
+    """A JSON body with its ETag and, once requested, its gzipped form"""
+
+    __slots__ = ('body', 'etag', '_gzipped')
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        self._gzipped = None
+
+    def gzipped(self) -> bytes:
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6)
+        return self._gzipped
+
+
+class ResponseCache:
+    """LRU of CachedResponse by request target (the database is read-only, so entries never go stale)"""
+
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, CachedResponse]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        response = self._entries.get(key)
+        if response is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return response
+
+    def put(self, key: str, response: CachedResponse):
+        self._entries[key] = response
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+def _int_param(query: Dict[str, list], name: str, default=None) -> Optional[int]:
+    values = query.get(name)
+    if not values or values[0] == '':
+        return default
+    try:
+        return int(values[0])
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"{name} must be an integer") from None
+
+
+def _str_param(query: Dict[str, list], name: str) -> Optional[str]:
+    values = query.get(name)
+    return values[0] if values and values[0] != '' else None
+
+
+def _records(items) -> list:
+    return [item._asdict() for item in items]
+
+
+class TipitakaAPI:
+    """Routes a request target to a DAL call and returns JSON-serializable data"""
+
+    def __init__(self, dal: AsyncTipitakaDAL):
+        self.dal = dal
+
+    async def handle(self, target: str):
+        parts = urlsplit(target)
+        segments = [unquote(segment) for segment in parts.path.strip('/').split('/') if segment]
+        query = parse_qs(parts.query)
+        if not segments:
+            raise HTTPError(HTTPStatus.NOT_FOUND)
+        route, args = segments[0], segments[1:]
+
+        if route == 'books' and not args:
+            return _records(await self.dal.get_books(_str_param(query, 'basket'), _str_param(query, 'category')))
+        if route == 'tocs' and len(args) == 1:
+            return _records(await self.dal.get_tocs(args[0]))
+        if route == 'pages' and len(args) == 2:
+            page = await self.dal.get_page(args[0], _int_param({'page': [args[1]]}, 'page'))
+            if page is None:
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"No page {args[1]} in {args[0]}")
+            return page._asdict()
+        if route == 'paragraphs' and len(args) == 1:
+            return _records(await self.dal.get_paragraphs(
+                args[0], _int_param(query, 'first_page'), _int_param(query, 'last_page')
+            ))
+        if route == 'dictionary' and len(args) == 1:
+            return _records(await self.dal.lookup_word(args[0]))
+        if route == 'commentary' and len(args) == 2:
+            paragraph = _int_param({'paragraph': [args[1]]}, 'paragraph')
+            try:
+                refs = await self.dal.commentary_pages(args[0], paragraph, _int_param(query, 'level'))
+            except FileNotFoundError as e:
+                raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, str(e)) from None
+            return _records(refs)
+        if route == 'search' and not args:
+            text = _str_param(query, 'q')
+            if not text:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "q is required")
+            offset = _int_param(query, 'offset', 0)
+            if offset < 0:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "offset must not be negative")
+            # SQLite reads a negative LIMIT as no limit
+            limit = max(1, min(_int_param(query, 'limit', 20), 100))
+            try:
+                hits = await self.dal.search(text, _str_param(query, 'book'), limit, offset)
+            except FileNotFoundError as e:
+                raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, str(e)) from None
+            return _records(hits)
+        raise HTTPError(HTTPStatus.NOT_FOUND)
+
+
+class APIServer:
+    """asyncio HTTP/1.1 server with keep-alive, ETags, gzip and an LRU response cache"""
+
+    def __init__(self, dal: AsyncTipitakaDAL, cache_entries=2048):
+        self.api = TipitakaAPI(dal)
+        self.cache = ResponseCache(cache_entries)
+        self.requests = 0
+
+    async def _response_for(self, target: str) -> CachedResponse:
+        response = self.cache.get(target)
+        if response is None:
+            data = await self.api.handle(target)
+            response = CachedResponse(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+            self.cache.put(target, response)
+        return response
+
+    async def _read_request(self, reader) -> Optional[Tuple[str, str, str, Dict[str, str]]]:
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode('latin-1').split()
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST) from None
+        headers = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        else:
+            raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+        return method, target, version, headers
+
+    @staticmethod
+    def _write(writer, status: HTTPStatus, headers: Dict[str, str], body: bytes = b''):
+        lines = [f"HTTP/1.1 {status.value} {status.phrase}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as e:
+                    self._write_error(writer, e, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, target, version, headers = request
+                # Request bodies are never read, so the next request could not be found after one
+                has_body = 'transfer-encoding' in headers or headers.get('content-length', '0') != '0'
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              and version == 'HTTP/1.1' and not has_body)
+                await self._serve(writer, method, target, headers, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _write_error(self, writer, error: HTTPError, keep_alive: bool):
+        body = json.dumps({'error': error.message}, ensure_ascii=False).encode('utf-8')
+        self._write(writer, error.status, {
+            'Content-Type': 'application/json; charset=utf-8',
+            'Content-Length': str(len(body)),
+            'Connection': 'keep-alive' if keep_alive else 'close',
+        }, body)
+
+    async def _serve(self, writer, method, target, headers, keep_alive):
+        self.requests += 1
+        if method not in ('GET', 'HEAD'):
+            self._write_error(writer, HTTPError(HTTPStatus.METHOD_NOT_ALLOWED), keep_alive)
+            return
+        try:
+            response = await self._response_for(target)
+        except HTTPError as e:
+            self._write_error(writer, e, keep_alive)
+            return
+        except Exception as e:
+            self._write_error(writer, HTTPError(HTTPStatus.INTERNAL_SERVER_ERROR, str(e)), keep_alive)
+            return
+
+        common = {
+            'ETag': response.etag,
+            'Cache-Control': 'public, max-age=3600',
+            'Access-Control-Allow-Origin': '*',
+            'Vary': 'Accept-Encoding',
+            'Connection': 'keep-alive' if keep_alive else 'close',
+        }
+        if response.etag in [tag.strip() for tag in headers.get('if-none-match', '').split(',')]:
+            self._write(writer, HTTPStatus.NOT_MODIFIED, common)
+            return
+
+        body = response.body
+        common['Content-Type'] = 'application/json; charset=utf-8'
+        if len(body) >= GZIP_MIN_SIZE and 'gzip' in headers.get('accept-encoding', ''):
+            body = response.gzipped()
+            common['Content-Encoding'] = 'gzip'
+        common['Content-Length'] = str(len(body))
+        self._write(writer, HTTPStatus.OK, common, b'' if method == 'HEAD' else body)
+
+    async def serve(self, host='127.0.0.1', port=8765):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Tipitaka API listening on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the Tipitaka database as a local read-only JSON API.')
+    parser.add_argument('--db', help='Path to the SQLite database')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Port (default: 8765)')
+    parser.add_argument('--workers', type=int, default=min(8, (os.cpu_count() or 1) * 2),
+                        help='Query threads, each with its own read-only connection')
+    parser.add_argument('--cache-entries', type=int, default=2048, help='Responses kept in the LRU cache')
+    args = parser.parse_args()
+
+    dal = AsyncTipitakaDAL(args.db, max_workers=args.workers)
+    server = APIServer(dal, args.cache_entries)
+
+    async def run():
+        try:
+            await server.serve(args.host, args.port)
+        finally:
+            await dal.close()
+
+    started = time.time()
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        hits, misses = server.cache.hits, server.cache.misses
+        print(f"\nServed {server.requests:,} requests in {time.time() - started:.0f}s "
+              f"(cache hit rate {hits / max(hits + misses, 1):.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Async access layer over TipitakaDAL
+Queries run on a bounded thread pool; every worker thread uses its own
+read-only connection (TipitakaDAL.readers), so concurrent lookups neither block
+the event loop nor share an sqlite3 handle
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+
+from tipitaka_dal import TipitakaDAL
+from tipitaka_repository import Book, Page, Paragraph, TocEntry
+
+
+class AsyncTipitakaDAL:
+    """
+    Awaitable equivalents of the TipitakaDAL read API
+    """
+
+    def __init__(self, db_path=None, max_workers=None, read_only=True):
+        """
+        Args:
+            db_path (str): Path to the SQLite database file
+            max_workers (int): Size of the query thread pool (= number of open connections)
+            read_only (bool): Apply the read-only profile, as in TipitakaDAL
+        """
+        self.dal = TipitakaDAL(db_path, read_only=read_only)
+        self.max_workers = max_workers or min(8, (os.cpu_count() or 1) * 2)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='tipitaka-dal')
+        self._dictionary_lock = None
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def connect(self):
+        """
+        Define the pyDAL models (_define_models); only needed for bulk_select
+        """
+        return await self._run(self.dal.connect)
+
+    async def get_books(self, basket=None, category=None) -> List[Book]:
+        return await self._run(self.dal.get_books, basket, category)
+
+    async def get_tocs(self, book_id) -> List[TocEntry]:
+        return await self._run(self.dal.get_tocs, book_id)
+
+    async def get_page(self, book_id, page) -> Optional[Page]:
+        return await self._run(self.dal.get_page, book_id, page)
+
+    async def get_pages_by_book(self, book_id, limit=None) -> List[Page]:
+        """All pages of a book in page order, as a list"""
+        return await self._run(lambda: list(self.dal.get_pages_by_book(book_id, limit=limit)))
+
+    async def iter_pages(self, book_id=None, batch_size=500, limit=None) -> AsyncIterator[Page]:
+        """
+        Stream pages like TipitakaDAL.iter_pages
+
+        The scan runs in one worker thread (its connection stays on that
+        thread) and hands batches over through a bounded queue.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=2)
+        done = object()
+        cancelled = False
+
+        def scan():
+            batch = []
+            try:
+                for page in self.dal.iter_pages(book_id, batch_size, limit):
+                    if cancelled:
+                        return
+                    batch.append(page)
+                    if len(batch) >= batch_size:
+                        asyncio.run_coroutine_threadsafe(queue.put(batch), loop).result()
+                        batch = []
+                if batch:
+                    asyncio.run_coroutine_threadsafe(queue.put(batch), loop).result()
+            except Exception as e:
+                asyncio.run_coroutine_threadsafe(queue.put(e), loop).result()
+            finally:
+                asyncio.run_coroutine_threadsafe(queue.put(done), loop).result()
+
+        scanner = loop.run_in_executor(self._executor, scan)
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                for page in item:
+                    yield page
+        finally:
+            cancelled = True
+            # Unblock a scanner waiting on a full queue, then let it finish
+            while not scanner.done():
+                while not queue.empty():
+                    queue.get_nowait()
+                await asyncio.sleep(0)
+            await scanner
+
+    async def get_paragraphs(self, book_id, first_page=None, last_page=None) -> List[Paragraph]:
+        return await self._run(self.dal.get_paragraphs, book_id, first_page, last_page)
+
+    async def search(self, query, book=None, limit=20, offset=0, column=None, raw=False):
+        return await self._run(self.dal.search, query, book, limit, offset, column, raw)
+
+    async def commentary_pages(self, book_id, paragraph, level=None):
+        return await self._run(self.dal.commentary_pages, book_id, paragraph, level)
+
+    async def bulk_select(self, table_name, fields=None, where=None, params=(), orderby=None, as_numpy=False):
+        if self.dal.db is None:
+            await self.connect()
+        return await self._run(self.dal.bulk_select, table_name, fields, where, params, orderby, as_numpy)
+
+    async def _dictionary(self):
+        """The DAL's DictionaryLookup, created (and its index built) by one thread only"""
+        if self.dal._dictionary is None:
+            if self._dictionary_lock is None:
+                self._dictionary_lock = asyncio.Lock()
+            async with self._dictionary_lock:
+                await self._run(lambda: self.dal.dictionary)
+        return self.dal.dictionary
+
+    async def lookup_word(self, word, inflected=True):
+        """Dictionary entries of one word (inflection tolerant unless inflected=False)"""
+        dictionary = await self._dictionary()
+        return await self._run(dictionary.lookup_inflected if inflected else dictionary.lookup, word)
+
+    async def lookup_words(self, words: Iterable[str], inflected=True) -> Dict[str, list]:
+        """
+        Dictionary entries for many words at once, e.g. every word on a page
+
+        Duplicates are looked up once; lookups run concurrently on the pool.
+        """
+        unique = list(dict.fromkeys(words))
+        await self._dictionary()
+        results = await asyncio.gather(*[self.lookup_word(word, inflected) for word in unique])
+        return dict(zip(unique, results))
+
+    async def close(self):
+        """Wait for running queries, then close every connection"""
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown, True)
+        self.dal.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
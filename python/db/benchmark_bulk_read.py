@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Benchmark pyDAL select() against TipitakaDAL.bulk_select on the same table
+Reports wall time and peak Python allocations (tracemalloc) for each path
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from tipitaka_dal import TipitakaDAL
+
+
+def measure(label, func):
+    """Run func once, printing elapsed time, peak traced memory and row count"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    count = len(next(iter(result.values()))) if isinstance(result, dict) else len(result)
+    print(f"  {label:<22} {elapsed:8.3f}s  peak {peak / (1024 * 1024):8.1f} MB  rows {count:,}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare pyDAL select() with the raw sqlite3 bulk path.')
+    parser.add_argument('--table', default='paragraphs',
+                        help='Table to read (default: paragraphs)')
+    parser.add_argument('--fields',
+                        help='Comma-separated columns (default: all defined fields)')
+    parser.add_argument('--numpy', action='store_true',
+                        help='Also measure bulk_select(as_numpy=True)')
+    parser.add_argument('--db', help='Path to the SQLite database')
+    args = parser.parse_args()
+
+    with TipitakaDAL(args.db) as dal:
+        db = dal.db
+        table = db[args.table]
+        fields = [name.strip() for name in args.fields.split(',')] if args.fields else list(table.fields)
+
+        print(f"Reading {args.table} ({', '.join(fields)})")
+        pydal_time = measure('pyDAL select()', lambda: db(table).select(*[table[name] for name in fields]))
+        raw_time = measure('bulk_select()', lambda: dal.bulk_select(args.table, fields))
+        if args.numpy:
+            measure('bulk_select(numpy)', lambda: dal.bulk_select(args.table, fields, as_numpy=True))
+        if raw_time > 0:
+            print(f"  Speedup: {pydal_time / raw_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
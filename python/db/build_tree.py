@@ -1,7 +1,11 @@
+import concurrent.futures
 import shutil
+import time
+import tracemalloc
 from pathlib import Path
-from tipitaka_dal import TipitakaDAL
-from aksharamukha import transliterate
+from query_cache import QueryCache, default_cache_path
+from tipitaka_repository import TipitakaRepository, peak_memory_mb
+from transliteration_service import TransliterationService
 import json
 
 
@@ -14,13 +18,23 @@ class TipitakaBuilder:
     structured Markdown files for Astro Starlight documentation.
     """
     
-    def __init__(self):
-        """Initialize the builder with configuration and database connection."""
-        self.dal = None
-        self.db = None
+    def __init__(self, persist_query_cache=False):
+        """
+        Initialize the builder with configuration and database connection.
+        
+        Args:
+            persist_query_cache: Keep metadata query results on disk so re-runs skip the queries
+        """
+        self.persist_query_cache = persist_query_cache
+        self.query_cache = None
+        self.repository = None
+        self.tocs_by_book = None
         self.sidebar_data = {}
         self._setup_configuration()
         self._setup_paths()
+        self.transliteration = TransliterationService(
+            self.transliteration_config, cache_path=self.db_path / "transliteration_cache.json"
+        )
         
     def _setup_configuration(self):
         """Configure script codes, transliteration mappings, and directory structure."""
@@ -119,16 +133,17 @@ page: {page}
         self.db_path = self.project_root / "python" / "db"
 
     def connect_database(self):
-        """Establish database connection and load data."""
-        self.dal = TipitakaDAL()
-        self.dal.connect()
-        self.db = self.dal.db
+        """
+        Establish database connection.
         
-        # Load all required data from database
-        self.category_data = self.db(self.db.category).select()
-        self.books_data = self.db(self.db.books).select()
-        self.tocs_data = self.db(self.db.tocs).select()
-        self.pages_data = self.db(self.db.pages).select()
+        Nothing is loaded up front; each stage asks the repository for the rows it needs.
+        """
+        self.repository = TipitakaRepository()
+        if self.persist_query_cache:
+            self.query_cache = QueryCache(self.repository.db_path,
+                                          disk_path=default_cache_path(self.repository.db_path))
+            self.repository.query_cache = self.query_cache
+        self.repository.connect()
 
     def convert_text_with_aksharamukha(self, text, original_script, target_script):
         """
@@ -145,6 +160,8 @@ page: {page}
         if not text or not isinstance(text, str) or text.strip() == "":
             return text
         
+        from aksharamukha import transliterate
+        
         try:
             converted = transliterate.process(original_script, target_script, text)
             return converted
@@ -185,9 +202,9 @@ page: {page}
         Returns:
             List of TOC entries ordered by page number
         """
-        return self.db(self.db.tocs.book_id == book_id).select(
-            orderby=self.db.tocs.page_number
-        )
+        if self.tocs_by_book is not None:
+            return self.tocs_by_book.get(book_id, [])
+        return self.repository.get_book_tocs(book_id)
 
     def get_transliteration_config(self, script_code):
         """
@@ -199,8 +216,20 @@ page: {page}
         Returns:
             Transliteration configuration dictionary or None
         """
-        return next((config for config in self.transliteration_config 
-                    if config['code'] == script_code), None)
+        return self.transliteration.get_config(script_code)
+
+    def transliterate(self, text, script_code):
+        """
+        Convert Burmese text to a target script with corrections applied (memoized).
+        
+        Args:
+            text: Text to convert
+            script_code: Target script code
+            
+        Returns:
+            Converted text, or the original text for mymr
+        """
+        return self.transliteration.convert(text, script_code)
 
     def determine_book_path(self, book_abbr, script_code, category):
         """
@@ -286,12 +315,11 @@ page: {page}
         
         return structure
 
-    def create_hierarchical_files(self, structure, book_path, book_abbr, script_code):
+    def plan_hierarchical_files(self, structure, book_path, book_abbr, script_code):
         """
-        Create files and directories based on hierarchical structure.
+        Compute the files and directories for a book without touching the disk.
         Each TOC item becomes a directory with an index.md file inside, except for the final level
-        which becomes a .md file directly.
-        Returns the link for the book's root file.
+        which becomes a .md file directly. When two items map to the same file, the first one wins.
 
         Args:
             structure: Hierarchical structure from build_hierarchical_structure
@@ -300,14 +328,13 @@ page: {page}
             script_code: Target script code
         
         Returns:
-            str: link to the book's main page
+            tuple: (directories in creation order, {file path: content}, link to the book's main page)
         """
         book_link = None
-        # Ensure book path exists
-        book_path.mkdir(parents=True, exist_ok=True)
+        directories = {book_path: None}
+        files = {}
         
         for i, item in enumerate(structure):
-            toc = item['toc']
             path_parts = item['path']
             
             if not path_parts:
@@ -317,92 +344,198 @@ page: {page}
             current_dir = book_path
             parent_names = []
             
-            # Create directories for all path parts except the last one
             for j, path_part in enumerate(path_parts):
                 dir_name = str(path_part['counter'])
                 is_final_level = (j == len(path_parts) - 1)
                 
                 # Convert text if needed for this path part
-                converted_name = path_part['name']
-                if script_code != 'mymr':
-                    trans_config = self.get_transliteration_config(script_code)
-                    if trans_config:
-                        converted_name = self.convert_text_with_aksharamukha(
-                            path_part['name'], trans_config['from'], trans_config['to']
-                        )
-                        converted_name = self.apply_text_corrections(converted_name, trans_config['correction'])
+                converted_name = self.transliterate(path_part['name'], script_code)
 
                 if is_final_level:
-                    # For the final level, create a .md file directly
-                    md_file = current_dir / f"{dir_name}.md"
-                    
-                    # Only create .md file if it doesn't exist (avoid overwriting)
-                    if not md_file.exists():
-                        # Prepare parent information
-                        parent_info = ' > '.join(parent_names) if parent_names else book_abbr
-                        
-                        # Write .md file
-                        try:
-                            with open(md_file, 'w', encoding='utf-8') as f:
-                                f.write(self.content_template.format(
-                                    name=converted_name,
-                                    order=path_part['counter'],
-                                    parent=parent_info,
-                                    page=path_part['page']
-                                ))
-                        except Exception as e:
-                            print(f"Error creating file {md_file}: {e}")
-                            print(f"Directory exists: {current_dir.exists()}")
-                            print(f"Parent directory: {current_dir}")
-                            raise
-                    
+                    # For the final level, a .md file directly
+                    target_file = current_dir / f"{dir_name}.md"
                     if book_link is None:
                         book_link = str(Path(book_path.relative_to(self.src_dir) / f"{dir_name}.md"))
                 else:
-                    # For non-final levels, create directory and index.md as before
+                    # For non-final levels, a directory with an index.md
                     current_dir = current_dir / dir_name
-                    
-                    # Create the directory
-                    current_dir.mkdir(parents=True, exist_ok=True)
-
-                    # Create index.md file in this directory
-                    index_file = current_dir / "index.md"
-                    
-                    # Only create index.md if it doesn't exist (avoid overwriting)
-                    if not index_file.exists():
-                        # Prepare parent information
-                        parent_info = ' > '.join(parent_names) if parent_names else book_abbr
-                        
-                        # Write index.md file
-                        try:
-                            with open(index_file, 'w', encoding='utf-8') as f:
-                                f.write(self.content_template.format(
-                                    name=converted_name,
-                                    order=path_part['counter'],
-                                    parent=parent_info,
-                                    page=path_part['page']
-                                ))
-                        except Exception as e:
-                            print(f"Error creating file {index_file}: {e}")
-                            print(f"Directory exists: {current_dir.exists()}")
-                            print(f"Parent directory: {current_dir}")
-                            raise
-                    
-                    # Add this name to parent names for next level
-                    parent_names.append(converted_name)
-                    
+                    directories[current_dir] = None
+                    target_file = current_dir / "index.md"
                     if book_link is None:
                         book_link = str(Path(book_path.relative_to(self.src_dir) / f"{dir_name}"))
 
+                # Only the first item for a file is kept (avoid overwriting)
+                if target_file not in files:
+                    parent_info = ' > '.join(parent_names) if parent_names else book_abbr
+                    files[target_file] = self.content_template.format(
+                        name=converted_name,
+                        order=path_part['counter'],
+                        parent=parent_info,
+                        page=path_part['page']
+                    )
+
+                if not is_final_level:
+                    # Add this name to parent names for next level
+                    parent_names.append(converted_name)
+
+        return list(directories), files, book_link
+
+    def _write_file(self, path, content):
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(content)
+        except Exception as e:
+            print(f"Error creating file {path}: {e}")
+            print(f"Directory exists: {path.parent.exists()}")
+            print(f"Parent directory: {path.parent}")
+            raise
+
+    def create_hierarchical_files(self, structure, book_path, book_abbr, script_code):
+        """
+        Create files and directories based on hierarchical structure (see plan_hierarchical_files).
+        Existing files are not overwritten.
+        Returns the link for the book's root file.
+
+        Args:
+            structure: Hierarchical structure from build_hierarchical_structure
+            book_path: Base path for the book
+            book_abbr: Book abbreviation
+            script_code: Target script code
+        
+        Returns:
+            str: link to the book's main page
+        """
+        directories, files, book_link = self.plan_hierarchical_files(structure, book_path, book_abbr, script_code)
+        self._create_planned_files(directories, files)
         return book_link
 
-    def build_content_and_sidebar(self, max_level=None):
+    def _create_planned_files(self, directories, files):
+        """Create planned directories and files that do not exist yet; returns the number written."""
+        written = 0
+        for directory in directories:
+            directory.mkdir(parents=True, exist_ok=True)
+        for path, content in files.items():
+            if not path.exists():
+                self._write_file(path, content)
+                written += 1
+        return written
+
+    def sync_hierarchical_files(self, structure, book_path, book_abbr, script_code):
         """
-        Process all books and scripts in one loop to create files and sidebar data.
+        Bring a book directory in line with the planned files in place.
+        Only new or changed files are written and only stale files are deleted,
+        so unchanged files keep their modification time.
+
+        Returns:
+            tuple: (link to the book's main page, counts of created/updated/unchanged/deleted files)
+        """
+        directories, files, book_link = self.plan_hierarchical_files(structure, book_path, book_abbr, script_code)
+        counts = {'created': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0}
+        
+        existing_files = set()
+        existing_dirs = set()
+        if book_path.exists():
+            for path in book_path.rglob('*'):
+                (existing_dirs if path.is_dir() else existing_files).add(path)
+        
+        for directory in directories:
+            directory.mkdir(parents=True, exist_ok=True)
+        
+        for path, content in files.items():
+            if path in existing_files:
+                with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                    if f.read() == content:
+                        counts['unchanged'] += 1
+                        continue
+                counts['updated'] += 1
+            else:
+                counts['created'] += 1
+            self._write_file(path, content)
+        
+        for path in existing_files - files.keys():
+            path.unlink()
+            counts['deleted'] += 1
+        
+        # Remove directories that are no longer planned, deepest first
+        wanted_dirs = set(directories)
+        for directory in sorted(existing_dirs - wanted_dirs, key=lambda p: len(p.parts), reverse=True):
+            if not any(directory.iterdir()):
+                directory.rmdir()
+        
+        return book_link, counts
+
+    def build_book_for_script(self, book, script_code, structure, book_translations, max_level=None,
+                              sync=False):
         """
-        mula_books = self.db(self.db.books.basket == 'mula').select()
+        Generate one book's files for one script.
+        
+        Args:
+            book: Book record
+            script_code: Target script code
+            structure: Hierarchical structure from build_hierarchical_structure
+            book_translations: Book name per language code for the sidebar
+            max_level: Maximum hierarchy level (see build)
+            sync: Update the book directory in place instead of deleting and rewriting it
+            
+        Returns:
+            tuple: (sidebar item for the book in this script, file counts)
+        """
+        # Convert book name and abbreviation
+        converted_book_name = self.transliterate(book.name, script_code)
+        converted_book_abbr = self.transliterate(book.abbr, script_code)
+        
+        # Determine base book path
+        book_path = self.determine_book_path(converted_book_abbr, script_code, book.category)
+
+        if sync:
+            book_link, counts = self.sync_hierarchical_files(structure, book_path, converted_book_abbr, script_code)
+        else:
+            # Remove old files if they exist
+            if book_path.exists():
+                shutil.rmtree(book_path)
+            
+            # Create files and directories and get the link
+            directories, files, book_link = self.plan_hierarchical_files(
+                structure, book_path, converted_book_abbr, script_code
+            )
+            counts = {'created': self._create_planned_files(directories, files)}
+
+        # Sidebar data for the current script
+        book_item = {
+            'label': converted_book_name,
+            'collapsed': True,
+            'translations': dict(book_translations),
+        }
+
+        # Use autogenerate instead of link to ensure all files in the directory are included
+        if max_level is not None and max_level >= 0:
+            # Remove script_code from path to exclude locale (e.g., romn/)
+            relative_path = book_path.relative_to(self.src_dir / script_code)
+            book_item['autogenerate'] = { 'directory': str(relative_path).replace("\\", "/") }
+        else:
+            book_item['items'] = []
+
+        return book_item, counts
+
+    def build_content_and_sidebar(self, max_level=None, jobs=1, sync=False):
+        """
+        Process all books and scripts to create files and sidebar data.
+        
+        With jobs > 1, file generation for each (book, script) pair runs in a
+        process pool and the sidebar fragments are merged in book/script order.
+        With sync, book directories are updated in place (see sync_hierarchical_files).
+        """
+        mula_books = self.repository.get_books(basket='mula')
         total_books = len(mula_books)
         
+        # One ordered query for every book's TOC instead of one query per book
+        self.tocs_by_book = self.repository.get_tocs_by_book(basket='mula')
+        
+        # Convert every distinct book and TOC name once per script, in batches
+        names = [text for book in mula_books for text in (book.name, book.abbr)]
+        names += [toc.name for tocs in self.tocs_by_book.values() for toc in tocs]
+        self.transliteration.prefetch(names, self.script_codes)
+        
         print(f"Processing {total_books} mula books across all scripts...")
         
         # Prepare a nested dictionary to hold sidebar data for each script
@@ -435,6 +568,18 @@ page: {page}
                 'ku': {'label': self.sutta_subdivision_info['ku']['label'], 'translations': self.sutta_subdivision_info['ku']['translations'], 'collapsed': True, 'items': []},
             }
 
+        file_counts = {'created': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0}
+
+        def add_book_item(book, script_code, result):
+            book_item, counts = result
+            for key, value in counts.items():
+                file_counts[key] += value
+            if book.category in self.sutta_subdivisions:
+                sutta_subdivision_map_by_script[script_code][book.category]['items'].append(book_item)
+            else:
+                subsection_map_by_script[script_code][book.category]['items'].append(book_item)
+
+        tasks = []
         for book_idx, book in enumerate(mula_books, 1):
             print(f"\n[{book_idx}/{total_books}] Processing book: {book.name} (ID: {book.id})")
             
@@ -447,70 +592,43 @@ page: {page}
                 print(f"  └─ No TOC entries found for book {book.id}, skipping...")
                 continue
 
+            # The TOC structure does not depend on the script, so build it once per book
+            structure = self.build_hierarchical_structure(book_tocs, book.abbr, None, max_level)
+
+            # Book name translations are the same for every script's sidebar item
+            book_translations = {
+                self.language_codes[code]: self.transliterate(book.name, code)
+                for code in self.script_codes
+            }
+
             for script_idx, script_code in enumerate(self.script_codes, 1):
+                if jobs > 1:
+                    tasks.append((book, script_code, structure, book_translations))
+                    continue
+
                 # Only create directories and files if there are TOCs to process
                 print(f"    [{script_idx}/{len(self.script_codes)}] Converting to {script_code.upper()} script...", end=" ")
-
-                # Convert book name and abbreviation
-                trans_config = self.get_transliteration_config(script_code)
-                converted_book_name = book.name
-                converted_book_abbr = book.abbr
-                if trans_config:
-                    converted_book_name = self.convert_text_with_aksharamukha(
-                        book.name, trans_config['from'], trans_config['to']
-                    )
-                    converted_book_name = self.apply_text_corrections(converted_book_name, trans_config['correction'])
-                    converted_book_abbr = self.convert_text_with_aksharamukha(
-                        book.abbr, trans_config['from'], trans_config['to']
-                    )
-                    converted_book_abbr = self.apply_text_corrections(converted_book_abbr, trans_config['correction'])
-                
-                # Determine base book path
-                book_path = self.determine_book_path(converted_book_abbr, script_code, book.category)
-
-                # Remove old files if they exist
-                if book_path.exists():
-                    shutil.rmtree(book_path)
-                
-                # Build hierarchical structure with max_level
-                structure = self.build_hierarchical_structure(book_tocs, converted_book_abbr, script_code, max_level)
-                
-                # Create files and directories and get the link
-                book_link = self.create_hierarchical_files(structure, book_path, converted_book_abbr, script_code)
-
-                # Append to sidebar data for the current script
-                book_item = {
-                    'label': converted_book_name,
-                    'collapsed': True,
-                    'translations': {},
-                }
-                
-                # Get translations for book name (all scripts for one book_item)
-                for code in self.script_codes:
-                    lang_code = self.language_codes[code]
-                    if code == 'mymr':
-                        book_item['translations'][lang_code] = book.name
-                    else:
-                        trans_config_temp = self.get_transliteration_config(code)
-                        if trans_config_temp:
-                            converted_name = self.convert_text_with_aksharamukha(book.name, trans_config_temp['from'], trans_config_temp['to'])
-                            book_item['translations'][lang_code] = self.apply_text_corrections(converted_name, trans_config_temp['correction'])
-
-                # Use autogenerate instead of link to ensure all files in the directory are included
-                if max_level is not None and max_level >= 0:
-                    # Remove script_code from path to exclude locale (e.g., romn/)
-                    relative_path = book_path.relative_to(self.src_dir / script_code)
-                    book_item['autogenerate'] = { 'directory': str(relative_path).replace("\\", "/") }
-                else:
-                    book_item['items'] = []
-                    
-                if book.category in self.sutta_subdivisions:
-                    sutta_subdivision_map_by_script[script_code][book.category]['items'].append(book_item)
-                else:
-                    subsection_map_by_script[script_code][book.category]['items'].append(book_item)
-                
+                result = self.build_book_for_script(book, script_code, structure, book_translations, max_level, sync)
+                add_book_item(book, script_code, result)
                 print("✓ Complete")
 
+        if tasks:
+            print(f"\nGenerating {len(tasks)} book/script outputs with {jobs} processes...")
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=jobs,
+                initializer=_init_build_worker,
+                initargs=(self.transliteration.snapshot(),)
+            ) as executor:
+                futures = [
+                    executor.submit(_build_book_for_script_worker, book, script_code, structure,
+                                    book_translations, max_level, sync)
+                    for book, script_code, structure, book_translations in tasks
+                ]
+                # Merge sidebar fragments in submission order so navigate.js is deterministic
+                for (book, script_code, _, _), future in zip(tasks, futures):
+                    add_book_item(book, script_code, future.result())
+                    print(f"  ✓ {book.name} [{script_code.upper()}]")
+
         # Now, assemble the final sidebar structure for all locales
         for script_code in self.script_codes:
             for subsection_code in self.subsections:
@@ -527,6 +645,11 @@ page: {page}
                         self.sidebar_data[script_code]['items'].append(subsection_map_by_script[script_code][subsection_code])
 
         print(f"\nAll {total_books} books processed successfully across {len(self.script_codes)} scripts!")
+        if sync:
+            print(f"Files: {file_counts['created']} created, {file_counts['updated']} updated, "
+                  f"{file_counts['unchanged']} unchanged, {file_counts['deleted']} deleted")
+        else:
+            print(f"Files: {file_counts['created']} written")
 
     def _write_navigation_file(self):
         """
@@ -548,7 +671,7 @@ page: {page}
         
         print(f"Navigation data successfully written to {output_path}")
 
-    def build(self, max_level=None):
+    def build(self, max_level=None, jobs=1, sync=False):
         """
         Main build process - execute all steps to generate documentation files.
         
@@ -560,21 +683,62 @@ page: {page}
         Args:
             max_level: Maximum level to include in the hierarchy (0=chapter, 1=title, etc.)
                      None means include all levels
+            jobs: Number of processes generating per-script output
+            sync: Update existing output in place, writing only new or changed files
         """
         self.max_level = max_level
         print("Starting Tipitaka documentation build process...")
         
-        print("Connecting to database...")
-        self.connect_database()
-        
-        print("Processing books, generating files, and building navigation data...")
-        self.build_content_and_sidebar(max_level)
-        
-        print("Generating navigation file...")
-        self._write_navigation_file()
+        try:
+            print("Connecting to database...")
+            self._run_stage("connect", self.connect_database)
+            
+            print("Processing books, generating files, and building navigation data...")
+            self._run_stage("content", self.build_content_and_sidebar, max_level, jobs, sync)
+            
+            print("Generating navigation file...")
+            self._run_stage("navigation", self._write_navigation_file)
+        finally:
+            if self.repository:
+                self.repository.close()
+            if self.query_cache:
+                self.query_cache.close()
+            self.transliteration.save()
+        
+        stats = self.transliteration.stats
+        print(f"Transliteration: {stats['converted']} converted in {stats['calls']} calls, "
+              f"{stats['hits']} cache hits")
+        if self.query_cache:
+            query_stats = self.query_cache.stats()
+            print(f"Query cache: {query_stats['hits']} memory hits, {query_stats['disk_hits']} disk hits, "
+                  f"{query_stats['misses']} misses ({query_stats['hit_rate']:.0%} hit rate)")
         
         print("Build process completed successfully!")
 
+    def _run_stage(self, name, func, *args):
+        """Run one build stage and report its time and the peak memory so far."""
+        started = time.time()
+        result = func(*args)
+        peak = peak_memory_mb()
+        peak_text = f"{peak:.1f} MB" if peak is not None else "n/a"
+        print(f"  [{name}] {time.time() - started:.1f}s, peak memory {peak_text}")
+        return result
+
+
+# Worker state for parallel builds (must be at module level for multiprocessing)
+_worker_builder = None
+
+
+def _init_build_worker(transliteration_memo):
+    """Create one builder per worker process, seeded with the parent's conversions."""
+    global _worker_builder
+    _worker_builder = TipitakaBuilder()
+    _worker_builder.transliteration.update(transliteration_memo)
+
+
+def _build_book_for_script_worker(book, script_code, structure, book_translations, max_level, sync):
+    return _worker_builder.build_book_for_script(book, script_code, structure, book_translations, max_level, sync)
+
 
 # === Main Execution ===
 if __name__ == "__main__":
@@ -583,8 +747,27 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Build Tipitaka documentation files.')
     parser.add_argument('--max-level', type=int, default=None,
                       help='Maximum hierarchy level to include (0=chapter, 1=title, etc.)')
+    parser.add_argument('--trace-memory', action='store_true',
+                      help='Track peak memory with tracemalloc (slower; used where RSS is unavailable)')
+    parser.add_argument('--jobs', type=int, default=1,
+                      help='Number of processes generating per-script output (default: 1)')
+    parser.add_argument('--sync', action='store_true',
+                      help='Write only new or changed files and delete stale ones instead of rebuilding book directories')
+    parser.add_argument('--query-cache', action='store_true',
+                      help='Persist books/TOC query results next to the database for faster re-runs')
+    parser.add_argument('--create-indexes', action='store_true',
+                      help='Create the supporting database indexes and exit')
     
     args = parser.parse_args()
     
-    builder = TipitakaBuilder()
-    builder.build(max_level=args.max_level)
+    if args.create_indexes:
+        with TipitakaRepository() as repository:
+            created = repository.create_indexes()
+        print(f"Created indexes: {', '.join(created)}" if created else "All indexes already exist")
+        raise SystemExit(0)
+    
+    if args.trace_memory:
+        tracemalloc.start()
+    
+    builder = TipitakaBuilder(persist_query_cache=args.query_cache)
+    builder.build(max_level=args.max_level, jobs=max(1, args.jobs), sync=args.sync)
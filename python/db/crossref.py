@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Precomputed mula -> aṭṭhakathā -> ṭīkā cross-references
+The exporter resolves paragraph_mapping, pali_attha_tika_match and books once and
+writes one columnar JSON shard per base book; CrossReferenceIndex answers
+"commentary pages for book X paragraph N" from those shards without the database
+"""
+
+import argparse
+import json
+import os
+import time
+from bisect import bisect_left
+from collections import defaultdict, namedtuple
+from contextlib import closing
+from typing import Dict, List, Optional
+
+from sqlite_profile import connect_read_only
+
+CROSSREF_DIRNAME = 'crossref'
+SHARD_FORMAT = 1
+
+# Commentary levels stored in the shards
+LEVELS = {'attha': 1, 'tika': 2}
+
+CommentaryRef = namedtuple('CommentaryRef', ['book_id', 'page', 'level'])
+
+
+def default_crossref_dir(db_path) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), CROSSREF_DIRNAME)
+
+
+def _resolve(conn) -> Dict[str, Dict[int, set]]:
+    """base book -> paragraph -> {(exp_book_id, exp_page_number, level)}"""
+    basket_by_book = dict(conn.execute("SELECT id, basket FROM books"))
+    commentaries_of = defaultdict(set)
+    for base, exp in conn.execute("SELECT base, exp FROM pali_attha_tika_match"):
+        commentaries_of[base].add(exp)
+
+    mapping = defaultdict(lambda: defaultdict(set))
+    cursor = conn.execute(
+        "SELECT base_book_id, paragraph, exp_book_id, exp_page_number FROM paragraph_mapping "
+        "WHERE paragraph IS NOT NULL AND exp_page_number IS NOT NULL"
+    )
+    for base_book, paragraph, exp_book, exp_page in cursor:
+        level = LEVELS.get(basket_by_book.get(exp_book))
+        if level is not None:
+            mapping[base_book][int(paragraph)].add((exp_book, int(exp_page), level))
+
+    # Second hop: a mula paragraph also reaches the ṭīkā pages of its matched
+    # aṭṭhakathā paragraph (paragraph numbers are shared along the chain)
+    resolved = defaultdict(lambda: defaultdict(set))
+    for base_book, paragraphs in mapping.items():
+        if basket_by_book.get(base_book) != 'mula':
+            continue
+        attha_books = [book for book in commentaries_of.get(base_book, ())
+                       if basket_by_book.get(book) == 'attha']
+        for paragraph, refs in paragraphs.items():
+            resolved[base_book][paragraph].update(refs)
+            for attha_book in attha_books:
+                for exp_book, exp_page, level in mapping.get(attha_book, {}).get(paragraph, ()):
+                    if level == LEVELS['tika']:
+                        resolved[base_book][paragraph].add((exp_book, exp_page, level))
+    # Commentary books keep their own (direct) references
+    for base_book, paragraphs in mapping.items():
+        if base_book not in resolved:
+            resolved[base_book] = paragraphs
+    return resolved
+
+
+def _to_shard(book_id: str, paragraphs: Dict[int, set]) -> dict:
+    """
+    Columnar shard: refs of paragraphs[i] are rows starts[i]..starts[i+1]-1 of
+    (books[book_index], page, level); books are stored once per shard
+    """
+    books: List[str] = []
+    book_index: Dict[str, int] = {}
+    shard = {'format': SHARD_FORMAT, 'book': book_id, 'books': books,
+             'paragraphs': [], 'starts': [], 'book_index': [], 'page': [], 'level': []}
+    for paragraph in sorted(paragraphs):
+        shard['paragraphs'].append(paragraph)
+        shard['starts'].append(len(shard['page']))
+        for exp_book, exp_page, level in sorted(paragraphs[paragraph], key=lambda ref: (ref[2], ref[0], ref[1])):
+            if exp_book not in book_index:
+                book_index[exp_book] = len(books)
+                books.append(exp_book)
+            shard['book_index'].append(book_index[exp_book])
+            shard['page'].append(exp_page)
+            shard['level'].append(level)
+    shard['starts'].append(len(shard['page']))
+    return shard
+
+
+def export_crossref(db_path, output_dir=None) -> int:
+    """
+    Write one shard per base book plus index.json
+
+    Returns:
+        int: Number of shards written
+    """
+    output_dir = output_dir or default_crossref_dir(db_path)
+    os.makedirs(output_dir, exist_ok=True)
+    with closing(connect_read_only(db_path)) as conn:
+        resolved = _resolve(conn)
+
+    index = {}
+    for book_id, paragraphs in sorted(resolved.items()):
+        shard = _to_shard(book_id, paragraphs)
+        with open(os.path.join(output_dir, f"{book_id}.json"), 'w', encoding='utf-8') as f:
+            json.dump(shard, f, ensure_ascii=False, separators=(',', ':'))
+        index[book_id] = {'paragraphs': len(shard['paragraphs']), 'refs': len(shard['page'])}
+
+    with open(os.path.join(output_dir, 'index.json'), 'w', encoding='utf-8') as f:
+        json.dump({'format': SHARD_FORMAT, 'books': index}, f, ensure_ascii=False, indent=1)
+    return len(index)
+
+
+class CrossReferenceIndex:
+    """
+    In-memory lookups over exported shards; each book's shard is loaded on first use
+    """
+
+    def __init__(self, shard_dir):
+        self.shard_dir = shard_dir
+        index_path = os.path.join(shard_dir, 'index.json')
+        if not os.path.exists(index_path):
+            raise FileNotFoundError(f"Cross-reference shards not found in {shard_dir} (run crossref.py)")
+        with open(index_path, 'r', encoding='utf-8') as f:
+            self.books = json.load(f)['books']
+        self._shards: Dict[str, dict] = {}
+
+    def _shard(self, book_id: str) -> Optional[dict]:
+        shard = self._shards.get(book_id)
+        if shard is None and book_id in self.books:
+            with open(os.path.join(self.shard_dir, f"{book_id}.json"), 'r', encoding='utf-8') as f:
+                shard = json.load(f)
+            self._shards[book_id] = shard
+        return shard
+
+    def lookup(self, book_id: str, paragraph: int, level: Optional[int] = None) -> List[CommentaryRef]:
+        """Commentary pages for a paragraph; level 1 = aṭṭhakathā, 2 = ṭīkā, None = both"""
+        shard = self._shard(book_id)
+        if shard is None:
+            return []
+        paragraphs = shard['paragraphs']
+        position = bisect_left(paragraphs, int(paragraph))
+        if position == len(paragraphs) or paragraphs[position] != int(paragraph):
+            return []
+        books = shard['books']
+        refs = []
+        for row in range(shard['starts'][position], shard['starts'][position + 1]):
+            if level is None or shard['level'][row] == level:
+                refs.append(CommentaryRef(books[shard['book_index'][row]], shard['page'][row], shard['level'][row]))
+        return refs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export mula/aṭṭhakathā/ṭīkā cross-reference shards.')
+    parser.add_argument('--db', help='Path to the SQLite database')
+    parser.add_argument('--output', help=f'Shard directory (default: {CROSSREF_DIRNAME}/ next to the database)')
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tipitaka_pali.db')
+    started = time.time()
+    count = export_crossref(db_path, args.output)
+    print(f"Wrote {count} shards to {args.output or default_crossref_dir(db_path)} in {time.time() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Dictionary lookup engine over the dictionary table (word, definition, book)
+Words are indexed once into a marisa-trie persisted next to the database (a
+sorted JSON index is used when marisa-trie is not installed); lookups then need
+no database access and hot words are served from an LRU cache.
+Index files are named after the database (<stem>.dictionary.*) and rebuilt when
+the database fingerprint recorded with them no longer matches
+"""
+
+import argparse
+import heapq
+import json
+import os
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict, namedtuple
+from contextlib import closing
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from query_cache import database_fingerprint
+from sqlite_profile import connect_read_only
+
+try:
+    import marisa_trie
+except ImportError:
+    marisa_trie = None
+
+DictionaryEntry = namedtuple('DictionaryEntry', ['word', 'definition', 'book'])
+
+TRIE_SUFFIX = '.dictionary.marisa'
+SORTED_INDEX_SUFFIX = '.dictionary.json'
+# Next to each index: fingerprint of the database it was built from (the trie has no room for metadata)
+SOURCE_SUFFIX = '.source'
+
+# Shorter prefixes match a large share of all headwords; prefix() returns nothing for them
+MIN_PREFIX_LENGTH = 2
+
+# Pali case/number endings, longest first, and the stem endings headwords use.
+# Stripping is only tried when the exact word is not in the dictionary.
+INFLECTION_ENDINGS = sorted([
+    'assa', 'āya', 'ena', 'ehi', 'ebhi', 'esu', 'ānaṃ', 'ato', 'amhā', 'asmā', 'amhi', 'asmiṃ',
+    'āni', 'āyo', 'āsu', 'āhi', 'ābhi', 'āyaṃ', 'iyā', 'iyo', 'īnaṃ', 'īhi', 'īsu', 'ino', 'inā',
+    'ismiṃ', 'imhi', 'issa', 'uno', 'unā', 'usmiṃ', 'ussa', 'ūnaṃ', 'ūhi', 'ūsu', 'avo', 'ave',
+    'aṃ', 'ā', 'e', 'o', 'iṃ', 'uṃ', 'ī', 'ū', 'i', 'u',
+], key=len, reverse=True)
+STEM_ENDINGS = ('', 'a', 'ā', 'i', 'ī', 'u', 'ū')
+
+
+def normalize_word(word: str) -> str:
+    """Key form of a word: NFC, trimmed, case-folded, ṁ written as ṃ"""
+    return unicodedata.normalize('NFC', word or '').strip().casefold().replace('ṁ', 'ṃ')
+
+
+def _index_paths(db_path) -> Tuple[str, str]:
+    stem = os.path.splitext(os.path.abspath(db_path))[0]
+    return stem + TRIE_SUFFIX, stem + SORTED_INDEX_SUFFIX
+
+
+def _read_source(index_path) -> str:
+    try:
+        with open(index_path + SOURCE_SUFFIX, 'r', encoding='utf-8') as f:
+            return f.read().strip()
+    except OSError:
+        return ''
+
+
+def _load_entries(db_path) -> Dict[str, List[Tuple[str, int, str]]]:
+    """All dictionary rows grouped by normalized word, in table order"""
+    grouped = defaultdict(list)
+    with closing(connect_read_only(db_path)) as conn:
+        cursor = conn.execute("SELECT word, definition, book FROM dictionary ORDER BY rowid")
+        for word, definition, book in cursor:
+            key = normalize_word(word)
+            if key:
+                grouped[key].append((word, book, definition))
+    return grouped
+
+
+def build_dictionary_index(db_path, use_trie=None) -> str:
+    """
+    Build the persisted dictionary index from the database
+
+    Returns:
+        str: Path of the written index
+    """
+    trie_path, sorted_path = _index_paths(db_path)
+    use_trie = marisa_trie is not None if use_trie is None else use_trie
+    fingerprint = database_fingerprint(db_path)
+    grouped = _load_entries(db_path)
+
+    if use_trie:
+        trie = marisa_trie.BytesTrie(
+            (key, json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+            for key, entries in grouped.items() for entry in entries
+        )
+        target = trie_path
+        trie.save(f"{target}.tmp")
+    else:
+        keys = sorted(grouped)
+        target = sorted_path
+        with open(f"{target}.tmp", 'w', encoding='utf-8') as f:
+            json.dump({'keys': keys, 'entries': [grouped[key] for key in keys]}, f, ensure_ascii=False)
+    os.replace(f"{target}.tmp", target)
+    # Written last: an interrupted build leaves the index stale rather than trusted
+    source_path = target + SOURCE_SUFFIX
+    with open(f"{source_path}.tmp", 'w', encoding='utf-8') as f:
+        f.write(fingerprint)
+    os.replace(f"{source_path}.tmp", source_path)
+    return target
+
+
+class DictionaryLookup:
+    """
+    Exact, prefix and inflection-tolerant dictionary lookups
+    """
+
+    def __init__(self, db_path=None, cache_size=4096, auto_build=True):
+        """
+        Args:
+            db_path (str): Tipitaka database the index is built from
+            cache_size (int): Number of recently looked-up words kept in the LRU cache
+            auto_build (bool): Build the index when it is missing or was built from another database
+        """
+        if db_path is None:
+            db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tipitaka_pali.db')
+        self.db_path = db_path
+        self._trie = None
+        self._keys: List[str] = []
+        self._entries: List[list] = []
+        self._load(auto_build)
+        self._cached_lookup = lru_cache(maxsize=cache_size)(self._lookup_key)
+        self._cached_inflected = lru_cache(maxsize=cache_size)(self._resolve_inflected)
+
+    def _load(self, auto_build):
+        trie_path, sorted_path = _index_paths(self.db_path)
+        index_path = trie_path if marisa_trie is not None else sorted_path
+        stale = os.path.exists(self.db_path) and _read_source(index_path) != database_fingerprint(self.db_path)
+        if not os.path.exists(index_path) or stale:
+            if not auto_build:
+                raise FileNotFoundError(f"Dictionary index missing or stale: {index_path}")
+            build_dictionary_index(self.db_path)
+
+        if marisa_trie is not None:
+            self._trie = marisa_trie.BytesTrie()
+            # Memory-map the index instead of reading it into the process
+            self._trie.mmap(index_path)
+        else:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._keys = data['keys']
+            self._entries = data['entries']
+
+    def _entries_for_key(self, key: str) -> List[list]:
+        if self._trie is not None:
+            return [json.loads(value) for value in self._trie.get(key, [])]
+        position = bisect_left(self._keys, key)
+        if position < len(self._keys) and self._keys[position] == key:
+            return self._entries[position]
+        return []
+
+    def _lookup_key(self, key: str) -> Tuple[DictionaryEntry, ...]:
+        return tuple(DictionaryEntry(word, definition, book)
+                     for word, book, definition in self._entries_for_key(key))
+
+    def lookup(self, word: str) -> List[DictionaryEntry]:
+        """Entries whose headword equals word (after normalization)"""
+        return list(self._cached_lookup(normalize_word(word)))
+
+    def prefix(self, prefix: str, limit: int = 20) -> List[str]:
+        """Headwords starting with prefix, in sorted order (none below MIN_PREFIX_LENGTH characters)"""
+        key = normalize_word(prefix)
+        if len(key) < MIN_PREFIX_LENGTH or limit <= 0:
+            return []
+        if self._trie is not None:
+            # The trie holds one key per entry; widen the heap until it yields limit distinct words
+            count = limit
+            while True:
+                smallest = heapq.nsmallest(count, self._trie.iterkeys(key))
+                words = list(dict.fromkeys(smallest))
+                if len(words) >= limit or len(smallest) < count:
+                    return words[:limit]
+                count *= 2
+        start = bisect_left(self._keys, key)
+        matches = []
+        for candidate in self._keys[start:]:
+            if not candidate.startswith(key) or len(matches) >= limit:
+                break
+            matches.append(candidate)
+        return matches
+
+    def candidates(self, word: str) -> List[str]:
+        """Possible headwords for an inflected form, most specific first"""
+        key = normalize_word(word)
+        candidates = [key]
+        for ending in INFLECTION_ENDINGS:
+            if key.endswith(ending) and len(key) - len(ending) >= 2:
+                stem = key[:-len(ending)]
+                candidates.extend(stem + stem_ending for stem_ending in STEM_ENDINGS)
+        return list(dict.fromkeys(candidates))
+
+    def _resolve_inflected(self, word: str) -> Tuple[DictionaryEntry, ...]:
+        for candidate in self.candidates(word):
+            entries = self._cached_lookup(candidate)
+            if entries:
+                return entries
+        return ()
+
+    def lookup_inflected(self, word: str) -> List[DictionaryEntry]:
+        """Exact entries, or else the entries of the first headword reached by stripping an ending"""
+        return list(self._cached_inflected(word))
+
+    def cache_info(self):
+        """LRU statistics for (headword lookups, inflected lookups)"""
+        return self._cached_lookup.cache_info(), self._cached_inflected.cache_info()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or query the dictionary lookup index.')
+    parser.add_argument('words', nargs='*', help='Words to look up')
+    parser.add_argument('--db', help='Path to the SQLite database')
+    parser.add_argument('--build', action='store_true', help='Rebuild the index')
+    parser.add_argument('--prefix', action='store_true', help='List headwords starting with each word')
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tipitaka_pali.db')
+    if args.build:
+        started = time.time()
+        path = build_dictionary_index(db_path)
+        print(f"Dictionary index written to {path} in {time.time() - started:.1f}s")
+
+    if args.words:
+        dictionary = DictionaryLookup(db_path)
+        for word in args.words:
+            if args.prefix:
+                print(f"{word}*: {', '.join(dictionary.prefix(word))}")
+                continue
+            started = time.perf_counter()
+            entries = dictionary.lookup_inflected(word)
+            elapsed = (time.perf_counter() - started) * 1e6
+            print(f"{word}: {len(entries)} entries ({elapsed:.0f} µs)")
+            for entry in entries:
+                print(f"  [{entry.book}] {entry.word}: {(entry.definition or '')[:100]}")
+
+
+if __name__ == "__main__":
+    main()
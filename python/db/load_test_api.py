@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Load test for api_server.py
+Opens N keep-alive connections that issue requests back to back and reports
+throughput and p50/p99 latency (standard library only)
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import List, Tuple
+from urllib.parse import quote
+
+
+async def _request(reader, writer, host: str, target: str, gzip: bool) -> Tuple[int, bytes]:
+    headers = f"GET {target} HTTP/1.1\r\nHost: {host}\r\n"
+    if gzip:
+        headers += "Accept-Encoding: gzip\r\n"
+    writer.write((headers + "\r\n").encode('latin-1'))
+    await writer.drain()
+    status_line = await reader.readline()
+    status = int(status_line.split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    body = await reader.readexactly(length) if length else b''
+    return status, body
+
+
+async def _client(host, port, targets, count, gzip, latencies: List[float], errors: List[int]):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(count):
+            target = random.choice(targets)
+            started = time.perf_counter()
+            status, _ = await _request(reader, writer, host, target, gzip)
+            latencies.append(time.perf_counter() - started)
+            if status >= 400:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def _discover_targets(host, port) -> List[str]:
+    """Request targets built from the server's own book list"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        status, body = await _request(reader, writer, host, '/books', gzip=False)
+        if status != 200:
+            raise RuntimeError(f"/books returned {status}")
+        books = json.loads(body)
+        targets = []
+        for book in books[:50]:
+            book_id = quote(book['id'])
+            targets.append(f"/tocs/{book_id}")
+            targets.append(f"/paragraphs/{book_id}")
+            first = book.get('firstpage') or 1
+            last = book.get('lastpage') or first
+            for page in range(first, min(last, first + 4) + 1):
+                targets.append(f"/pages/{book_id}/{page}")
+        return targets or ['/books']
+    finally:
+        writer.close()
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run(host, port, concurrency, requests, targets, gzip):
+    targets = targets or await _discover_targets(host, port)
+    latencies: List[float] = []
+    errors: List[int] = []
+    per_client = max(1, requests // concurrency)
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        _client(host, port, targets, per_client, gzip, latencies, errors) for _ in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"{len(latencies):,} requests over {len(targets)} targets, concurrency {concurrency}, "
+          f"{elapsed:.2f}s ({len(latencies) / elapsed:,.0f} req/s)")
+    print(f"  p50 {_percentile(latencies, 0.50) * 1000:.2f} ms   "
+          f"p99 {_percentile(latencies, 0.99) * 1000:.2f} ms   "
+          f"max {latencies[-1] * 1000:.2f} ms")
+    if errors:
+        print(f"  {len(errors):,} error responses (e.g. {errors[0]})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure api_server.py latency under concurrent load.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('-c', '--concurrency', type=int, default=32, help='Concurrent connections')
+    parser.add_argument('-n', '--requests', type=int, default=5000, help='Total requests')
+    parser.add_argument('--target', action='append', dest='targets',
+                        help='Request target to use (repeatable; default: built from /books)')
+    parser.add_argument('--gzip', action='store_true', help='Send Accept-Encoding: gzip')
+    args = parser.parse_args()
+    asyncio.run(run(args.host, args.port, args.concurrency, args.requests, args.targets, args.gzip))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Produce a deployment-optimized, read-only copy of tipitaka_pali.db
+The copy gets indexes for the lookups build_tree.py and migrate_tipitaka.py
+issue, clustered (WITHOUT ROWID) versions of the pure lookup tables, ANALYZE
+statistics and a final VACUUM; the source database is never modified
+"""
+
+import argparse
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import Dict, List, Optional, Tuple
+
+from sqlite_profile import connect_read_only, read_only_uri
+from tipitaka_repository import INDEXES
+
+OPTIMIZED_SUFFIX = '.optimized.db'
+
+# Indexes of the optimized copy (a superset of TipitakaRepository.INDEXES).
+# SQLite indexes end with the rowid, so (book_abbrv, page_number, paragraph_number)
+# covers the migrator's paragraph query including its ORDER BY ..., rowid
+OPTIMIZED_INDEXES = dict(INDEXES, **{
+    'idx_paragraphs_abbrv_page_para': 'paragraphs (book_abbrv, page_number, paragraph_number)',
+    'idx_paragraphs_book_page': 'paragraphs (book_id, page_number, paragraph_number)',
+})
+
+# Tables rebuilt as WITHOUT ROWID, clustered on these keys. Only tables that are
+# never read in rowid order qualify; category, books, tocs, pages, paragraphs
+# and dictionary are, so they keep their rowids.
+WITHOUT_ROWID_TABLES = {
+    'pali_attha_tika_match': ['base', 'exp'],
+    'paragraph_mapping': ['base_book_id', 'paragraph', 'base_page_number', 'exp_book_id', 'exp_page_number'],
+    'tran_books': ['bookid', 'tran_bookid'],
+}
+
+# Used instead when a table cannot be clustered (duplicate or NULL keys)
+FALLBACK_INDEXES = {
+    'paragraph_mapping': ('idx_paragraph_mapping_base',
+                          'paragraph_mapping (base_book_id, paragraph, exp_book_id, exp_page_number)'),
+}
+
+# (label, sql, parameter names) as issued by build_tree.py / TipitakaRepository
+# and migrate_tipitaka.py; parameters come from _sample_parameters
+BENCHMARK_QUERIES = [
+    ('categories', "SELECT id, name, basket FROM category ORDER BY rowid", ()),
+    ('books by basket',
+     "SELECT id, basket, category, name, firstpage, lastpage, pagecount, abbr FROM books "
+     "WHERE basket = ? ORDER BY rowid", ('basket',)),
+    ('tocs by basket',
+     "SELECT book_id, name, type, page_number FROM tocs "
+     "WHERE book_id IN (SELECT id FROM books WHERE basket = ?) ORDER BY book_id, page_number, rowid",
+     ('basket',)),
+    ('tocs of a book',
+     "SELECT book_id, name, type, page_number FROM tocs WHERE book_id = ? ORDER BY page_number, rowid",
+     ('book_id',)),
+    ('pages of a book',
+     "SELECT id, bookid, page, content, paranum FROM pages WHERE bookid = ? ORDER BY page",
+     ('book_id',)),
+    ('paragraph page map',
+     "SELECT book_abbrv, paragraph_number, page_number FROM paragraphs "
+     "WHERE book_abbrv IS NOT NULL AND paragraph_number IS NOT NULL AND page_number IS NOT NULL "
+     "ORDER BY book_abbrv, page_number, paragraph_number, rowid", ()),
+    ('paragraphs of a book',
+     "SELECT book_id, paragraph_number, page_number, book_abbrv FROM paragraphs "
+     "WHERE book_id = ? ORDER BY page_number, paragraph_number, rowid", ('book_id',)),
+]
+
+
+def default_output_path(db_path) -> str:
+    root, _ = os.path.splitext(os.path.abspath(db_path))
+    return root + OPTIMIZED_SUFFIX
+
+
+def _tables(conn) -> List[str]:
+    return [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+
+
+def _can_cluster(conn, table: str, key: List[str]) -> bool:
+    """True when key has no NULLs and no duplicates, so it can be the primary key"""
+    columns = ', '.join(key)
+    null_check = ' OR '.join(f"{column} IS NULL" for column in key)
+    if conn.execute(f"SELECT 1 FROM {table} WHERE {null_check} LIMIT 1").fetchone():
+        return False
+    total = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    distinct = conn.execute(f"SELECT COUNT(*) FROM (SELECT DISTINCT {columns} FROM {table})").fetchone()[0]
+    return total == distinct
+
+
+def _rebuild_without_rowid(conn, table: str, key: List[str]):
+    """Replace table with a WITHOUT ROWID copy ordered by key"""
+    info = conn.execute(f"PRAGMA table_info({table})").fetchall()
+    if any(column not in [row[1] for row in info] for column in key):
+        raise ValueError(f"{table} has no column for key {key}")
+    columns = ', '.join(f"{row[1]} {row[2]}".strip() for row in info)
+    names = ', '.join(row[1] for row in info)
+    conn.execute(f"CREATE TABLE {table}__clustered ({columns}, PRIMARY KEY ({', '.join(key)})) WITHOUT ROWID")
+    conn.execute(f"INSERT INTO {table}__clustered ({names}) SELECT {names} FROM {table} ORDER BY {', '.join(key)}")
+    conn.execute(f"DROP TABLE {table}")
+    conn.execute(f"ALTER TABLE {table}__clustered RENAME TO {table}")
+
+
+def optimize_database(db_path, output_path=None) -> Tuple[str, List[str]]:
+    """
+    Write the optimized copy
+
+    Returns:
+        tuple: (output path, list of changes made)
+    """
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Database not found: {db_path}")
+    output_path = output_path or default_output_path(db_path)
+    tmp_path = f"{output_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    # VACUUM INTO copies table by table in rowid order, so relative rowid order
+    # (which the readers' ORDER BY ..., rowid relies on) is preserved
+    with closing(sqlite3.connect(read_only_uri(db_path), uri=True)) as source:
+        source.execute("VACUUM INTO ?", (tmp_path,))
+
+    changes = []
+    with closing(sqlite3.connect(tmp_path)) as conn:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        tables = set(_tables(conn))
+        with conn:
+            for table, key in WITHOUT_ROWID_TABLES.items():
+                if table not in tables:
+                    continue
+                if _can_cluster(conn, table, key):
+                    _rebuild_without_rowid(conn, table, key)
+                    changes.append(f"{table}: WITHOUT ROWID on ({', '.join(key)})")
+                elif table in FALLBACK_INDEXES:
+                    name, target = FALLBACK_INDEXES[table]
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+                    changes.append(f"{table}: duplicate keys, index {name} instead")
+
+            for name, target in OPTIMIZED_INDEXES.items():
+                if target.split(' ', 1)[0] not in tables:
+                    continue
+                # Recreate so an older definition under the same name is replaced
+                conn.execute(f"DROP INDEX IF EXISTS {name}")
+                conn.execute(f"CREATE INDEX {name} ON {target}")
+                changes.append(f"index {name} ON {target}")
+        conn.execute("ANALYZE")
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA journal_mode = DELETE")
+
+    os.replace(tmp_path, output_path)
+    return output_path, changes
+
+
+def _sample_parameters(conn) -> Dict[str, Optional[str]]:
+    """Parameters for the benchmark queries: the largest mula book and its basket"""
+    row = conn.execute(
+        "SELECT bookid FROM pages WHERE bookid IN (SELECT id FROM books WHERE basket = 'mula') "
+        "GROUP BY bookid ORDER BY COUNT(*) DESC LIMIT 1"
+    ).fetchone()
+    return {'basket': 'mula', 'book_id': row[0] if row else None}
+
+
+def time_queries(db_path, parameters, repeat=3) -> Dict[str, float]:
+    """Best-of-repeat seconds per benchmark query (results fully fetched)"""
+    timings = {}
+    with closing(connect_read_only(db_path)) as conn:
+        for label, sql, names in BENCHMARK_QUERIES:
+            best = None
+            for _ in range(repeat):
+                started = time.perf_counter()
+                conn.execute(sql, [parameters[name] for name in names]).fetchall()
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            timings[label] = best
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write an optimized read-only copy of the Tipitaka database.')
+    parser.add_argument('--db', help='Source database (default: tipitaka_pali.db next to this script)')
+    parser.add_argument('--output', help=f'Optimized copy (default: <db>{OPTIMIZED_SUFFIX})')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per benchmark query (best is reported)')
+    parser.add_argument('--no-benchmark', action='store_true', help='Skip the before/after query timings')
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tipitaka_pali.db')
+    started = time.time()
+    output_path, changes = optimize_database(db_path, args.output)
+    print(f"Optimized copy written to {output_path} in {time.time() - started:.1f}s")
+    for change in changes:
+        print(f"  {change}")
+    print(f"  Size: {os.path.getsize(db_path) / (1024 * 1024):.1f} MB -> "
+          f"{os.path.getsize(output_path) / (1024 * 1024):.1f} MB")
+
+    if args.no_benchmark:
+        return
+    with closing(connect_read_only(db_path)) as conn:
+        parameters = _sample_parameters(conn)
+    before = time_queries(db_path, parameters, args.repeat)
+    after = time_queries(output_path, parameters, args.repeat)
+    print(f"\nQuery timings (best of {args.repeat}, book {parameters['book_id']}):")
+    for label, _, _ in BENCHMARK_QUERIES:
+        speedup = before[label] / after[label] if after[label] > 0 else float('inf')
+        print(f"  {label:<22} {before[label] * 1000:9.2f} ms -> {after[label] * 1000:9.2f} ms  ({speedup:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Dictionary-compressed storage for pages.content
+Page texts are compressed one by one against a dictionary trained on the
+corpus and stored in a side table keyed by pages.id; TipitakaDAL
+decompresses them transparently. zstd (the zstandard package) is used when
+installed, otherwise zlib with a preset dictionary
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import time
+import zlib
+from collections import Counter
+from contextlib import closing
+from typing import Dict, Iterable, List, Optional
+
+from sqlite_profile import connect_read_only
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSED_TABLE = 'pages_compressed'
+META_TABLE = 'pages_compression'
+
+# Pages keyed by pages.id rather than rowid, which VACUUM may renumber;
+# pages sharing an id stay uncompressed
+UNIQUE_PAGES = "content IS NOT NULL AND id IN (SELECT id FROM pages GROUP BY id HAVING COUNT(*) = 1)"
+
+# zlib only looks back 32 KB, so a larger preset dictionary is wasted
+ZLIB_DICT_SIZE = 32 * 1024
+ZSTD_DICT_SIZE = 112 * 1024
+
+
+def default_codec() -> str:
+    return 'zstd' if zstandard is not None else 'zlib'
+
+
+def _train_zlib_dictionary(samples: List[str], size: int = ZLIB_DICT_SIZE) -> bytes:
+    """
+    Preset dictionary of the most valuable recurring words and phrases
+
+    Candidates are scored by bytes saved (occurrences x length); the best ones
+    go last because zlib encodes nearer matches with shorter distances.
+    """
+    counts = Counter()
+    for text in samples:
+        words = text.split()
+        counts.update(words)
+        counts.update(' '.join(words[i:i + 3]) for i in range(len(words) - 2))
+    scored = [(count * len(candidate.encode('utf-8')), candidate)
+              for candidate, count in counts.items() if count > 1]
+    scored.sort(reverse=True)
+
+    chosen = []
+    used = 0
+    for _, candidate in scored:
+        encoded = candidate.encode('utf-8') + b' '
+        if used + len(encoded) > size:
+            continue
+        chosen.append(encoded)
+        used += len(encoded)
+    return b''.join(reversed(chosen))
+
+
+class PageCodec:
+    """Compresses and decompresses single page texts against a shared dictionary"""
+
+    def __init__(self, codec: str, dictionary: bytes, level: Optional[int] = None):
+        if codec == 'zstd' and zstandard is None:
+            raise ImportError("Pages were compressed with zstd; install zstandard (pip install zstandard)")
+        if codec not in ('zstd', 'zlib'):
+            raise ValueError(f"Unknown codec '{codec}'")
+        self.codec = codec
+        self.dictionary = dictionary
+        self.level = level if level is not None else (19 if codec == 'zstd' else 9)
+        if codec == 'zstd':
+            zstd_dict = zstandard.ZstdCompressionDict(dictionary)
+            self._compressor = zstandard.ZstdCompressor(level=self.level, dict_data=zstd_dict)
+            self._decompressor = zstandard.ZstdDecompressor(dict_data=zstd_dict)
+
+    @classmethod
+    def train(cls, samples: List[str], codec: Optional[str] = None, level: Optional[int] = None,
+              dict_size: Optional[int] = None) -> 'PageCodec':
+        codec = codec or default_codec()
+        if codec == 'zstd':
+            if zstandard is None:
+                raise ImportError("zstd needs the zstandard package (pip install zstandard)")
+            trained = zstandard.train_dictionary(dict_size or ZSTD_DICT_SIZE,
+                                                 [text.encode('utf-8') for text in samples])
+            return cls(codec, trained.as_bytes(), level)
+        return cls(codec, _train_zlib_dictionary(samples, dict_size or ZLIB_DICT_SIZE), level)
+
+    def compress(self, text: str) -> bytes:
+        data = text.encode('utf-8')
+        if self.codec == 'zstd':
+            return self._compressor.compress(data)
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15, zdict=self.dictionary)
+        return compressor.compress(data) + compressor.flush()
+
+    def decompress(self, blob: bytes) -> str:
+        if self.codec == 'zstd':
+            return self._decompressor.decompress(blob).decode('utf-8')
+        decompressor = zlib.decompressobj(-15, zdict=self.dictionary)
+        return (decompressor.decompress(blob) + decompressor.flush()).decode('utf-8')
+
+    def decompress_many(self, blobs: Iterable[Optional[bytes]]) -> List[Optional[str]]:
+        """Decompress a batch, passing None through"""
+        decompress = self.decompress
+        return [None if blob is None else decompress(blob) for blob in blobs]
+
+
+def has_compressed_pages(conn) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (COMPRESSED_TABLE,)
+    ).fetchone() is not None
+
+
+def load_codec(conn) -> Optional[PageCodec]:
+    """Codec stored in the database, or None if pages are not compressed"""
+    if not has_compressed_pages(conn):
+        return None
+    meta = dict(conn.execute(f"SELECT key, value FROM {META_TABLE}"))
+    return PageCodec(meta['codec'], bytes(meta['dictionary']), int(meta['level']))
+
+
+def compress_pages(db_path, codec=None, level=None, sample_pages=2000, drop_plain=False,
+                   batch_size=1000) -> Dict[str, float]:
+    """
+    Write the compressed side table into db_path (modified in place)
+
+    Run it on a copy meant for shipping (see optimize_db.py). With drop_plain,
+    pages.content is set to NULL for the compressed pages and the file is
+    vacuumed so the size drops.
+
+    Returns:
+        dict: Sizes and timings of the run
+    """
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Database not found: {db_path}")
+    stats = {'file_before': os.path.getsize(db_path)}
+    with closing(sqlite3.connect(db_path)) as conn:
+        if has_compressed_pages(conn):
+            raise RuntimeError(f"{db_path} already has {COMPRESSED_TABLE}")
+        rowids = [row[0] for row in conn.execute("SELECT rowid FROM pages WHERE content IS NOT NULL")]
+        sample = sorted(random.Random(0).sample(rowids, min(sample_pages, len(rowids))))
+        samples = [conn.execute("SELECT content FROM pages WHERE rowid = ?", (rowid,)).fetchone()[0]
+                   for rowid in sample]
+        stats['skipped'] = conn.execute(
+            f"SELECT COUNT(*) FROM pages WHERE content IS NOT NULL AND NOT ({UNIQUE_PAGES})"
+        ).fetchone()[0]
+
+        started = time.perf_counter()
+        page_codec = PageCodec.train(samples, codec, level)
+        stats['train_seconds'] = time.perf_counter() - started
+        stats['dictionary'] = len(page_codec.dictionary)
+
+        conn.execute(f"CREATE TABLE {META_TABLE} (key TEXT PRIMARY KEY, value BLOB)")
+        conn.execute(f"CREATE TABLE {COMPRESSED_TABLE} (page_id INTEGER PRIMARY KEY, data BLOB NOT NULL)")
+        conn.executemany(f"INSERT INTO {META_TABLE} VALUES (?, ?)", [
+            ('codec', page_codec.codec), ('level', str(page_codec.level)),
+            ('dictionary', page_codec.dictionary),
+        ])
+
+        plain = compressed = 0
+        started = time.perf_counter()
+        cursor = conn.execute(f"SELECT id, content FROM pages WHERE {UNIQUE_PAGES} ORDER BY rowid")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            blobs = [(page_id, page_codec.compress(content)) for page_id, content in rows]
+            plain += sum(len(content.encode('utf-8')) for _, content in rows)
+            compressed += sum(len(blob) for _, blob in blobs)
+            conn.executemany(f"INSERT INTO {COMPRESSED_TABLE} VALUES (?, ?)", blobs)
+        stats['compress_seconds'] = time.perf_counter() - started
+        stats['plain'] = plain
+        stats['compressed'] = compressed
+        if drop_plain:
+            conn.execute(f"UPDATE pages SET content = NULL WHERE id IN (SELECT page_id FROM {COMPRESSED_TABLE})")
+        conn.commit()
+        if drop_plain:
+            conn.execute("VACUUM")
+    stats['file_after'] = os.path.getsize(db_path)
+    return stats
+
+
+def measure_decompression(db_path, batch_size=2000) -> Dict[str, float]:
+    """Decompression throughput over all pages: one by one and in batches"""
+    with closing(connect_read_only(db_path)) as conn:
+        page_codec = load_codec(conn)
+        if page_codec is None:
+            raise RuntimeError(f"{db_path} has no {COMPRESSED_TABLE} table")
+        blobs = [row[0] for row in conn.execute(f"SELECT data FROM {COMPRESSED_TABLE} ORDER BY page_id")]
+
+    started = time.perf_counter()
+    plain = sum(len(page_codec.decompress(blob).encode('utf-8')) for blob in blobs)
+    single = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for start in range(0, len(blobs), batch_size):
+        page_codec.decompress_many(blobs[start:start + batch_size])
+    batched = time.perf_counter() - started
+    return {'pages': len(blobs), 'plain': plain, 'single_seconds': single, 'batch_seconds': batched}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Store pages.content compressed with a trained dictionary.')
+    parser.add_argument('--db', required=True, help='Database to modify in place (use a shipping copy)')
+    parser.add_argument('--codec', choices=['zstd', 'zlib'], help=f'Compression codec (default: {default_codec()})')
+    parser.add_argument('--level', type=int, help='Compression level (default: 19 for zstd, 9 for zlib)')
+    parser.add_argument('--sample-pages', type=int, default=2000, help='Pages used to train the dictionary')
+    parser.add_argument('--drop-plain', action='store_true',
+                        help='Clear pages.content after compressing and VACUUM the file')
+    args = parser.parse_args()
+
+    stats = compress_pages(args.db, args.codec, args.level, args.sample_pages, args.drop_plain)
+    mb = 1024 * 1024
+    print(f"Compressed pages in {args.db}")
+    print(f"  Dictionary: {stats['dictionary'] / 1024:.1f} KB (trained in {stats['train_seconds']:.1f}s)")
+    print(f"  Content: {stats['plain'] / mb:.1f} MB -> {stats['compressed'] / mb:.1f} MB "
+          f"({stats['plain'] / max(stats['compressed'], 1):.1f}x) in {stats['compress_seconds']:.1f}s")
+    if stats['skipped']:
+        print(f"  {stats['skipped']:,} pages with a duplicate id were left uncompressed")
+    print(f"  File: {stats['file_before'] / mb:.1f} MB -> {stats['file_after'] / mb:.1f} MB")
+
+    timing = measure_decompression(args.db)
+    for label, seconds in (('one by one', timing['single_seconds']), ('batched', timing['batch_seconds'])):
+        rate = timing['plain'] / mb / seconds if seconds > 0 else float('inf')
+        print(f"  Decompress {label:<10} {timing['pages']:,} pages in {seconds:.2f}s ({rate:.0f} MB/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Memoized query results for the read-only Tipitaka database
+Results are keyed by (sql, params) in a per-process LRU, optionally backed by
+an on-disk SQLite store so re-runs start warm. Everything cached is dropped
+when the database fingerprint (file size, mtime, header bytes) changes.
+The on-disk layer is best-effort: if its file is corrupt or locked it is
+switched off and results come from the database
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List
+
+# Appended to the database's stem, so every database has its own cache file
+QUERY_CACHE_SUFFIX = '.query_cache.db'
+
+# The first 100 bytes are the SQLite header; it includes the file change counter
+HEADER_SIZE = 100
+
+logger = logging.getLogger(__name__)
+
+
+def default_cache_path(db_path) -> str:
+    """<db stem>.query_cache.db next to the database"""
+    stem = os.path.splitext(os.path.abspath(db_path))[0]
+    return stem + QUERY_CACHE_SUFFIX
+
+
+def database_fingerprint(db_path, with_mtime=True) -> str:
+    """
+    Identity of the database file contents: size, mtime and a hash of the header
+
+    Without the mtime it stays the same across copies of one file (e.g. a fresh download).
+    """
+    stat = os.stat(db_path)
+    with open(db_path, 'rb') as f:
+        header = f.read(HEADER_SIZE)
+    digest = hashlib.sha1(header).hexdigest()[:16]
+    if not with_mtime:
+        return f"{stat.st_size}-{digest}"
+    return f"{stat.st_size}-{stat.st_mtime_ns}-{digest}"
+
+
+class QueryCache:
+    """
+    LRU of query results with an optional persistent layer
+
+    Thread-safe; the fingerprint is re-checked at most every check_interval seconds.
+    """
+
+    def __init__(self, db_path, max_entries=1024, disk_path=None, check_interval=1.0):
+        """
+        Args:
+            db_path (str): Database whose results are cached
+            max_entries (int): Results kept in memory
+            disk_path (str): SQLite file for the persistent layer (None = memory only)
+            check_interval (float): Seconds between fingerprint checks
+        """
+        self.db_path = str(db_path)
+        self.max_entries = max_entries
+        self.disk_path = str(disk_path) if disk_path else None
+        self.check_interval = check_interval
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+        self._disk_pid = None
+        self._fingerprint = None
+        self._checked_at = 0.0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(sql: str, params=()) -> str:
+        return hashlib.sha1(repr((sql, tuple(params))).encode('utf-8')).hexdigest()
+
+    def _open_disk(self):
+        if self._disk is not None and self._disk_pid != os.getpid():
+            # Forked child: open its own handle instead of sharing the parent's
+            self._disk = None
+        if self._disk is None and self.disk_path:
+            self._disk_pid = os.getpid()
+            try:
+                # Short busy timeout: a cache shared by concurrent runs must not stall them
+                self._disk = sqlite3.connect(self.disk_path, timeout=1.0, check_same_thread=False)
+                self._disk.execute(
+                    "CREATE TABLE IF NOT EXISTS query_cache (key TEXT PRIMARY KEY, fingerprint TEXT, rows BLOB)"
+                )
+            except sqlite3.Error as e:
+                self._disable_disk(e)
+        return self._disk
+
+    def _disable_disk(self, error):
+        """Stop using the on-disk layer after an error; the memory layer keeps working"""
+        logger.warning(f"Query cache file {self.disk_path} disabled: {error}")
+        if self._disk is not None and self._disk_pid == os.getpid():
+            try:
+                self._disk.close()
+            except sqlite3.Error:
+                pass
+        self._disk = None
+        self.disk_path = None
+
+    def _validate(self):
+        """Drop everything cached for an older version of the database (called under the lock)"""
+        now = time.monotonic()
+        if self._fingerprint is not None and now - self._checked_at < self.check_interval:
+            return
+        fingerprint = database_fingerprint(self.db_path)
+        self._checked_at = now
+        if fingerprint == self._fingerprint:
+            return
+        self._entries.clear()
+        self._fingerprint = fingerprint
+        disk = self._open_disk()
+        if disk is not None:
+            try:
+                with disk:
+                    disk.execute("DELETE FROM query_cache WHERE fingerprint != ?", (fingerprint,))
+            except sqlite3.Error as e:
+                self._disable_disk(e)
+
+    def _remember(self, key: str, rows: tuple):
+        self._entries[key] = rows
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def fetchall(self, execute: Callable, sql: str, params=()) -> List[tuple]:
+        """
+        Rows of a query, from the cache or by running execute(sql, params).fetchall()
+
+        Returns a new list each time so callers may modify it.
+        """
+        key = self.key(sql, params)
+        with self._lock:
+            self._validate()
+            rows = self._entries.get(key)
+            if rows is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(rows)
+            disk = self._open_disk()
+            if disk is not None:
+                try:
+                    found = disk.execute(
+                        "SELECT rows FROM query_cache WHERE key = ? AND fingerprint = ?", (key, self._fingerprint)
+                    ).fetchone()
+                    rows = pickle.loads(found[0]) if found is not None else None
+                except (sqlite3.Error, pickle.UnpicklingError) as e:
+                    self._disable_disk(e)
+                    rows = None
+                if rows is not None:
+                    self._remember(key, rows)
+                    self.disk_hits += 1
+                    return list(rows)
+            self.misses += 1
+            fingerprint = self._fingerprint
+
+        # Run the query outside the lock so other threads are not held up
+        rows = tuple(tuple(row) for row in execute(sql, params).fetchall())
+        with self._lock:
+            if fingerprint == self._fingerprint:
+                self._remember(key, rows)
+                disk = self._open_disk()
+                if disk is not None:
+                    try:
+                        with disk:
+                            disk.execute("INSERT OR REPLACE INTO query_cache VALUES (?, ?, ?)",
+                                         (key, fingerprint, pickle.dumps(rows, protocol=pickle.HIGHEST_PROTOCOL)))
+                    except sqlite3.Error as e:
+                        self._disable_disk(e)
+        return list(rows)
+
+    def clear(self):
+        """Forget every cached result, in memory and on disk"""
+        with self._lock:
+            self._entries.clear()
+            disk = self._open_disk()
+            if disk is not None:
+                try:
+                    with disk:
+                        disk.execute("DELETE FROM query_cache")
+                except sqlite3.Error as e:
+                    self._disable_disk(e)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            'entries': len(self._entries),
+        }
+
+    def close(self):
+        with self._lock:
+            if self._disk is not None and self._disk_pid == os.getpid():
+                self._disk.close()
+            self._disk = None
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Build an SQLite FTS5 full-text index over pages.content
+The index lives in its own file next to the database (tipitaka_search.db) so the
+main database stays read-only; TipitakaDAL.search queries it
+"""
+
+import argparse
+import os
+import sqlite3
+import time
+from collections import namedtuple
+from contextlib import closing
+
+from page_compression import COMPRESSED_TABLE, load_codec
+from query_cache import database_fingerprint
+from sqlite_profile import connect_read_only
+
+SEARCH_INDEX_FILENAME = 'tipitaka_search.db'
+FTS_TABLE = 'pages_fts'
+
+SearchHit = namedtuple('SearchHit', ['book', 'page', 'snippet'])
+
+# Myanmar vowel signs, medials, asat, virama and tone marks are combining marks,
+# which unicode61 would otherwise treat as word separators
+MYANMAR_TOKENCHARS = ''.join(
+    chr(code) for code in list(range(0x102B, 0x103F)) + list(range(0x1056, 0x105A))
+    + list(range(0x105E, 0x1061)) + list(range(0x1062, 0x1065)) + list(range(0x1067, 0x106E))
+    + list(range(0x1071, 0x1075)) + list(range(0x1082, 0x108E)) + [0x108F, 0x109A, 0x109B, 0x109C, 0x109D]
+)
+
+TOKENIZERS = {
+    # Substring matching of 3+ characters; needs no word segmentation (SQLite 3.34+)
+    'trigram': "trigram",
+    # Whole-word matching with Myanmar combining marks kept inside words
+    'unicode61': "unicode61 remove_diacritics 0 tokenchars '{}'".format(MYANMAR_TOKENCHARS),
+}
+
+
+# The trigram tokenizer cannot MATCH shorter queries; TipitakaDAL.search scans for them instead
+TRIGRAM_MIN_LENGTH = 3
+
+
+def default_index_path(db_path) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), SEARCH_INDEX_FILENAME)
+
+
+def to_match_expression(query, column=None, raw=False) -> str:
+    """
+    FTS5 MATCH expression for a user query
+
+    Unless raw, the query is matched as one phrase so FTS syntax characters
+    in user input are taken literally; column restricts it to content or content_iast.
+    """
+    expression = query if raw else '"' + query.replace('"', '""') + '"'
+    if column:
+        expression = f"{{{column}}} : ({expression})"
+    return expression
+
+
+def scan_snippet(text, query, context=48) -> str:
+    """<b>-highlighted excerpt around the first occurrence of query, like FTS5 snippet()"""
+    start = text.find(query) if text else -1
+    if start < 0:
+        return ''
+    end = start + len(query)
+    left, right = max(0, start - context), min(len(text), end + context)
+    return (('…' if left else '') + text[left:start] + '<b>' + text[start:end] + '</b>'
+            + text[end:right] + ('…' if right < len(text) else ''))
+
+
+def supports_trigram() -> bool:
+    return sqlite3.sqlite_version_info >= (3, 34, 0)
+
+
+def build_search_index(db_path, index_path=None, tokenizer=None, iast=False, batch_size=2000):
+    """
+    Create the FTS5 index from the pages table
+
+    Args:
+        db_path (str): Tipitaka database
+        index_path (str): Output file (default: tipitaka_search.db next to the database)
+        tokenizer (str): 'trigram' or 'unicode61' (default: trigram when available)
+        iast (bool): Also index an IAST-transliterated copy of each page (slow; needs aksharamukha)
+        batch_size (int): Pages inserted per executemany call
+
+    Returns:
+        int: Number of indexed pages
+    """
+    index_path = index_path or default_index_path(db_path)
+    if tokenizer is None:
+        tokenizer = 'trigram' if supports_trigram() else 'unicode61'
+    if tokenizer not in TOKENIZERS:
+        raise ValueError(f"Unknown tokenizer '{tokenizer}' (choose from {', '.join(TOKENIZERS)})")
+    if tokenizer == 'trigram' and not supports_trigram():
+        raise RuntimeError(f"SQLite {sqlite3.sqlite_version} has no trigram tokenizer (needs 3.34+)")
+
+    to_iast = None
+    if iast:
+        from aksharamukha import transliterate
+
+        def to_iast(text):
+            return transliterate.process('Burmese', 'IASTPali', text) if text else text
+
+    columns = ['content'] + (['content_iast'] if iast else []) + ['bookid UNINDEXED', 'page UNINDEXED']
+    placeholders = ', '.join('?' * len(columns))
+
+    # Build into a temporary file so readers never see a half-built index
+    tmp_path = f"{index_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    # Recorded so readers can tell when the database changed after the build
+    source_fingerprint = database_fingerprint(db_path)
+    count = 0
+    with closing(connect_read_only(db_path)) as source, closing(sqlite3.connect(tmp_path)) as index:
+        index.execute("PRAGMA journal_mode = OFF")
+        index.execute("PRAGMA synchronous = OFF")
+        index.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5({', '.join(columns)}, "
+            f"tokenize = \"{TOKENIZERS[tokenizer]}\")"
+        )
+        index.execute("CREATE TABLE search_meta (key TEXT PRIMARY KEY, value TEXT)")
+        page_codec = load_codec(source)
+        if page_codec:
+            # Pages whose plain content was dropped are read from the compressed side table
+            cursor = source.execute(
+                f"SELECT p.content, p.bookid, p.page, c.data FROM pages p "
+                f"LEFT JOIN {COMPRESSED_TABLE} c ON c.page_id = p.id ORDER BY p.rowid"
+            )
+        else:
+            cursor = source.execute("SELECT content, bookid, page FROM pages ORDER BY rowid")
+        with index:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                if page_codec:
+                    contents = page_codec.decompress_many(data if content is None else None
+                                                          for content, _, _, data in rows)
+                    rows = [(content if decompressed is None else decompressed, bookid, page)
+                            for (content, bookid, page, _), decompressed in zip(rows, contents)]
+                if to_iast:
+                    rows = [(content, to_iast(content), bookid, page) for content, bookid, page in rows]
+                index.executemany(f"INSERT INTO {FTS_TABLE} VALUES ({placeholders})", rows)
+                count += len(rows)
+            index.executemany("INSERT INTO search_meta VALUES (?, ?)", [
+                ('tokenizer', tokenizer), ('iast', '1' if iast else '0'), ('pages', str(count)),
+                ('source', source_fingerprint),
+            ])
+        index.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+        index.commit()
+
+    os.replace(tmp_path, index_path)
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the FTS5 full-text search index over pages.content.')
+    parser.add_argument('--db', help='Path to the SQLite database (default: tipitaka_pali.db next to this script)')
+    parser.add_argument('--output', help=f'Index file (default: {SEARCH_INDEX_FILENAME} next to the database)')
+    parser.add_argument('--tokenizer', choices=sorted(TOKENIZERS),
+                        help='trigram (substring search, default) or unicode61 (whole words)')
+    parser.add_argument('--iast', action='store_true',
+                        help='Also index an IAST-transliterated column for Latin-script queries')
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tipitaka_pali.db')
+    started = time.time()
+    count = build_search_index(db_path, args.output, args.tokenizer, args.iast)
+    print(f"Indexed {count:,} pages into {args.output or default_index_path(db_path)} "
+          f"in {time.time() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
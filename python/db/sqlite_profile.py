@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Read-only SQLite connection profile for the Tipitaka database
+Shared by TipitakaDAL, TipitakaRepository and the markdown migrator; it only
+depends on the standard library so raw sqlite3 readers can use it without pyDAL
+"""
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+# Pragmas applied to every read-only connection
+READ_ONLY_PRAGMAS = {
+    'mmap_size': 256 * 1024 * 1024,  # map up to 256 MB of the file instead of copying pages
+    'cache_size': -64 * 1024,        # 64 MB page cache (negative values are KiB)
+    'temp_store': 'MEMORY',          # sorts and temporary indexes stay in memory
+    'query_only': 'ON',              # refuse writes even on a writable handle
+}
+
+
+def read_only_uri(db_path, immutable=False) -> str:
+    """
+    SQLite URI opening the database read-only
+
+    immutable=1 additionally skips locking and change detection; only use it
+    when nothing writes the file while it is open.
+    """
+    uri = Path(db_path).resolve().as_uri() + '?mode=ro'
+    if immutable:
+        uri += '&immutable=1'
+    return uri
+
+
+def apply_pragmas(execute, pragmas=None):
+    """Apply pragmas through an execute(sql) callable (sqlite3 or pyDAL adapter)"""
+    for name, value in (READ_ONLY_PRAGMAS if pragmas is None else pragmas).items():
+        execute(f"PRAGMA {name} = {value}")
+
+
+def connect_read_only(db_path, immutable=False, check_same_thread=True) -> sqlite3.Connection:
+    """Open a tuned read-only sqlite3 connection"""
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Database not found: {db_path}")
+    conn = sqlite3.connect(read_only_uri(db_path, immutable), uri=True, check_same_thread=check_same_thread)
+    apply_pragmas(conn.execute)
+    return conn
+
+
+class ConnectionFactory:
+    """
+    Hands out one read-only connection per thread (and per process)
+
+    Readers in different threads query concurrently without sharing a handle;
+    after a fork the child opens its own connections instead of reusing the parent's.
+    """
+
+    def __init__(self, db_path, immutable=False):
+        self.db_path = str(db_path)
+        self.immutable = immutable
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._pid = os.getpid()
+
+    def get(self) -> sqlite3.Connection:
+        """Connection for the calling thread"""
+        if self._pid != os.getpid():
+            # Forked child: connections inherited from the parent must not be used
+            self._local = threading.local()
+            self._connections = []
+            self._pid = os.getpid()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Not shared between threads, but close_all may run in another thread
+            conn = connect_read_only(self.db_path, self.immutable, check_same_thread=False)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close_all(self):
+        """Close every connection handed out in this process"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
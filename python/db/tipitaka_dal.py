@@ -4,22 +4,34 @@ Tipitaka Database Access Layer (DAL) using pyDAL
 Provides models and database connection for Tipitaka Pali database
 """
 
-from pydal import DAL, Field
+import logging
 import os
 from datetime import datetime
+from sqlite_profile import READ_ONLY_PRAGMAS, ConnectionFactory, apply_pragmas, read_only_uri
+from tipitaka_repository import Book, Page, Paragraph, TocEntry
+from search_index import (FTS_TABLE, TRIGRAM_MIN_LENGTH, SearchHit, default_index_path, scan_snippet,
+                          to_match_expression)
+from page_compression import COMPRESSED_TABLE, load_codec
+from query_cache import QueryCache, database_fingerprint
+
+logger = logging.getLogger(__name__)
 
 class TipitakaDAL:
     """
     Data Access Layer for Tipitaka Pali database
     """
     
-    def __init__(self, db_path=None, auto_connect=False):
+    def __init__(self, db_path=None, auto_connect=False, read_only=True, cache_size=1024, cache_path=None):
         """
         Initialize the DAL connection
         
         Args:
             db_path (str): Path to the SQLite database file
             auto_connect (bool): Automatically connect on initialization
+            read_only (bool): Apply the read-only profile (query_only and tuned pragmas);
+                db.pages rows then also see compressed page contents
+            cache_size (int): Query results kept in memory (0 disables the query cache)
+            cache_path (str): Also persist cached results in this file (see query_cache.py)
         """
         if db_path is None:
             # Default to the database in the same directory
@@ -28,6 +40,15 @@ class TipitakaDAL:
         
         self.db_path = db_path
         self.db = None
+        self.read_only = read_only
+        self._readers = None
+        self.search_index_path = default_index_path(db_path)
+        self._search_readers = None
+        self._search_meta = {}
+        self._dictionary = None
+        self._crossref = None
+        self._page_codec = None
+        self.query_cache = QueryCache(db_path, cache_size, cache_path) if cache_size else None
         
         if auto_connect:
             self.connect()
@@ -37,12 +58,24 @@ class TipitakaDAL:
         """
         Establish database connection and define models
         """
+        # pyDAL is only needed for the model layer, so it is imported on connect
+        from pydal import DAL
+        
         try:
             # Connect to existing SQLite database
             self.db = DAL(f'sqlite://{self.db_path}', 
                          check_reserved=False,  # Completely disable reserved keyword checking
                          migrate=False,  # Don't migrate existing database
-                         fake_migrate=True)  # Use existing structure
+                         fake_migrate=True,  # Use existing structure
+                         # Read-only profile on every connection pyDAL opens
+                         after_connection=self._apply_read_only_profile if self.read_only else None)
+            if self.read_only:
+                # pyDAL passes its file path straight to sqlite3.connect; swap in the
+                # read-only URI and replace any handle opened with the plain path
+                adapter = self.db._adapter
+                adapter.dbpath = read_only_uri(self.db_path)
+                adapter.driver_args['uri'] = True
+                adapter.reconnect()
             
             # Define common Tipitaka database models
             self._define_models()
@@ -53,10 +86,405 @@ class TipitakaDAL:
             print(f"Database connection error: {e}")
             return False
     
+    def _apply_read_only_profile(self, adapter):
+        # Setting temp_store discards temp objects and query_only refuses to
+        # create them, so the decompressing view is created in between
+        pragmas = dict(READ_ONLY_PRAGMAS)
+        query_only = pragmas.pop('query_only')
+        apply_pragmas(adapter.execute, pragmas)
+        self._create_page_view(adapter.connection)
+        apply_pragmas(adapter.execute, {'query_only': query_only})
+
+    @staticmethod
+    def _create_page_view(conn):
+        """
+        Shadow pages with a temp view whose content column is decompressed
+
+        Lets db.pages rows read pages compressed with --drop-plain; temp objects
+        are resolved before main ones, so pyDAL queries use the view unchanged.
+        """
+        codec = load_codec(conn)
+        if not codec:
+            return
+        conn.create_function('page_text', 1, lambda blob: None if blob is None else codec.decompress(blob),
+                             deterministic=True)
+        conn.execute(
+            f"CREATE TEMP VIEW IF NOT EXISTS pages AS SELECT p.id AS id, p.bookid AS bookid, p.page AS page, "
+            f"COALESCE(p.content, page_text((SELECT data FROM main.{COMPRESSED_TABLE} "
+            f"WHERE page_id = p.id))) AS content, p.paranum AS paranum FROM main.pages p"
+        )
+
+    @property
+    def readers(self):
+        """
+        Factory of raw read-only sqlite3 connections, one per thread
+        
+        Use readers.get() for concurrent raw queries instead of sharing one handle.
+        """
+        if self._readers is None:
+            self._readers = ConnectionFactory(self.db_path)
+        return self._readers
+
+    # ------------------------------------------------------------------
+    # Query API: parameterized SQL on the per-thread read-only connection,
+    # returning namedtuples instead of pyDAL Row objects
+    # ------------------------------------------------------------------
+
+    def _fetch_all(self, sql, params=()):
+        """Rows of a query, memoized by (sql, params) when the query cache is enabled"""
+        if self.query_cache is None:
+            return self.readers.get().execute(sql, params).fetchall()
+        return self.query_cache.fetchall(self.readers.get().execute, sql, params)
+
+    def get_books(self, basket=None, category=None):
+        """
+        Get books, optionally filtered by basket (mula/attha/tika) and category
+        
+        Returns:
+            list[Book]: Books in table order
+        """
+        sql = "SELECT id, basket, category, name, firstpage, lastpage, pagecount, abbr FROM books"
+        conditions = []
+        params = []
+        if basket is not None:
+            conditions.append("basket = ?")
+            params.append(basket)
+        if category is not None:
+            conditions.append("category = ?")
+            params.append(category)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        return [Book._make(row) for row in self._fetch_all(sql + " ORDER BY rowid", params)]
+
+    @property
+    def page_codec(self):
+        """
+        Codec of the compressed page side table, or False if pages are stored plain
+        """
+        if self._page_codec is None:
+            self._page_codec = load_codec(self.readers.get()) or False
+        return self._page_codec
+
+    def _page_columns(self):
+        """Page columns plus rowid, and the compressed blob when pages are compressed"""
+        columns = "id, bookid, page, content, paranum, rowid"
+        if self.page_codec:
+            columns += f", (SELECT data FROM {COMPRESSED_TABLE} WHERE page_id = pages.id)"
+        return columns
+
+    def _to_pages(self, rows):
+        """Page tuples from _page_columns rows, decompressing a batch at once"""
+        if not self.page_codec:
+            return [Page._make(row[:5]) for row in rows]
+        contents = self.page_codec.decompress_many(
+            row[6] if row[3] is None else None for row in rows
+        )
+        return [Page(row[0], row[1], row[2], row[3] if content is None else content, row[4])
+                for row, content in zip(rows, contents)]
+
+    def get_page(self, book_id, page):
+        """
+        One page of a book, or None (content is decompressed if stored compressed)
+        """
+        rows = self.readers.get().execute(
+            f"SELECT {self._page_columns()} FROM pages WHERE bookid = ? AND page = ? ORDER BY rowid LIMIT 1",
+            (book_id, page)
+        ).fetchall()
+        return self._to_pages(rows)[0] if rows else None
+
+    def iter_page_contents(self, batch_size=2000):
+        """
+        Bulk scan of (bookid, page, content) in table order
+        
+        With compressed pages this reads the side table sequentially and
+        decompresses each batch in one call; otherwise it reads pages.content.
+        
+        Yields:
+            tuple: (bookid, page, content)
+        """
+        conn = self.readers.get()
+        if self.page_codec:
+            cursor = conn.execute(
+                f"SELECT p.bookid, p.page, p.content, c.data FROM pages p "
+                f"LEFT JOIN {COMPRESSED_TABLE} c ON c.page_id = p.id ORDER BY p.rowid"
+            )
+        else:
+            cursor = conn.execute("SELECT bookid, page, content, NULL FROM pages ORDER BY rowid")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            if self.page_codec:
+                contents = self.page_codec.decompress_many(
+                    data if content is None else None for _, _, content, data in rows
+                )
+            else:
+                contents = [None] * len(rows)
+            for (bookid, page, content, _), decompressed in zip(rows, contents):
+                yield bookid, page, content if decompressed is None else decompressed
+
+    def iter_pages(self, book_id=None, batch_size=500, limit=None):
+        """
+        Stream pages ordered by (bookid, page) using keyset pagination
+        
+        Each batch continues after the last key seen, so memory stays bounded
+        and no OFFSET scan is needed. rowid breaks ties between duplicate keys.
+        Compressed page contents are decompressed batch by batch.
+        
+        Args:
+            book_id (str): Only pages of this book (all books if None)
+            batch_size (int): Rows fetched per query
+            limit (int): Stop after this many pages
+            
+        Yields:
+            Page
+        """
+        conn = self.readers.get()
+        columns = self._page_columns()
+        if book_id is None:
+            first_sql = f"SELECT {columns} FROM pages ORDER BY bookid, page, rowid LIMIT ?"
+            next_sql = (f"SELECT {columns} FROM pages WHERE (bookid, page, rowid) > (?, ?, ?) "
+                        "ORDER BY bookid, page, rowid LIMIT ?")
+        else:
+            first_sql = f"SELECT {columns} FROM pages WHERE bookid = ? ORDER BY page, rowid LIMIT ?"
+            next_sql = (f"SELECT {columns} FROM pages WHERE bookid = ? AND (page, rowid) > (?, ?) "
+                        "ORDER BY page, rowid LIMIT ?")
+        
+        remaining = limit
+        last_row = None
+        while remaining is None or remaining > 0:
+            size = batch_size if remaining is None else min(batch_size, remaining)
+            if last_row is None:
+                params = (size,) if book_id is None else (book_id, size)
+                rows = conn.execute(first_sql, params).fetchall()
+            elif book_id is None:
+                rows = conn.execute(next_sql, (last_row[1], last_row[2], last_row[5], size)).fetchall()
+            else:
+                rows = conn.execute(next_sql, (book_id, last_row[2], last_row[5], size)).fetchall()
+            if not rows:
+                break
+            yield from self._to_pages(rows)
+            last_row = rows[-1]
+            if remaining is not None:
+                remaining -= len(rows)
+            if len(rows) < size:
+                break
+
+    def get_pages_by_book(self, book_id, limit=None, batch_size=500):
+        """
+        Pages of one book in page order, as a generator (see iter_pages)
+        """
+        return self.iter_pages(book_id, batch_size=batch_size, limit=limit)
+
+    def get_paragraphs(self, book_id, first_page=None, last_page=None):
+        """
+        Get paragraph/page mappings of a book, optionally for a page range (inclusive)
+        
+        Returns:
+            list[Paragraph]: Ordered by page and paragraph number
+        """
+        sql = ("SELECT book_id, paragraph_number, page_number, book_abbrv FROM paragraphs "
+               "WHERE book_id = ?")
+        params = [book_id]
+        if first_page is not None:
+            sql += " AND page_number >= ?"
+            params.append(first_page)
+        if last_page is not None:
+            sql += " AND page_number <= ?"
+            params.append(last_page)
+        rows = self._fetch_all(sql + " ORDER BY page_number, paragraph_number, rowid", params)
+        return [Paragraph._make(row) for row in rows]
+
+    def get_tocs(self, book_id):
+        """
+        Get TOC entries of a book ordered by page number
+        
+        Returns:
+            list[TocEntry]
+        """
+        rows = self._fetch_all(
+            "SELECT book_id, name, type, page_number FROM tocs WHERE book_id = ? ORDER BY page_number, rowid",
+            (book_id,)
+        )
+        return [TocEntry._make(row) for row in rows]
+
+    @property
+    def dictionary(self):
+        """
+        Dictionary lookup engine (exact, prefix and inflection-tolerant lookups)
+        
+        The index is built next to the database on first use.
+        """
+        if self._dictionary is None:
+            from dictionary_lookup import DictionaryLookup
+            self._dictionary = DictionaryLookup(self.db_path)
+        return self._dictionary
+
+    def commentary_pages(self, book_id, paragraph, level=None):
+        """
+        Commentary pages for a root-text paragraph, from the exported cross-reference shards
+        
+        Args:
+            book_id (str): Base book id
+            paragraph (int): Paragraph number
+            level (int): 1 = aṭṭhakathā, 2 = ṭīkā, None = both
+            
+        Returns:
+            list[CommentaryRef]: (book_id, page, level) entries
+        """
+        if self._crossref is None:
+            from crossref import CrossReferenceIndex, default_crossref_dir
+            self._crossref = CrossReferenceIndex(default_crossref_dir(self.db_path))
+        return self._crossref.lookup(book_id, paragraph, level)
+
+    def search(self, query, book=None, limit=20, offset=0, column=None, raw=False):
+        """
+        Full-text search over page contents using the FTS5 index
+        
+        Build the index first with search_index.py.
+        
+        Args:
+            query (str): Text to find (matched as a phrase unless raw)
+            book (str): Only pages of this book id
+            limit (int): Maximum number of hits
+            offset (int): Hits to skip (for paging through results)
+            column (str): 'content' or 'content_iast' (default: any indexed column)
+            raw (bool): Pass query through as FTS5 syntax (AND/OR/NEAR, prefixes)
+            
+        Returns:
+            list[SearchHit]: Best matches first, with <b>-highlighted snippets.
+            Queries shorter than the trigram index can match (TRIGRAM_MIN_LENGTH)
+            are answered by a substring scan instead, in page order.
+            A warning is logged when the index was built from a different
+            version of the database.
+        """
+        if not query or not query.strip():
+            return []
+        if self._search_readers is None:
+            if not os.path.exists(self.search_index_path):
+                raise FileNotFoundError(
+                    f"Search index not found: {self.search_index_path} (build it with search_index.py)"
+                )
+            self._search_readers = ConnectionFactory(self.search_index_path)
+            self._search_meta = dict(self._search_readers.get().execute("SELECT key, value FROM search_meta"))
+            if (os.path.exists(self.db_path)
+                    and self._search_meta.get('source') != database_fingerprint(self.db_path)):
+                logger.warning(f"Search index {self.search_index_path} was not built from the current "
+                               f"{self.db_path}; results may be stale (rebuild it with search_index.py)")
+        
+        if not raw and self._search_meta.get('tokenizer') == 'trigram' and len(query) < TRIGRAM_MIN_LENGTH:
+            return self._scan_search(query, book, limit, offset, column)
+        
+        sql = (f"SELECT bookid, page, snippet({FTS_TABLE}, -1, '<b>', '</b>', '…', 16) "
+               f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?")
+        params = [to_match_expression(query, column, raw)]
+        if book is not None:
+            sql += " AND bookid = ?"
+            params.append(book)
+        sql += " ORDER BY rank LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
+        cursor = self._search_readers.get().execute(sql, params)
+        return [SearchHit._make(row) for row in cursor]
+
+    def _scan_search(self, query, book, limit, offset, column):
+        """Substring scan for queries too short for the trigram index, in page order"""
+        if column:
+            if column not in ('content', 'content_iast'):
+                raise ValueError(f"Unknown search column: {column}")
+            columns = [column]
+        else:
+            columns = ['content'] + (['content_iast'] if self._search_meta.get('iast') == '1' else [])
+        sql = (f"SELECT bookid, page, {', '.join(columns)} FROM {FTS_TABLE} "
+               f"WHERE ({' OR '.join(f'instr({name}, ?) > 0' for name in columns)})")
+        params = [query] * len(columns)
+        if book is not None:
+            sql += " AND bookid = ?"
+            params.append(book)
+        sql += " ORDER BY rowid LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
+        hits = []
+        for bookid, page, *texts in self._search_readers.get().execute(sql, params):
+            snippet = next(filter(None, (scan_snippet(text, query) for text in texts)), '')
+            hits.append(SearchHit(bookid, page, snippet))
+        return hits
+
+    def bulk_select(self, table_name, fields=None, where=None, params=(), orderby=None, as_numpy=False):
+        """
+        Bulk read that bypasses pyDAL Row construction
+        
+        Runs the equivalent SELECT on the raw sqlite3 connection. Column names
+        come from the table definitions in _define_models, so connect() first.
+        pages.content is decompressed when pages are stored compressed.
+        
+        Args:
+            table_name (str): Table defined in _define_models
+            fields (list): Column names (default: all defined fields, in order)
+            where (str): Optional SQL condition using ? placeholders
+            params (tuple): Values for the placeholders
+            orderby (str): Optional ORDER BY clause
+            as_numpy (bool): Return {column: numpy array} instead of tuples
+            
+        Returns:
+            list[tuple] rows in field order, or dict of column arrays when as_numpy
+        """
+        if self.db is None:
+            raise RuntimeError("bulk_select needs connect() for the table definitions")
+        table = self.db[table_name]
+        names = list(fields) if fields else list(table.fields)
+        unknown = [name for name in names if name not in table.fields]
+        if unknown:
+            raise ValueError(f"Unknown field(s) for {table_name}: {', '.join(unknown)}")
+        
+        column_list = ", ".join(f'"{name}"' for name in names)
+        # Compressed pages: fetch the blob too and decompress where content is NULL
+        decompress = table_name == 'pages' and 'content' in names and self.page_codec
+        if decompress:
+            column_list += f', (SELECT data FROM {COMPRESSED_TABLE} WHERE page_id = "pages".id)'
+        sql = f'SELECT {column_list} FROM "{table_name}"'
+        if where:
+            sql += f" WHERE {where}"
+        if orderby:
+            sql += f" ORDER BY {orderby}"
+        rows = self.readers.get().execute(sql, params).fetchall()
+        if decompress:
+            position = names.index('content')
+            contents = self.page_codec.decompress_many(
+                row[-1] if row[position] is None else None for row in rows
+            )
+            rows = [row[:position] + (row[position] if content is None else content,) + row[position + 1:-1]
+                    for row, content in zip(rows, contents)]
+        if not as_numpy:
+            return rows
+        return self._columns_to_numpy(table, names, rows)
+
+    @staticmethod
+    def _columns_to_numpy(table, names, rows):
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("as_numpy=True requires numpy (pip install numpy)") from None
+        
+        columns = list(zip(*rows)) if rows else [()] * len(names)
+        arrays = {}
+        for name, values in zip(names, columns):
+            field_type = table[name].type
+            if field_type in ('integer', 'bigint', 'id', 'boolean'):
+                if None in values:
+                    # NULLs have no integer representation
+                    arrays[name] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+                else:
+                    arrays[name] = np.array(values, dtype=np.int64)
+            elif field_type == 'double':
+                arrays[name] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            else:
+                arrays[name] = np.array(values, dtype=object)
+        return arrays
+
     def _define_models(self):
         """
         Define database models based on actual database structure
         """
+        from pydal import Field
         
         # Pages table - Individual pages of text  
         self.db.define_table('pages',
@@ -154,6 +582,12 @@ class TipitakaDAL:
         """
         if self.db:
             self.db.close()
+        if self._readers is not None:
+            self._readers.close_all()
+        if self._search_readers is not None:
+            self._search_readers.close_all()
+        if self.query_cache is not None:
+            self.query_cache.close()
     
     def __enter__(self):
         """
@@ -192,8 +626,8 @@ if __name__ == "__main__":
         with TipitakaDAL() as dal:
             print("Connected to Tipitaka database successfully!")
             
-            # Get root books
-            books = dal.get_books()
+            # Get root (mula) books
+            books = dal.get_books(basket='mula')
             print(f"\nFound {len(books)} root books:")
             for book in books:
                 print(f"  - {book.name} ({book.id})")
@@ -204,7 +638,7 @@ if __name__ == "__main__":
                 pages = dal.get_pages_by_book(first_book.id, limit=5)
                 print(f"\nFirst 5 pages of '{first_book.name}':")
                 for page in pages:
-                    print(f"  Page {page.page_number}: {len(page.content or '')} characters")
+                    print(f"  Page {page.page}: {len(page.content or '')} characters")
     
     except Exception as e:
         print(f"Error: {e}")
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Lazy read-only repository for the Tipitaka Pali database
+Each method fetches only the columns and rows a build stage needs; large tables
+are streamed through a cursor in chunks instead of being materialized at once
+"""
+
+import os
+import sqlite3
+import sys
+import tracemalloc
+from collections import defaultdict, namedtuple
+from contextlib import closing
+from typing import Dict, Iterator, List, Optional
+
+from page_compression import COMPRESSED_TABLE, load_codec
+from sqlite_profile import connect_read_only
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+Category = namedtuple('Category', ['id', 'name', 'basket'])
+Book = namedtuple('Book', ['id', 'basket', 'category', 'name', 'firstpage', 'lastpage', 'pagecount', 'abbr'])
+TocEntry = namedtuple('TocEntry', ['book_id', 'name', 'type', 'page_number'])
+Page = namedtuple('Page', ['id', 'bookid', 'page', 'content', 'paranum'])
+Paragraph = namedtuple('Paragraph', ['book_id', 'paragraph_number', 'page_number', 'book_abbrv'])
+
+# Indexes supporting the repository queries; created only on request (create_indexes)
+INDEXES = {
+    'idx_tocs_book_page': 'tocs (book_id, page_number)',
+    'idx_books_basket': 'books (basket)',
+    'idx_pages_book_page': 'pages (bookid, page)',
+}
+
+
+class TipitakaRepository:
+    """
+    Read-only data access that loads rows on demand
+    """
+
+    def __init__(self, db_path=None, chunk_size=1000, query_cache=None):
+        """
+        Args:
+            db_path (str): Path to the SQLite database file
+            chunk_size (int): Rows fetched per cursor round trip when streaming
+            query_cache (QueryCache): Memoizes the metadata queries (categories, books, TOCs)
+        """
+        if db_path is None:
+            current_dir = os.path.dirname(os.path.abspath(__file__))
+            db_path = os.path.join(current_dir, 'tipitaka_pali.db')
+
+        self.db_path = db_path
+        self.chunk_size = chunk_size
+        self.query_cache = query_cache
+        self.conn = None
+        self._page_codec = None
+
+    def connect(self):
+        """Open the read-only database connection"""
+        if self.conn is None:
+            self.conn = connect_read_only(self.db_path)
+        return self.conn
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _stream(self, sql, params, record_type) -> Iterator:
+        """Yield records from a query, fetching chunk_size rows at a time"""
+        cursor = self.connect().execute(sql, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(self.chunk_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield record_type._make(row)
+        finally:
+            cursor.close()
+
+    def _query(self, sql, params, record_type) -> Iterator:
+        """Records of a query: streamed, or from the query cache when one is set"""
+        if self.query_cache is None:
+            return self._stream(sql, params, record_type)
+        rows = self.query_cache.fetchall(self.connect().execute, sql, params)
+        return (record_type._make(row) for row in rows)
+
+    def get_categories(self) -> List[Category]:
+        return list(self._query("SELECT id, name, basket FROM category ORDER BY rowid", (), Category))
+
+    def get_books(self, basket: Optional[str] = None) -> List[Book]:
+        """Book metadata (without the large toc column), optionally for one basket"""
+        sql = "SELECT id, basket, category, name, firstpage, lastpage, pagecount, abbr FROM books"
+        params = ()
+        if basket is not None:
+            sql += " WHERE basket = ?"
+            params = (basket,)
+        return list(self._query(sql + " ORDER BY rowid", params, Book))
+
+    def get_book_tocs(self, book_id: str) -> List[TocEntry]:
+        """TOC entries of one book ordered by page number"""
+        return list(self._query(
+            "SELECT book_id, name, type, page_number FROM tocs WHERE book_id = ? ORDER BY page_number, rowid",
+            (book_id,), TocEntry
+        ))
+
+    def get_tocs_by_book(self, basket: Optional[str] = None) -> Dict[str, List[TocEntry]]:
+        """
+        All TOC entries in one ordered query, grouped by book
+
+        Each book's list has the same order as get_book_tocs.
+        """
+        sql = "SELECT book_id, name, type, page_number FROM tocs"
+        params = ()
+        if basket is not None:
+            sql += " WHERE book_id IN (SELECT id FROM books WHERE basket = ?)"
+            params = (basket,)
+        grouped: Dict[str, List[TocEntry]] = defaultdict(list)
+        for toc in self._query(sql + " ORDER BY book_id, page_number, rowid", params, TocEntry):
+            grouped[toc.book_id].append(toc)
+        return dict(grouped)
+
+    def create_indexes(self) -> List[str]:
+        """Create the supporting indexes if missing; returns the names that were created"""
+        if not os.path.exists(self.db_path):
+            raise FileNotFoundError(f"Database not found: {self.db_path}")
+        # The only write this repository does, so it uses its own writable connection
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+            created = []
+            with conn:
+                for name, target in INDEXES.items():
+                    if name not in existing:
+                        conn.execute(f"CREATE INDEX {name} ON {target}")
+                        created.append(name)
+                if created:
+                    conn.execute("ANALYZE")
+        return created
+
+    @property
+    def page_codec(self):
+        """Codec of the compressed page side table, or False if pages are stored plain"""
+        if self._page_codec is None:
+            self._page_codec = load_codec(self.connect()) or False
+        return self._page_codec
+
+    def iter_pages(self, book_id: Optional[str] = None) -> Iterator[Page]:
+        """
+        Stream pages (all books in table order, or one book by page) without holding them in memory
+
+        Contents stored compressed (page_compression.py) are decompressed chunk by chunk.
+        """
+        columns = "id, bookid, page, content, paranum"
+        if self.page_codec:
+            columns += f", (SELECT data FROM {COMPRESSED_TABLE} WHERE page_id = pages.id)"
+        if book_id is None:
+            sql, params = f"SELECT {columns} FROM pages", ()
+        else:
+            sql, params = f"SELECT {columns} FROM pages WHERE bookid = ? ORDER BY page", (book_id,)
+        if not self.page_codec:
+            return self._stream(sql, params, Page)
+        return self._stream_compressed_pages(sql, params)
+
+    def _stream_compressed_pages(self, sql, params) -> Iterator[Page]:
+        cursor = self.connect().execute(sql, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(self.chunk_size)
+                if not rows:
+                    break
+                contents = self.page_codec.decompress_many(row[5] if row[3] is None else None for row in rows)
+                for row, content in zip(rows, contents):
+                    yield Page(row[0], row[1], row[2], row[3] if content is None else content, row[4])
+        finally:
+            cursor.close()
+
+
+def peak_memory_mb() -> Optional[float]:
+    """
+    Peak memory of this process in MB
+
+    Uses the resident set size high-water mark where available, otherwise the
+    tracemalloc peak if tracing was started; None when neither is available.
+    """
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes on Linux
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    if tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    return None
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Memoized Burmese -> script transliteration for the Tipitaka builder
+Each distinct string is converted once per script; uncached strings are sent to
+aksharamukha in batches and results can be persisted between builds
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, List, Optional
+
+CACHE_FORMAT = 1
+
+# Joins a batch of strings into one aksharamukha call; a line break is left
+# untouched by every Burmese -> script conversion used by the builder
+BATCH_SEPARATOR = '\n'
+
+
+def _process(source: str, target: str, text: str) -> str:
+    # Imported on the first conversion: aksharamukha takes a while to load
+    from aksharamukha import transliterate
+    return transliterate.process(source, target, text)
+
+
+def _aksharamukha_version() -> str:
+    try:
+        from importlib.metadata import version
+        return version('aksharamukha')
+    except Exception:
+        return 'unknown'
+
+
+class TransliterationService:
+    """
+    Converts Burmese text to the builder's target scripts with per-script memoization
+    """
+
+    def __init__(self, transliteration_config: List[Dict], cache_path=None, batch_size=500):
+        """
+        Args:
+            transliteration_config (list): Builder config entries (code, from, to, correction)
+            cache_path (str): JSON file used to persist conversions, or None to keep them in memory
+            batch_size (int): Maximum number of strings joined into one aksharamukha call
+        """
+        self.configs = {config['code']: config for config in transliteration_config}
+        self.cache_path = cache_path
+        self.batch_size = batch_size
+        self._memo: Dict[str, Dict[str, str]] = {code: {} for code in self.configs}
+        self._dirty = False
+        self.stats = {'hits': 0, 'converted': 0, 'calls': 0}
+        if cache_path:
+            self.load()
+
+    def get_config(self, script_code: str) -> Optional[Dict]:
+        """Transliteration configuration for a script, or None (e.g. mymr)"""
+        return self.configs.get(script_code)
+
+    def _fingerprint(self) -> str:
+        """Identifies the config and converter the cached results were produced with"""
+        payload = json.dumps([self.configs, _aksharamukha_version()], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def load(self):
+        """Load persisted conversions; a cache from another config or converter version is ignored"""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable transliteration cache {self.cache_path}: {e}")
+            return
+        if data.get('format') != CACHE_FORMAT or data.get('fingerprint') != self._fingerprint():
+            return
+        for code, entries in data.get('scripts', {}).items():
+            if code in self._memo:
+                self._memo[code].update(entries)
+
+    def save(self):
+        """Write the cache back if new conversions were made"""
+        if not self.cache_path or not self._dirty:
+            return
+        data = {'format': CACHE_FORMAT, 'fingerprint': self._fingerprint(), 'scripts': self._memo}
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_path)
+        self._dirty = False
+
+    def snapshot(self) -> Dict[str, Dict[str, str]]:
+        """Copy of the memo, e.g. to seed worker processes"""
+        return {code: dict(entries) for code, entries in self._memo.items()}
+
+    def update(self, memo: Dict[str, Dict[str, str]]):
+        """Add conversions made elsewhere (not written back by save)"""
+        for code, entries in memo.items():
+            if code in self._memo:
+                self._memo[code].update(entries)
+
+    def convert(self, text: str, script_code: str) -> str:
+        """Convert one string (with corrections applied); unconfigured scripts return it unchanged"""
+        memo = self._memo.get(script_code)
+        if memo is None or not text or not isinstance(text, str) or text.strip() == "":
+            return text
+        if text in memo:
+            self.stats['hits'] += 1
+            return memo[text]
+        return self.convert_many([text], script_code)[text]
+
+    def convert_many(self, texts: Iterable[str], script_code: str) -> Dict[str, str]:
+        """Convert several strings, sending only the distinct uncached ones to aksharamukha"""
+        memo = self._memo.get(script_code)
+        results = {}
+        pending = []
+        for text in texts:
+            if text in results:
+                continue
+            if memo is None or not text or not isinstance(text, str) or text.strip() == "":
+                results[text] = text
+            elif text in memo:
+                self.stats['hits'] += 1
+                results[text] = memo[text]
+            else:
+                results[text] = None
+                pending.append(text)
+
+        if pending:
+            config = self.configs[script_code]
+            for start in range(0, len(pending), self.batch_size):
+                batch = pending[start:start + self.batch_size]
+                for text, converted in zip(batch, self._convert_batch(batch, config)):
+                    converted = self._apply_corrections(converted, config['correction'])
+                    memo[text] = converted
+                    results[text] = converted
+            self.stats['converted'] += len(pending)
+            self._dirty = True
+        return results
+
+    def prefetch(self, texts: Iterable[str], script_codes: Iterable[str]):
+        """Warm the memo for every script in a few batched calls"""
+        texts = list(dict.fromkeys(texts))
+        for script_code in script_codes:
+            if script_code in self._memo:
+                self.convert_many(texts, script_code)
+
+    def _convert_batch(self, batch: List[str], config: Dict) -> List[str]:
+        if len(batch) > 1 and not any(BATCH_SEPARATOR in text for text in batch):
+            try:
+                self.stats['calls'] += 1
+                converted = _process(config['from'], config['to'], BATCH_SEPARATOR.join(batch))
+                parts = converted.split(BATCH_SEPARATOR)
+                if len(parts) == len(batch):
+                    return parts
+            except Exception:
+                pass
+        # Fall back to one call per string (also reports failures individually)
+        return [self._convert_one(text, config) for text in batch]
+
+    def _convert_one(self, text: str, config: Dict) -> str:
+        try:
+            self.stats['calls'] += 1
+            return _process(config['from'], config['to'], text)
+        except Exception as e:
+            print(f"Warning: Could not convert '{text[:30]}...' to {config['to']}: {str(e)}")
+            return text
+
+    @staticmethod
+    def _apply_corrections(text: str, corrections: List[Dict]) -> str:
+        if not text or not corrections:
+            return text
+        for correction in corrections:
+            from_text = correction.get("from", "")
+            if from_text:
+                text = text.replace(from_text, correction.get("to", ""))
+        return text
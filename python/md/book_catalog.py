@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Book catalog shared by the Markdown tools
+The single copy of the book mappings and the Tipiṭaka structure, with lookups
+built once at import: code -> BookInfo (basket, section path, abbrev, volume,
+references), abbreviation/reference -> code and site directory -> code.
+The tables are validated at load time; an inconsistency raises ValueError
+"""
+
+import re
+from collections import namedtuple
+from pathlib import PurePosixPath
+from typing import Dict, List, Optional, Tuple
+
+# Book code -> directory abbreviation, Pāḷi name and accepted references
+BOOK_MAPPINGS = {
+    # Vinayapiṭaka (vi)
+    # parent directory is 'tipitaka/vi'
+    '1V': {'abbrev': 'para', 'name': 'Pārājikapāḷi', 'references': ['1V', 'vi-para', 'para']},
+    '2V': {'abbrev': 'paci', 'name': 'Pācittiyapāḷi', 'references': ['2V', 'vi-paci', 'paci']},
+    '3V': {'abbrev': 'vi-maha', 'name': 'Mahāvaggapāḷi', 'references': ['3V', 'vi-maha', 'maha']},
+    '4V': {'abbrev': 'cula', 'name': 'Cūḷavaggapāḷi', 'references': ['4V', 'vi-cula', 'cula']},
+    '5V': {'abbrev': 'pari', 'name': 'Parivārapāḷi', 'references': ['5V', 'vi-pari', 'pari']},
+
+    # Dīghanikāya (dn)
+    # parent directory is 'tipitaka/su/dn'
+    '6D': {'abbrev': 'sila', 'name': 'Sīlakkhandhavaggapāḷi', 'references': ['6D', 'dn-sila', 'sila']},
+    '7D': {'abbrev': 'dn-maha', 'name': 'Mahāvaggapāḷi', 'references': ['7D', 'dn-maha', 'maha']},
+    '8D': {'abbrev': 'pthi', 'name': 'Pāthikavaggapāḷi', 'references': ['8D', 'dn-pthi', 'pthi']},
+
+    # Majjhimanikāya (mn)
+    # parent directory is 'tipitaka/su/mn'
+    '9M': {'abbrev': 'mula', 'name': 'Mūlapaṇṇāsapāḷi', 'references': ['9M', 'mn-mula', 'mula']},
+    '10M': {'abbrev': 'majj', 'name': 'Majjhimapaṇṇāsapāḷi', 'references': ['10M', 'mn-majj', 'majj']},
+    '11M': {'abbrev': 'upar', 'name': 'Uparipaṇṇāsapāḷi', 'references': ['11M', 'mn-upar', 'upar']},
+
+    # Saṃyuttanikāya (sn)
+    # parent directory is 'tipitaka/su/sn'
+    '12S1': {'abbrev': 'saga', 'name': 'Sagāthāvaggasaṃyuttapāḷi', 'references': ['12S1', 'sn-saga', 'saga']},
+    '12S2': {'abbrev': 'nida', 'name': 'Nidānavaggasaṃyuttapāḷi', 'references': ['12S2', 'sn-nida', 'nida']},
+    '13S3': {'abbrev': 'khan', 'name': 'Khandhavaggasaṃyuttapāḷi', 'references': ['13S3', 'sn-khan', 'khan']},
+    '13S4': {'abbrev': 'sala', 'name': 'Saḷāyatanavaggasaṃyuttapāḷi', 'references': ['13S4', 'sn-sala', 'sala']},
+    '14S5': {'abbrev': 'sn-maha', 'name': 'Mahāvaggasaṃyuttapāḷi', 'references': ['14S5', 'sn-maha', 'maha']},
+
+    # Aṅguttaranikāya (an)
+    # parent directory is 'tipitaka/su/an'
+    '15A1': {'abbrev': 'a1', 'name': 'Ekakanipātapāḷi', 'references': ['15A1', 'an-eka', 'a1']},
+    '15A2': {'abbrev': 'a2', 'name': 'Dukanipātapāḷi', 'references': ['15A2', 'an-duka', 'a2']},
+    '15A3': {'abbrev': 'a3', 'name': 'Tikanipātapāḷi', 'references': ['15A3', 'an-tika', 'a3']},
+    '15A4': {'abbrev': 'a4', 'name': 'Catukkanipātapāḷi', 'references': ['15A4', 'an-catu', 'a4']},
+    '16A5': {'abbrev': 'a5', 'name': 'Pañcakanipātapāḷi', 'references': ['16A5', 'an-panc', 'a5']},
+    '16A6': {'abbrev': 'a6', 'name': 'Chakkanipātapāḷi', 'references': ['16A6', 'an-chak', 'a6']},
+    '16A7': {'abbrev': 'a7', 'name': 'Sattakanipātapāḷi', 'references': ['16A7', 'an-satt', 'a7']},
+    '17A8': {'abbrev': 'a8', 'name': 'Aṭṭhakanipātapāḷi', 'references': ['17A8', 'an-atth', 'a8']},
+    '17A9': {'abbrev': 'a9', 'name': 'Navakanipātapāḷi', 'references': ['17A9', 'an-nava', 'a9']},
+    '17A10': {'abbrev': 'a10', 'name': 'Dasakanipātapāḷi', 'references': ['17A10', 'an-dasa', 'a10']},
+    '17A11': {'abbrev': 'a11', 'name': 'Ekādasakanipātapāḷi', 'references': ['17A11', 'an-ekad', 'a11']},
+
+    # Khuddakanikāya (kn)
+    # parent directory is 'tipitaka/su/kn'
+    '18Kh': {'abbrev': 'kh', 'name': 'Khuddakapāṭhapāḷi', 'references': ['18Kh', 'kn-kh', 'kh']},
+    '18Dh': {'abbrev': 'dh', 'name': 'Dhammapadapāḷi', 'references': ['18Dh', 'kn-dh', 'dh']},
+    '18Ud': {'abbrev': 'ud', 'name': 'Udānapāḷi', 'references': ['18Ud', 'kn-ud', 'ud']},
+    '18It': {'abbrev': 'it', 'name': 'Itivuttakapāḷi', 'references': ['18It', 'kn-it', 'it']},
+    '18Sn': {'abbrev': 'sn', 'name': 'Suttanipātapāḷi', 'references': ['18Sn', 'kn-sn', 'sn']},
+    '19Vv': {'abbrev': 'vv', 'name': 'Vimānavatthupāḷi', 'references': ['19Vv', 'kn-vv', 'vv']},
+    '19Pv': {'abbrev': 'pv', 'name': 'Petavatthupāḷi', 'references': ['19Pv', 'kn-pv', 'pv']},
+    '19Th1': {'abbrev': 'th1', 'name': 'Theragāthāpāḷi', 'references': ['19Th1', 'kn-thrag', 'thrag']},
+    '19Th2': {'abbrev': 'th2', 'name': 'Therīgāthāpāḷi', 'references': ['19Th2', 'kn-thrig', 'thrig']},
+    '20Ap1': {'abbrev': 'ap1', 'name': 'Therāpadānapāḷi', 'references': ['20Ap1', 'kn-thraa', 'thraa']},
+    '20Ap2': {'abbrev': 'ap2', 'name': 'Therīapadānapāḷi', 'references': ['20Ap2', 'kn-thria', 'thria']},
+    '21Bu': {'abbrev': 'bu', 'name': 'Buddhavaṃsapāḷi', 'references': ['21Bu', 'kn-bu', 'bu']},
+    '21Cp': {'abbrev': 'cp', 'name': 'Cariyāpiṭakapāḷi', 'references': ['21Cp', 'kn-cp', 'cp']},
+    '22J': {'abbrev': 'ja1', 'name': 'Jātakapāḷi 1', 'references': ['22J', 'kn-ja-1', 'ja-1']},
+    '23J': {'abbrev': 'ja2', 'name': 'Jātakapāḷi 2', 'references': ['23J', 'kn-ja-2', 'ja-2']},
+    '24Mn': {'abbrev': 'mn', 'name': 'Mahāniddesapāḷi', 'references': ['24Mn', 'kn-mn', 'mn']},
+    '25Cn': {'abbrev': 'cn', 'name': 'Cūḷaniddesapāḷi', 'references': ['25Cn', 'kn-cn', 'cn']},
+    '26Ps': {'abbrev': 'ps', 'name': 'Paṭisambhidāmaggapāḷi', 'references': ['26Ps', 'kn-ps', 'ps']},
+    '27Ne': {'abbrev': 'ne', 'name': 'Nettipāḷi', 'references': ['27Ne', 'kn-ne', 'ne']},
+    '27Pe': {'abbrev': 'pe', 'name': 'Peṭakopadesapāḷi', 'references': ['27Pe', 'kn-pe', 'pe']},
+    '28Mi': {'abbrev': 'mi', 'name': 'Milindapañhapāḷi', 'references': ['28Mi', 'kn-mi', 'mi']},
+
+    # Abhidhammapiṭaka (ab)
+    # parent directory is 'tipitaka/ab'
+    '29Dhs': {'abbrev': 'dhs', 'name': 'Dhammasaṅgaṇīpāḷi', 'references': ['29Dhs', 'ab-dhs', 'dhs']},
+    '30Vbh': {'abbrev': 'vbh', 'name': 'Vibhaṅgapāḷi', 'references': ['30Vbh', 'ab-vbh', 'vbh']},
+    '31Dht': {'abbrev': 'dht', 'name': 'Dhātukathāpāḷi', 'references': ['31Dht', 'ab-dht', 'dht']},
+    '31Pu': {'abbrev': 'pu', 'name': 'Puggalapaññattipāḷi', 'references': ['31Pu', 'ab-pu', 'pu']},
+    '32Kv': {'abbrev': 'kv', 'name': 'Kathāvatthupāḷi', 'references': ['32Kv', 'ab-kv', 'kv']},
+
+    # Yamaka (ab/yk)
+    # parent directory is 'tipitaka/ab/yk'
+    '33Y1': {'abbrev': 'y1', 'name': 'Mūlayamakapāḷi', 'references': ['33Y1', 'y1']},
+    '33Y2': {'abbrev': 'y2', 'name': 'Khandhayamakapāḷi', 'references': ['33Y2', 'y2']},
+    '33Y3': {'abbrev': 'y3', 'name': 'Āyatanayamakapāḷi', 'references': ['33Y3', 'y3']},
+    '33Y4': {'abbrev': 'y4', 'name': 'Dhātuyamakapāḷi', 'references': ['33Y4', 'y4']},
+    '33Y5': {'abbrev': 'y5', 'name': 'Saccayamakapāḷi', 'references': ['33Y5', 'y5']},
+    '34Y6': {'abbrev': 'y6', 'name': 'Saṅkhārayamakapāḷi', 'references': ['34Y6', 'y6']},
+    '34Y7': {'abbrev': 'y7', 'name': 'Anusayayamakapāḷi', 'references': ['34Y7', 'y7']},
+    '34Y8': {'abbrev': 'y8', 'name': 'Cittayamakapāḷi', 'references': ['34Y8', 'y8']},
+    '35Y9': {'abbrev': 'y9', 'name': 'Dhammayamakapāḷi', 'references': ['35Y9', 'y9']},
+    '35Y10': {'abbrev': 'y10', 'name': 'Indriyayamakapāḷi', 'references': ['35Y10', 'y10']},
+
+    # Paṭṭhāna (ab/pt) - Dhammānuloma
+    # parent directory is 'tipitaka/ab/pt/anu'
+    '36P1': {'abbrev': 'p1-1', 'name': 'Tikapaṭṭhānapāḷi 1', 'references': ['36P1', 'pt-anu-tika-1', 'p1.1']},
+    '37P1': {'abbrev': 'p1-2', 'name': 'Tikapaṭṭhānapāḷi 2', 'references': ['37P1', 'pt-anu-tika-2', 'p1.2']},
+    '38P2': {'abbrev': 'p2', 'name': 'Dukapaṭṭhānapāḷi', 'references': ['38P2', 'pt-anu-duka', 'p2']},
+    '39P3': {'abbrev': 'p3', 'name': 'Dukatikapaṭṭhānapāḷi', 'references': ['39P3', 'pt-anu-dukatika', 'p3']},
+    '39P4': {'abbrev': 'p4', 'name': 'Tikadukapaṭṭhānapāḷi', 'references': ['39P4', 'pt-anu-tikaduka', 'p4']},
+    '39P5': {'abbrev': 'p5', 'name': 'Tikatikapaṭṭhānapāḷi', 'references': ['39P5', 'pt-anu-tikatika', 'p5']},
+    '39P6': {'abbrev': 'p6', 'name': 'Dukadukapaṭṭhānapāḷi', 'references': ['39P6', 'pt-anu-dukaduka', 'p6']},
+
+    # Paṭṭhāna - Dhammapaccanīya
+    # parent directory is 'tipitaka/ab/pt/pac'
+    '40P7': {'abbrev': 'p7', 'name': 'Tikapaṭṭhānapāḷi', 'references': ['40P7', 'pt-pac-tika', 'p7']},
+    '40P8': {'abbrev': 'p8', 'name': 'Dukapaṭṭhānapāḷi', 'references': ['40P8', 'pt-pac-duka', 'p8']},
+    '40P9': {'abbrev': 'p9', 'name': 'Dukatikapaṭṭhānapāḷi', 'references': ['40P9', 'pt-pac-dukatika', 'p9']},
+    '40P10': {'abbrev': 'p10', 'name': 'Tikadukapaṭṭhānapāḷi', 'references': ['40P10', 'pt-pac-tikaduka', 'p10']},
+    '40P11': {'abbrev': 'p11', 'name': 'Tikatikapaṭṭhānapāḷi', 'references': ['40P11', 'pt-pac-tikatika', 'p11']},
+    '40P12': {'abbrev': 'p12', 'name': 'Dukadukapaṭṭhānapāḷi', 'references': ['40P12', 'pt-pac-dukaduka', 'p12']},
+
+    # Paṭṭhāna - Dhammānulomapaccanīya
+    # parent directory is 'tipitaka/ab/pt/anupac'
+    '40P13': {'abbrev': 'p13', 'name': 'Tikapaṭṭhānapāḷi', 'references': ['40P13', 'pt-anupac-tika', 'p13']},
+    '40P14': {'abbrev': 'p14', 'name': 'Dukapaṭṭhānapāḷi', 'references': ['40P14', 'pt-anupac-duka', 'p14']},
+    '40P15': {'abbrev': 'p15', 'name': 'Dukatikapaṭṭhānapāḷi', 'references': ['40P15', 'pt-anupac-dukatika', 'p15']},
+    '40P16': {'abbrev': 'p16', 'name': 'Tikadukapaṭṭhānapāḷi', 'references': ['40P16', 'pt-anupac-tikaduka', 'p16']},
+    '40P17': {'abbrev': 'p17', 'name': 'Tikatikapaṭṭhānapāḷi', 'references': ['40P17', 'pt-anupac-tikatika', 'p17']},
+    '40P18': {'abbrev': 'p18', 'name': 'Dukadukapaṭṭhānapāḷi', 'references': ['40P18', 'pt-anupac-dukaduka', 'p18']},
+
+    # Paṭṭhāna - Dhammapaccanīyānuloma
+    # parent directory is 'tipitaka/ab/pt/pacanu'
+    '40P19': {'abbrev': 'p19', 'name': 'Tikapaṭṭhānapāḷi', 'references': ['40P19', 'pt-pacanu-tika', 'p19']},
+    '40P20': {'abbrev': 'p20', 'name': 'Dukapaṭṭhānapāḷi', 'references': ['40P20', 'pt-pacanu-duka', 'p20']},
+    '40P21': {'abbrev': 'p21', 'name': 'Dukatikapaṭṭhānapāḷi', 'references': ['40P21', 'pt-pacanu-dukatika', 'p21']},
+    '40P22': {'abbrev': 'p22', 'name': 'Tikadukapaṭṭhānapāḷi', 'references': ['40P22', 'pt-pacanu-tikaduka', 'p22']},
+    '40P23': {'abbrev': 'p23', 'name': 'Tikatikapaṭṭhānapāḷi', 'references': ['40P23', 'pt-pacanu-tikatika', 'p23']},
+    '40P24': {'abbrev': 'p24', 'name': 'Dukadukapaṭṭhānapāḷi', 'references': ['40P24', 'pt-pacanu-dukaduka', 'p24']},
+}
+
+# Hierarchical structure: each section lists its books under "books"
+STRUCTURE = {
+    'tipitaka': {
+        'vi': {  # Vinayapiṭaka
+            'books': ['1V', '2V', '3V', '4V', '5V']
+        },
+        'su': {  # Suttantapiṭaka
+            'dn': {  # Dīghanikāya
+                'books': ['6D', '7D', '8D']
+            },
+            'mn': {  # Majjhimanikāya
+                'books': ['9M', '10M', '11M']
+            },
+            'sn': {  # Saṃyuttanikāya
+                'books': ['12S1', '12S2', '13S3', '13S4', '14S5']
+            },
+            'an': {  # Aṅguttaranikāya
+                'books': ['15A1', '15A2', '15A3', '15A4', '16A5', '16A6', '16A7', '17A8', '17A9', '17A10', '17A11']
+            },
+            'kn': {  # Khuddakanikāya
+                'books': ['18Kh', '18Dh', '18Ud', '18It', '18Sn', '19Vv', '19Pv', '19Th1', '19Th2', 
+                         '20Ap1', '20Ap2', '21Bu', '21Cp', '22J', '23J', '24Mn', '25Cn', '26Ps', '27Ne', '27Pe', '28Mi']
+            }
+        },
+        'ab': {  # Abhidhammapiṭaka
+            'books': ['29Dhs', '30Vbh', '31Dht', '31Pu', '32Kv'],
+            'yk': {  # Yamaka
+                'books': ['33Y1', '33Y2', '33Y3', '33Y4', '33Y5', '34Y6', '34Y7', '34Y8', '35Y9', '35Y10']
+            },
+            'pt': {  # Paṭṭhāna
+                'anu': {  # Dhammānuloma
+                    'books': ['36P1', '37P1', '38P2', '39P3', '39P4', '39P5', '39P6']
+                },
+                'pac': {  # Dhammapaccanīya
+                    'books': ['40P7', '40P8', '40P9', '40P10', '40P11', '40P12']
+                },
+                'anupac': {  # Dhammānulomapaccanīya
+                    'books': ['40P13', '40P14', '40P15', '40P16', '40P17', '40P18']
+                },
+                'pacanu': {  # Dhammapaccanīyānuloma
+                    'books': ['40P19', '40P20', '40P21', '40P22', '40P23', '40P24']
+                }
+            }
+        }
+    }
+}
+
+# section: path below 'tipitaka' (e.g. ('su', 'dn')); path: site directory (e.g. 'tipitaka/su/dn/sila')
+BookInfo = namedtuple('BookInfo', ['code', 'abbrev', 'name', 'basket', 'section', 'volume', 'references', 'path'])
+
+
+def _walk(node: dict, section: Tuple[str, ...] = ()):
+    """(section, code) pairs in structure order: a section's own books, then its subsections"""
+    for code in node.get('books', []):
+        yield section, code
+    for key, child in node.items():
+        if key != 'books' and isinstance(child, dict):
+            yield from _walk(child, section + (key,))
+
+
+def _volume(code: str) -> Optional[int]:
+    match = re.match(r'(\d+)', code)
+    return int(match.group(1)) if match else None
+
+
+def _build_catalog() -> Dict[str, BookInfo]:
+    problems = []
+    books: Dict[str, BookInfo] = {}
+    listed = set()
+    for section, code in _walk(STRUCTURE['tipitaka']):
+        if code in listed:
+            problems.append(f"{code} is listed twice in the structure")
+            continue
+        listed.add(code)
+        info = BOOK_MAPPINGS.get(code)
+        if info is None:
+            problems.append(f"{code} is in the structure but has no book mapping")
+            continue
+        if not info.get('abbrev') or not info.get('name'):
+            problems.append(f"{code} needs both an abbrev and a name")
+            continue
+        if _volume(code) is None:
+            problems.append(f"{code} does not start with a volume number")
+            continue
+        references = [code, info['abbrev']] + list(info.get('references', []))
+        references = tuple(dict.fromkeys(ref.strip().lower() for ref in references if ref and ref.strip()))
+        books[code] = BookInfo(code, info['abbrev'], info['name'], section[0], section, _volume(code),
+                               references, '/'.join(('tipitaka',) + section + (info['abbrev'],)))
+    for code in BOOK_MAPPINGS:
+        if code not in listed:
+            problems.append(f"{code} has a book mapping but is not in the structure")
+    seen_abbrevs: Dict[str, str] = {}
+    for book in books.values():
+        if book.abbrev in seen_abbrevs:
+            problems.append(f"{book.code} and {seen_abbrevs[book.abbrev]} share the abbrev '{book.abbrev}'")
+        seen_abbrevs[book.abbrev] = book.code
+    if problems:
+        raise ValueError("Invalid book catalog:\n  " + "\n  ".join(problems))
+    # Keep the BOOK_MAPPINGS order so iteration matches the original tables
+    return {code: books[code] for code in BOOK_MAPPINGS}
+
+
+BOOKS: Dict[str, BookInfo] = _build_catalog()
+# Codes in structure order (vi, su, ab; each section's own books before its subsections)
+ALL_BOOKS: List[str] = [code for _, code in _walk(STRUCTURE['tipitaka'])]
+BY_ABBREV: Dict[str, str] = {book.abbrev: book.code for book in BOOKS.values()}
+BY_PATH: Dict[str, str] = {book.path: book.code for book in BOOKS.values()}
+# Lower-cased reference -> code; a shared reference ('maha') resolves to the later book
+BY_REFERENCE: Dict[str, str] = {ref: book.code for book in BOOKS.values() for ref in book.references}
+SECTION_BOOKS: Dict[str, List[str]] = {}
+for _code in ALL_BOOKS:
+    SECTION_BOOKS.setdefault(BOOKS[_code].basket, []).append(_code)
+MAX_PATH_DEPTH = max(book.path.count('/') + 1 for book in BOOKS.values())
+
+
+def get_book(code: str) -> Optional[BookInfo]:
+    return BOOKS.get(code)
+
+
+def basket_of(code: str) -> Optional[str]:
+    """'vi', 'su' or 'ab' (None for unknown codes)"""
+    book = BOOKS.get(code)
+    return book.basket if book else None
+
+
+def books_in_section(section: str) -> List[str]:
+    """All books of a basket (vi, su, ab), including its subsections"""
+    return list(SECTION_BOOKS.get(section, []))
+
+
+def index_link(code: str, locale: str = 'romn') -> str:
+    """Site link of a book's index page"""
+    book = BOOKS.get(code)
+    if book is None:
+        return f"/{locale}/tipitaka/{code.lower()}/"
+    return f"/{locale}/{book.path}/"
+
+
+def code_for_path(relative_dir: str) -> Optional[str]:
+    """
+    Book owning a directory given relative to the locale root
+    (e.g. 'tipitaka/su/dn/sila/1' -> '6D'); None outside any book
+    """
+    segments = relative_dir.replace('\\', '/').strip('/').split('/')
+    for depth in range(min(len(segments), MAX_PATH_DEPTH), 2, -1):
+        code = BY_PATH.get('/'.join(segments[:depth]))
+        if code:
+            return code
+    return None
+
+
+def output_name(source_name: str) -> str:
+    """Page file name of a source file inside a book directory ('1.2--5.md' -> '1-2–5.mdx')"""
+    # Replace dots with dashes in filenames และแปลง -- เป็น –
+    stem = PurePosixPath(source_name).stem.lower().replace('.', '-')
+    return re.sub(r'(\d+)--(\d+)', r'\1–\2', stem) + '.mdx'
+
+
+def output_path(source: str, locale: str = 'romn') -> Optional[str]:
+    """
+    Page of a source file given relative to the source root, relative to the output root
+    (e.g. '6D/1.md' -> 'romn/tipitaka/su/dn/sila/1.mdx', '6D.md' -> '.../sila/index.mdx')
+    """
+    parts = PurePosixPath(source).parts
+    book = BOOKS.get(PurePosixPath(parts[0]).stem if len(parts) == 1 else parts[0])
+    if book is None:
+        return None
+    if len(parts) == 1:
+        return f"{locale}/{book.path}/index.mdx"
+    directories = [name.lower().replace('.', '-') for name in parts[1:-1]]
+    return '/'.join([locale, book.path, *directories, output_name(parts[-1])])
+
+
+def sort_key(code: str) -> tuple:
+    """Order book codes by volume number, then code"""
+    book = BOOKS.get(code)
+    return (book.volume if book else _volume(code) or 999, code)
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Dependency graph of the migration outputs
+Every output written by migrate_tipitaka.py records the inputs it was built from,
+so an incremental rebuild can ask which outputs a changed source invalidates:
+- source: the .md file itself
+- namo: the book's 0.md, whose Namo formula get_namo_formula puts in index.mdx
+- order: the directory listing (natural sort) and, when link order was used, the
+  parent .md (_order_entries_from_parent) that fix the output's sidebar order
+- divisions: the p= page of a division depends on how many divisions with the
+  same number came before it in the book (_division_page_state), so outputs keep
+  the division numbers they contain and consumed, in migration order
+Stored as JSON with one entry per (book, locale) unit, relative paths throughout.
+"""
+
+import json
+import os
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from book_catalog import output_path
+
+GRAPH_FORMAT = 1
+DEFAULT_GRAPH_PATH = Path(__file__).parent / 'migration-deps.json'
+
+# Division marker lines, as matched by convert_to_mdx_with_components
+DIVISION_LINE = re.compile(r'^\((\d+)(?:(?:--|–)\d+)?\.\)$')
+
+
+def division_keys(text: str) -> Dict[str, int]:
+    """Division numbers (normalized like _normalize_division_key) and how often each occurs"""
+    keys = Counter()
+    for line in text.split('\n'):
+        match = DIVISION_LINE.match(line.strip())
+        if match:
+            keys[match.group(1)] += 1
+    return dict(keys)
+
+
+def unit_key(book_code: str, locale: str) -> str:
+    return f"{book_code}/{locale}"
+
+
+def _changed_keys(old: Dict[str, int], new: Dict[str, int]) -> set:
+    return {key for key in set(old) | set(new) if old.get(key, 0) != new.get(key, 0)}
+
+
+class DependencyGraph:
+    """
+    Output records per (book, locale) unit, in migration order
+
+    A record is a dict with:
+        source: source file relative to the source directory
+        output: output file relative to the target directory
+        depends_on: {input: kind} besides the source (kind is 'namo' or 'order';
+            directories are given with a trailing slash and stand for their listing)
+        divisions: {division number: pages consumed} for books with a page map
+        source_divisions: {division number: occurrences} in the source
+    """
+
+    def __init__(self, units: Optional[Dict[str, List[dict]]] = None):
+        self.units: Dict[str, List[dict]] = units if units is not None else {}
+        self._lock = threading.Lock()
+
+    def start_unit(self, book_code: str, locale: str):
+        """Forget the records of a unit that is about to be migrated from the start"""
+        with self._lock:
+            self.units[unit_key(book_code, locale)] = []
+
+    def record(self, book_code: str, locale: str, record: dict):
+        """Add an output record to its unit, replacing an earlier record of the same source"""
+        with self._lock:
+            records = self.units.setdefault(unit_key(book_code, locale), [])
+            for index, existing in enumerate(records):
+                if existing['source'] == record['source']:
+                    records[index] = record
+                    return
+            records.append(record)
+
+    def reorder_unit(self, book_code: str, locale: str, sources: List[str]):
+        """Put a unit's records in the given source order, dropping sources no longer migrated"""
+        with self._lock:
+            records = {r['source']: r for r in self.units.get(unit_key(book_code, locale), [])}
+            self.units[unit_key(book_code, locale)] = [records[s] for s in sources if s in records]
+
+    def update(self, units: Dict[str, List[dict]]):
+        """Take over the units of another graph (e.g. returned by a locale worker)"""
+        with self._lock:
+            self.units.update(units)
+
+    def division_states(self, book_code: str, locale: str) -> Dict[str, tuple]:
+        """{source: (state before, state after)} of the division page state through a unit"""
+        states = {}
+        state: Dict[str, int] = {}
+        for record in self.units.get(unit_key(book_code, locale), []):
+            after = dict(state)
+            for key, consumed in record.get('divisions', {}).items():
+                after[key] = after.get(key, 0) + consumed
+            states[record['source']] = (state, after)
+            state = after
+        return states
+
+    @classmethod
+    def load(cls, path=DEFAULT_GRAPH_PATH) -> 'DependencyGraph':
+        """Read a saved graph; an empty graph when the file does not exist"""
+        path = Path(path)
+        if not path.exists():
+            return cls()
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('format') != GRAPH_FORMAT:
+            raise ValueError(f"{path}: unsupported dependency graph format {data.get('format')}")
+        return cls(data['units'])
+
+    def save(self, path=DEFAULT_GRAPH_PATH):
+        """Write the graph, keeping units of an existing file that this graph does not have"""
+        path = Path(path)
+        saved = DependencyGraph.load(path)
+        with self._lock:
+            saved.units.update(self.units)
+        data = {'format': GRAPH_FORMAT, 'units': dict(sorted(saved.units.items()))}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(path.name + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp_path, path)
+
+    def invalidated(self, changed: Iterable[str], source_dir=None) -> Dict[str, str]:
+        """
+        Outputs to rebuild when the given sources changed
+
+        Args:
+            changed: Changed, added or removed source files, relative to the source directory
+            source_dir: Current source tree; used to tell removed files from edited
+                ones and to re-count an edited file's divisions. Without it every
+                changed file is assumed to have moved and changed all its divisions.
+
+        Returns:
+            {output: reason}, reason being 'source', 'namo', 'order', 'divisions',
+            'added' (a new source) or 'removed' (the source is gone and the
+            output should be deleted)
+        """
+        changed = {Path(path).as_posix() for path in changed}
+        source_dir = Path(source_dir) if source_dir is not None else None
+        invalid: Dict[str, str] = {}
+        for unit, records in self.units.items():
+            book_code, locale = unit.split('/', 1)
+            unit_changes = {path for path in changed
+                            if path == f"{book_code}.md" or path.startswith(f"{book_code}/")}
+            if unit_changes:
+                self._invalidate_unit(records, locale, unit_changes, source_dir, invalid)
+        return invalid
+
+    @staticmethod
+    def _invalidate_unit(records: List[dict], locale: str, changed: set, source_dir: Optional[Path], invalid: Dict[str, str]):
+        position = {r['source']: index for index, r in enumerate(records)}
+        # Directories whose listing changed -> position after which sidebar orders shift (-1: all)
+        listings: Dict[str, int] = {}
+        # (first record position that may be affected, division numbers whose count changed)
+        cascades = []
+
+        def listing_changed(path: str, after: int):
+            directory = path.rsplit('/', 1)[0] + '/'
+            listings[directory] = min(listings.get(directory, after), after)
+
+        for path in changed:
+            exists = (source_dir / path).is_file() if source_dir is not None else None
+            index = position.get(path)
+            if index is None:
+                # New (or previously empty) file: its position is unknown, its divisions are all new
+                listing_changed(path, -1)
+                if exists is not False and output_path(path, locale):
+                    invalid.setdefault(output_path(path, locale), 'added' if exists else 'source')
+                if exists:
+                    cascades.append((0, set(division_keys((source_dir / path).read_text(encoding='utf-8')))))
+                continue
+            record = records[index]
+            old_keys = record.get('source_divisions', {})
+            if exists is None:
+                invalid.setdefault(record['output'], 'source')
+                listing_changed(path, -1)
+                cascades.append((0, set(old_keys)))
+            elif not exists:
+                invalid[record['output']] = 'removed'
+                listing_changed(path, index)
+                cascades.append((index, set(old_keys)))
+            else:
+                invalid.setdefault(record['output'], 'source')
+                if 'source_divisions' in record:
+                    new_keys = division_keys((source_dir / path).read_text(encoding='utf-8'))
+                    cascades.append((index, _changed_keys(old_keys, new_keys)))
+
+        for index, record in enumerate(records):
+            for dependency, kind in record.get('depends_on', {}).items():
+                if dependency in changed:
+                    invalid.setdefault(record['output'], kind)
+                    if kind == 'order':
+                        # Link order changed: the file may pass others and shift their division counts
+                        cascades.append((0, set(record.get('source_divisions', {}))))
+                elif dependency in listings and index > listings[dependency]:
+                    invalid.setdefault(record['output'], kind)
+
+        # Division numbers this unit actually maps to pages (none in scripts with other digits)
+        live_keys = set()
+        for record in records:
+            live_keys.update(record.get('divisions', {}))
+        for start, keys in cascades:
+            keys &= live_keys
+            if not keys:
+                continue
+            for record in records[start:]:
+                if keys & set(record.get('source_divisions', {})):
+                    invalid.setdefault(record['output'], 'divisions')
@@ -19,14 +19,12 @@ import subprocess
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 import argparse
+import importlib.util
 
-try:
-    from aksharamukha import transliterate
-    TRANSLITERATION_AVAILABLE = True
-except ImportError:
-    TRANSLITERATION_AVAILABLE = False
-    print("Warning: aksharamukha not available. Transliteration features disabled.")
-    print("To enable transliteration, install: pip install aksharamukha")
+from book_catalog import BOOK_MAPPINGS, sort_key
+
+# aksharamukha is imported only when a non-romn locale is converted; this just checks it is installed
+TRANSLITERATION_AVAILABLE = importlib.util.find_spec('aksharamukha') is not None
 
 
 def activate_venv():
@@ -96,120 +94,8 @@ class TipitakaTOCGenerator:
         # Pattern สำหรับ breadcrumb navigation
         self.breadcrumb_pattern = re.compile(r'^\[.*?\]\(.*?\)')
         
-        # Book mappings จาก migrate_tipitaka.py (ตัดแต่งเฉพาะที่จำเป็น)
-        self.book_mappings = {
-            # Vinayapiṭaka (vi)
-            '1V': {'abbrev': 'para', 'name': 'Pārājikapāḷi'},
-            '2V': {'abbrev': 'paci', 'name': 'Pācittiyapāḷi'},
-            '3V': {'abbrev': 'vi-maha', 'name': 'Mahāvaggapāḷi'},
-            '4V': {'abbrev': 'cula', 'name': 'Cūḷavaggapāḷi'},
-            '5V': {'abbrev': 'pari', 'name': 'Parivārapāḷi'},
-            
-            # Dīghanikāya (dn)
-            '6D': {'abbrev': 'sila', 'name': 'Sīlakkhandhavaggapāḷi'},
-            '7D': {'abbrev': 'dn-maha', 'name': 'Mahāvaggapāḷi'},
-            '8D': {'abbrev': 'pthi', 'name': 'Pāthikavaggapāḷi'},
-            
-            # Majjhimanikāya (mn)
-            '9M': {'abbrev': 'mula', 'name': 'Mūlapaṇṇāsapāḷi'},
-            '10M': {'abbrev': 'majj', 'name': 'Majjhimapaṇṇāsapāḷi'},
-            '11M': {'abbrev': 'upar', 'name': 'Uparipaṇṇāsapāḷi'},
-            
-            # Saṃyuttanikāya (sn)
-            '12S1': {'abbrev': 'saga', 'name': 'Sagāthāvaggasaṃyuttapāḷi'},
-            '12S2': {'abbrev': 'nida', 'name': 'Nidānavaggasaṃyuttapāḷi'},
-            '13S3': {'abbrev': 'khan', 'name': 'Khandhavaggasaṃyuttapāḷi'},
-            '13S4': {'abbrev': 'sala', 'name': 'Saḷāyatanavaggasaṃyuttapāḷi'},
-            '14S5': {'abbrev': 'sn-maha', 'name': 'Mahāvaggasaṃyuttapāḷi'},
-            
-            # Aṅguttaranikāya (an)
-            '15A1': {'abbrev': 'a1', 'name': 'Ekakanipātapāḷi'},
-            '15A2': {'abbrev': 'a2', 'name': 'Dukanipātapāḷi'},
-            '15A3': {'abbrev': 'a3', 'name': 'Tikanipātapāḷi'},
-            '15A4': {'abbrev': 'a4', 'name': 'Catukkanipātapāḷi'},
-            '16A5': {'abbrev': 'a5', 'name': 'Pañcakanipātapāḷi'},
-            '16A6': {'abbrev': 'a6', 'name': 'Chakkanipātapāḷi'},
-            '16A7': {'abbrev': 'a7', 'name': 'Sattakanipātapāḷi'},
-            '17A8': {'abbrev': 'a8', 'name': 'Aṭṭhakanipātapāḷi'},
-            '17A9': {'abbrev': 'a9', 'name': 'Navakanipātapāḷi'},
-            '17A10': {'abbrev': 'a10', 'name': 'Dasakanipātapāḷi'},
-            '17A11': {'abbrev': 'a11', 'name': 'Ekādasakanipātapāḷi'},
-            
-            # Khuddakanikāya (kn)
-            '18Kh': {'abbrev': 'kh', 'name': 'Khuddakapāṭhapāḷi'},
-            '18Dh': {'abbrev': 'dh', 'name': 'Dhammapadapāḷi'},
-            '18Ud': {'abbrev': 'ud', 'name': 'Udānapāḷi'},
-            '18It': {'abbrev': 'it', 'name': 'Itivuttakapāḷi'},
-            '18Sn': {'abbrev': 'sn', 'name': 'Suttanipātapāḷi'},
-            '19Vv': {'abbrev': 'vv', 'name': 'Vimānavatthupāḷi'},
-            '19Pv': {'abbrev': 'pv', 'name': 'Petavatthupāḷi'},
-            '19Th1': {'abbrev': 'th1', 'name': 'Theragāthāpāḷi'},
-            '19Th2': {'abbrev': 'th2', 'name': 'Therīgāthāpāḷi'},
-            '20Ap1': {'abbrev': 'ap1', 'name': 'Therāpadānapāḷi'},
-            '20Ap2': {'abbrev': 'ap2', 'name': 'Therīapadānapāḷi'},
-            '21Bu': {'abbrev': 'bu', 'name': 'Buddhavaṃsapāḷi'},
-            '21Cp': {'abbrev': 'cp', 'name': 'Cariyāpiṭakapāḷi'},
-            '22J': {'abbrev': 'ja1', 'name': 'Jātakapāḷi 1'},
-            '23J': {'abbrev': 'ja2', 'name': 'Jātakapāḷi 2'},
-            '24Mn': {'abbrev': 'mn', 'name': 'Mahāniddesapāḷi'},
-            '25Cn': {'abbrev': 'cn', 'name': 'Cūḷaniddesapāḷi'},
-            '26Ps': {'abbrev': 'ps', 'name': 'Paṭisambhidāmaggapāḷi'},
-            '27Ne': {'abbrev': 'ne', 'name': 'Nettipāḷi'},
-            '27Pe': {'abbrev': 'pe', 'name': 'Peṭakopadesapāḷi'},
-            '28Mi': {'abbrev': 'mi', 'name': 'Milindapañhapāḷi'},
-            
-            # Abhidhammapiṭaka (ab)
-            '29Dhs': {'abbrev': 'dhs', 'name': 'Dhammasaṅgaṇīpāḷi'},
-            '30Vbh': {'abbrev': 'vbh', 'name': 'Vibhaṅgapāḷi'},
-            '31Dht': {'abbrev': 'dht', 'name': 'Dhātukathāpāḷi'},
-            '31Pu': {'abbrev': 'pu', 'name': 'Puggalapaññattipāḷi'},
-            '32Kv': {'abbrev': 'kv', 'name': 'Kathāvatthupāḷi'},
-            
-            # Yamaka (ab/yk)
-            '33Y1': {'abbrev': 'y1', 'name': 'Mūlayamakapāḷi'},
-            '33Y2': {'abbrev': 'y2', 'name': 'Khandhayamakapāḷi'},
-            '33Y3': {'abbrev': 'y3', 'name': 'Āyatanayamakapāḷi'},
-            '33Y4': {'abbrev': 'y4', 'name': 'Dhātuyamakapāḷi'},
-            '33Y5': {'abbrev': 'y5', 'name': 'Saccayamakapāḷi'},
-            '34Y6': {'abbrev': 'y6', 'name': 'Saṅkhārayamakapāḷi'},
-            '34Y7': {'abbrev': 'y7', 'name': 'Anusayayamakapāḷi'},
-            '34Y8': {'abbrev': 'y8', 'name': 'Cittayamakapāḷi'},
-            '35Y9': {'abbrev': 'y9', 'name': 'Dhammayamakapāḷi'},
-            '35Y10': {'abbrev': 'y10', 'name': 'Indriyayamakapāḷi'},
-            
-            # Paṭṭhāna (ab/pt) - Dhammānuloma
-            '36P1': {'abbrev': 'p1-1', 'name': 'Tikapaṭṭhānapāḷi 1'},
-            '37P1': {'abbrev': 'p1-2', 'name': 'Tikapaṭṭhānapāḷi 2'},
-            '38P2': {'abbrev': 'p2', 'name': 'Dukapaṭṭhānapāḷi'},
-            '39P3': {'abbrev': 'p3', 'name': 'Dukatikapaṭṭhānapāḷi'},
-            '39P4': {'abbrev': 'p4', 'name': 'Tikadukapaṭṭhānapāḷi'},
-            '39P5': {'abbrev': 'p5', 'name': 'Tikatikapaṭṭhānapāḷi'},
-            '39P6': {'abbrev': 'p6', 'name': 'Dukadukapaṭṭhānapāḷi'},
-            
-            # Paṭṭhāna - Dhammapaccanīya
-            '40P7': {'abbrev': 'p7', 'name': 'Tikapaṭṭhānapāḷi'},
-            '40P8': {'abbrev': 'p8', 'name': 'Dukapaṭṭhānapāḷi'},
-            '40P9': {'abbrev': 'p9', 'name': 'Dukatikapaṭṭhānapāḷi'},
-            '40P10': {'abbrev': 'p10', 'name': 'Tikadukapaṭṭhānapāḷi'},
-            '40P11': {'abbrev': 'p11', 'name': 'Tikatikapaṭṭhānapāḷi'},
-            '40P12': {'abbrev': 'p12', 'name': 'Dukadukapaṭṭhānapāḷi'},
-            
-            # Paṭṭhāna - Dhammānulomapaccanīya
-            '40P13': {'abbrev': 'p13', 'name': 'Tikapaṭṭhānapāḷi'},
-            '40P14': {'abbrev': 'p14', 'name': 'Dukapaṭṭhānapāḷi'},
-            '40P15': {'abbrev': 'p15', 'name': 'Dukatikapaṭṭhānapāḷi'},
-            '40P16': {'abbrev': 'p16', 'name': 'Tikadukapaṭṭhānapāḷi'},
-            '40P17': {'abbrev': 'p17', 'name': 'Tikatikapaṭṭhānapāḷi'},
-            '40P18': {'abbrev': 'p18', 'name': 'Dukadukapaṭṭhānapāḷi'},
-            
-            # Paṭṭhāna - Dhammapaccanīyānuloma
-            '40P19': {'abbrev': 'p19', 'name': 'Tikapaṭṭhānapāḷi'},
-            '40P20': {'abbrev': 'p20', 'name': 'Dukapaṭṭhānapāḷi'},
-            '40P21': {'abbrev': 'p21', 'name': 'Dukatikapaṭṭhānapāḷi'},
-            '40P22': {'abbrev': 'p22', 'name': 'Tikadukapaṭṭhānapāḷi'},
-            '40P23': {'abbrev': 'p23', 'name': 'Tikatikapaṭṭhānapāḷi'},
-            '40P24': {'abbrev': 'p24', 'name': 'Dukadukapaṭṭhānapāḷi'},
-        }
+        # Book mappings จาก book_catalog.py (ชุดเดียวกับ migrate_tipitaka.py)
+        self.book_mappings = BOOK_MAPPINGS
     
     def convert_text_with_transliteration(self, text: str) -> str:
         """Convert text using aksharamukha transliteration with caching"""
@@ -225,6 +111,8 @@ class TipitakaTOCGenerator:
         if not config:
             return text  # Return unchanged if locale not supported
         
+        from aksharamukha import transliterate
+        
         try:
             # Protect markdown links and numbers from transliteration
             import re
@@ -567,13 +455,6 @@ class TipitakaTOCGenerator:
                 books.append(book_code)
         
         # เรียงตามลำดับ
-        def sort_key(book_code):
-            # แยกตัวเลขออกจากตัวอักษร
-            match = re.match(r'(\d+)([A-Z].*)$', book_code)
-            if match:
-                return (int(match.group(1)), match.group(2))
-            return (999, book_code)
-        
         books.sort(key=sort_key)
         return books
     
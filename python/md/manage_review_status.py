@@ -18,7 +18,6 @@ Usage:
 
 import os
 import re
-import yaml
 import argparse
 import sys
 from datetime import datetime
@@ -171,7 +170,8 @@ class ReviewStatusManager:
                 frontmatter_str = match.group(1)
                 body = match.group(2)
                 
-                # Parse YAML
+                # Parse YAML (imported here so --help and listing do not load it)
+                import yaml
                 frontmatter_data = yaml.safe_load(frontmatter_str)
                 if frontmatter_data is None:
                     frontmatter_data = {}
@@ -335,6 +335,7 @@ class ReviewStatusManager:
                 body = '\n'.join(lines)
             
             # สร้าง frontmatter ใหม่
+            import yaml
             frontmatter_yaml = yaml.dump(
                 frontmatter_data, 
                 default_flow_style=False, 
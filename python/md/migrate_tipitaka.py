@@ -15,14 +15,35 @@ import concurrent.futures
 import time
 import threading
 import hashlib
-import sqlite3
+import importlib.util
+import sys
 from collections import defaultdict
+from contextlib import closing
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional, Set
-from aksharamukha import transliterate
+from typing import Dict, Iterator, List, Tuple, Optional, Set
+from text_normalizer import NormalizationEngine, format_stats, merge_stats
+from book_catalog import (ALL_BOOKS, BOOK_MAPPINGS, BOOKS, BY_ABBREV, BY_REFERENCE, STRUCTURE, basket_of,
+                          books_in_section, code_for_path, index_link, output_name)
+from dependency_graph import DEFAULT_GRAPH_PATH, DependencyGraph, division_keys
+
+# Database helpers shared with python/db (connection profile)
+DB_DIR = Path(__file__).resolve().parent.parent / 'db'
+if str(DB_DIR) not in sys.path:
+    sys.path.append(str(DB_DIR))
+from sqlite_profile import connect_read_only
+from paragraph_map import ParagraphMapStore
+from query_cache import QueryCache, default_cache_path
+
+# aksharamukha is imported on the first conversion; this just checks it is installed
+TRANSLITERATION_AVAILABLE = importlib.util.find_spec('aksharamukha') is not None
 
 class TipitakaMigrator:
-    def __init__(self, source_dir: str, target_dir: str):
+    def __init__(self, source_dir: str, target_dir: str, template: Optional['TipitakaMigrator'] = None):
+        """
+        Args:
+            template: Preloaded migrator (see preload_worker_state) whose lookups,
+                page maps and transliteration cache are shared instead of rebuilt
+        """
         self.source_dir = Path(source_dir)
         self.target_dir = Path(target_dir)
         self.locales = ['romn', 'mymr', 'thai', 'sinh', 'deva', 'khmr', 'laoo', 'lana']
@@ -70,212 +91,55 @@ class TipitakaMigrator:
             'lana': {'from': 'IASTPali', 'to': 'TaiTham'}
         }
         
-        # Mapping book codes to directory abbreviations
-        self.book_mappings = {
-            # Vinayapiṭaka (vi)
-            # parent directory is 'tipitaka/vi'
-            '1V': {'abbrev': 'para', 'name': 'Pārājikapāḷi', 'references': ['1V', 'vi-para', 'para']},
-            '2V': {'abbrev': 'paci', 'name': 'Pācittiyapāḷi', 'references': ['2V', 'vi-paci', 'paci']},
-            '3V': {'abbrev': 'vi-maha', 'name': 'Mahāvaggapāḷi', 'references': ['3V', 'vi-maha', 'maha']},
-            '4V': {'abbrev': 'cula', 'name': 'Cūḷavaggapāḷi', 'references': ['4V', 'vi-cula', 'cula']},
-            '5V': {'abbrev': 'pari', 'name': 'Parivārapāḷi', 'references': ['5V', 'vi-pari', 'pari']},
-            
-            # Dīghanikāya (dn)
-            # parent directory is 'tipitaka/su/dn'
-            '6D': {'abbrev': 'sila', 'name': 'Sīlakkhandhavaggapāḷi', 'references': ['6D', 'dn-sila', 'sila']},
-            '7D': {'abbrev': 'dn-maha', 'name': 'Mahāvaggapāḷi', 'references': ['7D', 'dn-maha', 'maha']},
-            '8D': {'abbrev': 'pthi', 'name': 'Pāthikavaggapāḷi', 'references': ['8D', 'dn-pthi', 'pthi']},
-            
-            # Majjhimanikāya (mn)
-            # parent directory is 'tipitaka/su/mn'
-            '9M': {'abbrev': 'mula', 'name': 'Mūlapaṇṇāsapāḷi', 'references': ['9M', 'mn-mula', 'mula']},
-            '10M': {'abbrev': 'majj', 'name': 'Majjhimapaṇṇāsapāḷi', 'references': ['10M', 'mn-majj', 'majj']},
-            '11M': {'abbrev': 'upar', 'name': 'Uparipaṇṇāsapāḷi', 'references': ['11M', 'mn-upar', 'upar']},
-            
-            # Saṃyuttanikāya (sn)
-            # parent directory is 'tipitaka/su/sn'
-            '12S1': {'abbrev': 'saga', 'name': 'Sagāthāvaggasaṃyuttapāḷi', 'references': ['12S1', 'sn-saga', 'saga']},
-            '12S2': {'abbrev': 'nida', 'name': 'Nidānavaggasaṃyuttapāḷi', 'references': ['12S2', 'sn-nida', 'nida']},
-            '13S3': {'abbrev': 'khan', 'name': 'Khandhavaggasaṃyuttapāḷi', 'references': ['13S3', 'sn-khan', 'khan']},
-            '13S4': {'abbrev': 'sala', 'name': 'Saḷāyatanavaggasaṃyuttapāḷi', 'references': ['13S4', 'sn-sala', 'sala']},
-            '14S5': {'abbrev': 'sn-maha', 'name': 'Mahāvaggasaṃyuttapāḷi', 'references': ['14S5', 'sn-maha', 'maha']},
-            
-            # Aṅguttaranikāya (an)
-            # parent directory is 'tipitaka/su/an'
-            '15A1': {'abbrev': 'a1', 'name': 'Ekakanipātapāḷi', 'references': ['15A1', 'an-eka', 'a1']},
-            '15A2': {'abbrev': 'a2', 'name': 'Dukanipātapāḷi', 'references': ['15A2', 'an-duka', 'a2']},
-            '15A3': {'abbrev': 'a3', 'name': 'Tikanipātapāḷi', 'references': ['15A3', 'an-tika', 'a3']},
-            '15A4': {'abbrev': 'a4', 'name': 'Catukkanipātapāḷi', 'references': ['15A4', 'an-catu', 'a4']},
-            '16A5': {'abbrev': 'a5', 'name': 'Pañcakanipātapāḷi', 'references': ['16A5', 'an-panc', 'a5']},
-            '16A6': {'abbrev': 'a6', 'name': 'Chakkanipātapāḷi', 'references': ['16A6', 'an-chak', 'a6']},
-            '16A7': {'abbrev': 'a7', 'name': 'Sattakanipātapāḷi', 'references': ['16A7', 'an-satt', 'a7']},
-            '17A8': {'abbrev': 'a8', 'name': 'Aṭṭhakanipātapāḷi', 'references': ['17A8', 'an-atth', 'a8']},
-            '17A9': {'abbrev': 'a9', 'name': 'Navakanipātapāḷi', 'references': ['17A9', 'an-nava', 'a9']},
-            '17A10': {'abbrev': 'a10', 'name': 'Dasakanipātapāḷi', 'references': ['17A10', 'an-dasa', 'a10']},
-            '17A11': {'abbrev': 'a11', 'name': 'Ekādasakanipātapāḷi', 'references': ['17A11', 'an-ekad', 'a11']},
-            
-            # Khuddakanikāya (kn)
-            # parent directory is 'tipitaka/su/kn'
-            '18Kh': {'abbrev': 'kh', 'name': 'Khuddakapāṭhapāḷi', 'references': ['18Kh', 'kn-kh', 'kh']},
-            '18Dh': {'abbrev': 'dh', 'name': 'Dhammapadapāḷi', 'references': ['18Dh', 'kn-dh', 'dh']},
-            '18Ud': {'abbrev': 'ud', 'name': 'Udānapāḷi', 'references': ['18Ud', 'kn-ud', 'ud']},
-            '18It': {'abbrev': 'it', 'name': 'Itivuttakapāḷi', 'references': ['18It', 'kn-it', 'it']},
-            '18Sn': {'abbrev': 'sn', 'name': 'Suttanipātapāḷi', 'references': ['18Sn', 'kn-sn', 'sn']},
-            '19Vv': {'abbrev': 'vv', 'name': 'Vimānavatthupāḷi', 'references': ['19Vv', 'kn-vv', 'vv']},
-            '19Pv': {'abbrev': 'pv', 'name': 'Petavatthupāḷi', 'references': ['19Pv', 'kn-pv', 'pv']},
-            '19Th1': {'abbrev': 'th1', 'name': 'Theragāthāpāḷi', 'references': ['19Th1', 'kn-thrag', 'thrag']},
-            '19Th2': {'abbrev': 'th2', 'name': 'Therīgāthāpāḷi', 'references': ['19Th2', 'kn-thrig', 'thrig']},
-            '20Ap1': {'abbrev': 'ap1', 'name': 'Therāpadānapāḷi', 'references': ['20Ap1', 'kn-thraa', 'thraa']},
-            '20Ap2': {'abbrev': 'ap2', 'name': 'Therīapadānapāḷi', 'references': ['20Ap2', 'kn-thria', 'thria']},
-            '21Bu': {'abbrev': 'bu', 'name': 'Buddhavaṃsapāḷi', 'references': ['21Bu', 'kn-bu', 'bu']},
-            '21Cp': {'abbrev': 'cp', 'name': 'Cariyāpiṭakapāḷi', 'references': ['21Cp', 'kn-cp', 'cp']},
-            '22J': {'abbrev': 'ja1', 'name': 'Jātakapāḷi 1', 'references': ['22J', 'kn-ja-1', 'ja-1']},
-            '23J': {'abbrev': 'ja2', 'name': 'Jātakapāḷi 2', 'references': ['23J', 'kn-ja-2', 'ja-2']},
-            '24Mn': {'abbrev': 'mn', 'name': 'Mahāniddesapāḷi', 'references': ['24Mn', 'kn-mn', 'mn']},
-            '25Cn': {'abbrev': 'cn', 'name': 'Cūḷaniddesapāḷi', 'references': ['25Cn', 'kn-cn', 'cn']},
-            '26Ps': {'abbrev': 'ps', 'name': 'Paṭisambhidāmaggapāḷi', 'references': ['26Ps', 'kn-ps', 'ps']},
-            '27Ne': {'abbrev': 'ne', 'name': 'Nettipāḷi', 'references': ['27Ne', 'kn-ne', 'ne']},
-            '27Pe': {'abbrev': 'pe', 'name': 'Peṭakopadesapāḷi', 'references': ['27Pe', 'kn-pe', 'pe']},
-            '28Mi': {'abbrev': 'mi', 'name': 'Milindapañhapāḷi', 'references': ['28Mi', 'kn-mi', 'mi']},
-            
-            # Abhidhammapiṭaka (ab)
-            # parent directory is 'tipitaka/ab'
-            '29Dhs': {'abbrev': 'dhs', 'name': 'Dhammasaṅgaṇīpāḷi', 'references': ['29Dhs', 'ab-dhs', 'dhs']},
-            '30Vbh': {'abbrev': 'vbh', 'name': 'Vibhaṅgapāḷi', 'references': ['30Vbh', 'ab-vbh', 'vbh']},
-            '31Dht': {'abbrev': 'dht', 'name': 'Dhātukathāpāḷi', 'references': ['31Dht', 'ab-dht', 'dht']},
-            '31Pu': {'abbrev': 'pu', 'name': 'Puggalapaññattipāḷi', 'references': ['31Pu', 'ab-pu', 'pu']},
-            '32Kv': {'abbrev': 'kv', 'name': 'Kathāvatthupāḷi', 'references': ['32Kv', 'ab-kv', 'kv']},
-            
-            # Yamaka (ab/yk)
-            # parent directory is 'tipitaka/ab/yk'
-            '33Y1': {'abbrev': 'y1', 'name': 'Mūlayamakapāḷi', 'references': ['33Y1', 'y1']},
-            '33Y2': {'abbrev': 'y2', 'name': 'Khandhayamakapāḷi', 'references': ['33Y2', 'y2']},
-            '33Y3': {'abbrev': 'y3', 'name': 'Āyatanayamakapāḷi', 'references': ['33Y3', 'y3']},
-            '33Y4': {'abbrev': 'y4', 'name': 'Dhātuyamakapāḷi', 'references': ['33Y4', 'y4']},
-            '33Y5': {'abbrev': 'y5', 'name': 'Saccayamakapāḷi', 'references': ['33Y5', 'y5']},
-            '34Y6': {'abbrev': 'y6', 'name': 'Saṅkhārayamakapāḷi', 'references': ['34Y6', 'y6']},
-            '34Y7': {'abbrev': 'y7', 'name': 'Anusayayamakapāḷi', 'references': ['34Y7', 'y7']},
-            '34Y8': {'abbrev': 'y8', 'name': 'Cittayamakapāḷi', 'references': ['34Y8', 'y8']},
-            '35Y9': {'abbrev': 'y9', 'name': 'Dhammayamakapāḷi', 'references': ['35Y9', 'y9']},
-            '35Y10': {'abbrev': 'y10', 'name': 'Indriyayamakapāḷi', 'references': ['35Y10', 'y10']},
-            
-            # Paṭṭhāna (ab/pt) - Dhammānuloma
-            # parent directory is 'tipitaka/ab/pt/anu'
-            '36P1': {'abbrev': 'p1-1', 'name': 'Tikapaṭṭhānapāḷi 1', 'references': ['36P1', 'pt-anu-tika-1', 'p1.1']},
-            '37P1': {'abbrev': 'p1-2', 'name': 'Tikapaṭṭhānapāḷi 2', 'references': ['37P1', 'pt-anu-tika-2', 'p1.2']},
-            '38P2': {'abbrev': 'p2', 'name': 'Dukapaṭṭhānapāḷi', 'references': ['38P2', 'pt-anu-duka', 'p2']},
-            '39P3': {'abbrev': 'p3', 'name': 'Dukatikapaṭṭhānapāḷi', 'references': ['39P3', 'pt-anu-dukatika', 'p3']},
-            '39P4': {'abbrev': 'p4', 'name': 'Tikadukapaṭṭhānapāḷi', 'references': ['39P4', 'pt-anu-tikaduka', 'p4']},
-            '39P5': {'abbrev': 'p5', 'name': 'Tikatikapaṭṭhānapāḷi', 'references': ['39P5', 'pt-anu-tikatika', 'p5']},
-            '39P6': {'abbrev': 'p6', 'name': 'Dukadukapaṭṭhānapāḷi', 'references': ['39P6', 'pt-anu-dukaduka', 'p6']},
-            
-            # Paṭṭhāna - Dhammapaccanīya
-            # parent directory is 'tipitaka/ab/pt/pac'
-            '40P7': {'abbrev': 'p7', 'name': 'Tikapaṭṭhānapāḷi', 'references': ['40P7', 'pt-pac-tika', 'p7']},
-            '40P8': {'abbrev': 'p8', 'name': 'Dukapaṭṭhānapāḷi', 'references': ['40P8', 'pt-pac-duka', 'p8']},
-            '40P9': {'abbrev': 'p9', 'name': 'Dukatikapaṭṭhānapāḷi', 'references': ['40P9', 'pt-pac-dukatika', 'p9']},
-            '40P10': {'abbrev': 'p10', 'name': 'Tikadukapaṭṭhānapāḷi', 'references': ['40P10', 'pt-pac-tikaduka', 'p10']},
-            '40P11': {'abbrev': 'p11', 'name': 'Tikatikapaṭṭhānapāḷi', 'references': ['40P11', 'pt-pac-tikatika', 'p11']},
-            '40P12': {'abbrev': 'p12', 'name': 'Dukadukapaṭṭhānapāḷi', 'references': ['40P12', 'pt-pac-dukaduka', 'p12']},
-            
-            # Paṭṭhāna - Dhammānulomapaccanīya
-            # parent directory is 'tipitaka/ab/pt/anupac'
-            '40P13': {'abbrev': 'p13', 'name': 'Tikapaṭṭhānapāḷi', 'references': ['40P13', 'pt-anupac-tika', 'p13']},
-            '40P14': {'abbrev': 'p14', 'name': 'Dukapaṭṭhānapāḷi', 'references': ['40P14', 'pt-anupac-duka', 'p14']},
-            '40P15': {'abbrev': 'p15', 'name': 'Dukatikapaṭṭhānapāḷi', 'references': ['40P15', 'pt-anupac-dukatika', 'p15']},
-            '40P16': {'abbrev': 'p16', 'name': 'Tikadukapaṭṭhānapāḷi', 'references': ['40P16', 'pt-anupac-tikaduka', 'p16']},
-            '40P17': {'abbrev': 'p17', 'name': 'Tikatikapaṭṭhānapāḷi', 'references': ['40P17', 'pt-anupac-tikatika', 'p17']},
-            '40P18': {'abbrev': 'p18', 'name': 'Dukadukapaṭṭhānapāḷi', 'references': ['40P18', 'pt-anupac-dukaduka', 'p18']},
-            
-            # Paṭṭhāna - Dhammapaccanīyānuloma
-            # parent directory is 'tipitaka/ab/pt/pacanu'
-            '40P19': {'abbrev': 'p19', 'name': 'Tikapaṭṭhānapāḷi', 'references': ['40P19', 'pt-pacanu-tika', 'p19']},
-            '40P20': {'abbrev': 'p20', 'name': 'Dukapaṭṭhānapāḷi', 'references': ['40P20', 'pt-pacanu-duka', 'p20']},
-            '40P21': {'abbrev': 'p21', 'name': 'Dukatikapaṭṭhānapāḷi', 'references': ['40P21', 'pt-pacanu-dukatika', 'p21']},
-            '40P22': {'abbrev': 'p22', 'name': 'Tikadukapaṭṭhānapāḷi', 'references': ['40P22', 'pt-pacanu-tikaduka', 'p22']},
-            '40P23': {'abbrev': 'p23', 'name': 'Tikatikapaṭṭhānapāḷi', 'references': ['40P23', 'pt-pacanu-tikatika', 'p23']},
-            '40P24': {'abbrev': 'p24', 'name': 'Dukadukapaṭṭhānapāḷi', 'references': ['40P24', 'pt-pacanu-dukaduka', 'p24']},
-        }
-        
-        # Hierarchical structure mapping
-        self.structure = {
-            'tipitaka': {
-                'vi': {  # Vinayapiṭaka
-                    'books': ['1V', '2V', '3V', '4V', '5V']
-                },
-                'su': {  # Suttantapiṭaka
-                    'dn': {  # Dīghanikāya
-                        'books': ['6D', '7D', '8D']
-                    },
-                    'mn': {  # Majjhimanikāya
-                        'books': ['9M', '10M', '11M']
-                    },
-                    'sn': {  # Saṃyuttanikāya
-                        'books': ['12S1', '12S2', '13S3', '13S4', '14S5']
-                    },
-                    'an': {  # Aṅguttaranikāya
-                        'books': ['15A1', '15A2', '15A3', '15A4', '16A5', '16A6', '16A7', '17A8', '17A9', '17A10', '17A11']
-                    },
-                    'kn': {  # Khuddakanikāya
-                        'books': ['18Kh', '18Dh', '18Ud', '18It', '18Sn', '19Vv', '19Pv', '19Th1', '19Th2', 
-                                 '20Ap1', '20Ap2', '21Bu', '21Cp', '22J', '23J', '24Mn', '25Cn', '26Ps', '27Ne', '27Pe', '28Mi']
-                    }
-                },
-                'ab': {  # Abhidhammapiṭaka
-                    'books': ['29Dhs', '30Vbh', '31Dht', '31Pu', '32Kv'],
-                    'yk': {  # Yamaka
-                        'books': ['33Y1', '33Y2', '33Y3', '33Y4', '33Y5', '34Y6', '34Y7', '34Y8', '35Y9', '35Y10']
-                    },
-                    'pt': {  # Paṭṭhāna
-                        'anu': {  # Dhammānuloma
-                            'books': ['36P1', '37P1', '38P2', '39P3', '39P4', '39P5', '39P6']
-                        },
-                        'pac': {  # Dhammapaccanīya
-                            'books': ['40P7', '40P8', '40P9', '40P10', '40P11', '40P12']
-                        },
-                        'anupac': {  # Dhammānulomapaccanīya
-                            'books': ['40P13', '40P14', '40P15', '40P16', '40P17', '40P18']
-                        },
-                        'pacanu': {  # Dhammapaccanīyānuloma
-                            'books': ['40P19', '40P20', '40P21', '40P22', '40P23', '40P24']
-                        }
-                    }
-                }
-            }
-        }
+        # Book tables and derived lookups come from the shared catalog (book_catalog.py)
+        self.book_mappings = BOOK_MAPPINGS
+        self.structure = STRUCTURE
         
         # Precompute abbreviation lookups and prepare page mapping structures
-        self._abbrev_to_book_code = {
-            info['abbrev']: code for code, info in self.book_mappings.items()
-        }
+        self._abbrev_to_book_code = dict(BY_ABBREV)
         self._book_number_cache = {
-            abbrev: self._extract_book_number(code)
-            for abbrev, code in self._abbrev_to_book_code.items()
+            book.abbrev: str(book.volume) for book in BOOKS.values()
         }
-        self._book_reference_lookup = {}
-        for code, info in self.book_mappings.items():
-            references = set(info.get('references', []))
-            references.add(info.get('abbrev', ''))
-            references.add(code)
-            for ref in references:
-                normalized = (ref or '').strip().lower()
-                if normalized:
-                    self._book_reference_lookup[normalized] = code
+        self._book_reference_lookup = BY_REFERENCE
         self._book_prefix_slugs: Set[str] = set()
-        for code, info in self.book_mappings.items():
-            candidates = {code, info.get('abbrev', '')}
-            candidates.update(info.get('references', []) or [])
-            for candidate in candidates:
-                slug = self._slugify_link_segment(candidate)
-                if slug:
-                    self._book_prefix_slugs.add(slug)
+        if template is not None:
+            self._book_prefix_slugs = template._book_prefix_slugs
+        else:
+            for code, info in self.book_mappings.items():
+                candidates = {code, info.get('abbrev', '')}
+                candidates.update(info.get('references', []) or [])
+                for candidate in candidates:
+                    slug = self._slugify_link_segment(candidate)
+                    if slug:
+                        self._book_prefix_slugs.add(slug)
+        self.normalizer = self._build_normalizer()
         self._division_page_map: Dict[str, Dict[str, List[int]]] = {}
         self._division_page_state: Dict[str, Dict[str, int]] = {}
         self._page_map_loaded = False
+        # Per-book exported maps (paragraph_map.py); None until probed, False if absent
+        self._paragraph_map_store = None
         self._page_map_lock = threading.RLock()
+        # Path-derived book id per target directory, and directories where it disagrees with the book code
+        self._resolved_book_ids: Dict[Path, str] = {}
+        self._book_id_mismatches: Dict[str, Tuple[str, str]] = {}
+        if template is not None:
+            # Inherited from the template process (fork): shared copy-on-write, never rebuilt
+            self._division_page_map = dict(template._division_page_map)
+            self._page_map_loaded = template._page_map_loaded
+            self._paragraph_map_store = template._paragraph_map_store
+            self._transliteration_cache = dict(template._transliteration_cache)
         
         self.sidebar_data = {}
         
+        # Written outputs per locale (relative to target_dir), kept only for shard manifests
+        self.record_outputs = False
+        self._written_outputs: Dict[str, List[str]] = defaultdict(list)
+        
+        # Inputs of every migrated output (dependency_graph.py); None = not recorded
+        self.dependency_graph: Optional[DependencyGraph] = None
+        # Directories whose order consulted a parent .md (natural sort failed) -> that parent
+        self._order_sources: Dict[Path, Path] = {}
+        
         # Performance configurations
         self.max_workers = min(32, (os.cpu_count() or 1) * 2)  # Optimal worker count
         self.chunk_size = 50  # Files to process in one chunk
@@ -309,32 +173,7 @@ class TipitakaMigrator:
     
     def filter_books_by_section(self, section: str) -> List[str]:
         """Get all books in a specific section (vi, su, ab)"""
-        books = []
-        
-        # Look inside tipitaka structure
-        if 'tipitaka' in self.structure:
-            tipitaka_structure = self.structure['tipitaka']
-            
-            if section in tipitaka_structure:
-                section_data = tipitaka_structure[section]
-                
-                if isinstance(section_data, dict):
-                    # If section has direct books
-                    if 'books' in section_data:
-                        books.extend(section_data['books'])
-                    
-                    # If section has subsections with books
-                    for sub_section, sub_data in section_data.items():
-                        if sub_section != 'books' and isinstance(sub_data, dict):
-                            if 'books' in sub_data:
-                                books.extend(sub_data['books'])
-                            else:
-                                # For nested structures like pt -> anu -> books
-                                for sub_sub_section, sub_sub_data in sub_data.items():
-                                    if isinstance(sub_sub_data, dict) and 'books' in sub_sub_data:
-                                        books.extend(sub_sub_data['books'])
-        
-        return books
+        return books_in_section(section)
     
     def should_process_book(self, book_code: str, target_books: Optional[List[str]] = None) -> bool:
         """Check if a book should be processed based on target_books filter"""
@@ -342,14 +181,6 @@ class TipitakaMigrator:
             return True
         return book_code in target_books
 
-    @staticmethod
-    def _extract_book_number(book_code: str) -> str:
-        """Extract the numeric volume prefix from a book code (e.g. 15A4 -> 15)"""
-        if not book_code:
-            return ''
-        match = re.match(r'(\d+)', book_code)
-        return match.group(1) if match else ''
-
     @staticmethod
     def _normalize_division_key(division_number: str) -> Optional[str]:
         """Normalize division identifiers to match numeric paragraph mapping keys"""
@@ -442,6 +273,131 @@ class TipitakaMigrator:
 
         return normalized_path + anchor
 
+    # Title-only list items such as "* Pārājikakaṇḍa" carry no content of their own
+    TITLE_LIST_PATTERN = r'[ \t]*\*[ \t]+[A-Za-zāīūēōṅñṭḍṇḷṃṅḍṭṇḷṃāīūēōĀĪŪĒŌ, ]+[ \t]*$'
+
+    # ...pe..., …pe… or . . . pe . . . followed by the rest of the run of
+    # characters such patterns are made of. Spacing is decided on the whole run
+    # so overlapping patterns behave like the original sequential passes.
+    # Whitespace never crosses a line break.
+    PE_PATTERN = (r'(\.[^\S\n]*\.[^\S\n]*\.[^\S\n]*(?i:pe)[^\S\n]*\.[^\S\n]*\.[^\S\n]*\.'
+                  r'|…(?i:pe)…)((?:[.…pPeE]|[^\S\n])*)')
+
+    def _build_normalizer(self) -> NormalizationEngine:
+        """Register the source normalizations applied by _safe_read_file
+
+        Line rules drop whole lines; inline rules rewrite matches in place.
+        New normalizations should be registered here so they share the scan.
+        """
+        engine = NormalizationEngine()
+        engine.register(
+            'breadcrumb',
+            r'(?=[^\n]*\[Home\]\(/\))|(?=[^\n]*/)(?=(?:[^\[\n]*\[){2})(?=(?:[^\]\n]*\]){2})',
+            drop_line=True, description='Breadcrumb lines')
+        engine.register('navigation', r'\[Go to ', drop_line=True, description='Navigation lines')
+        engine.register('title_list', self.TITLE_LIST_PATTERN, drop_line=True,
+                        description='Title-only list items')
+        engine.register('internal_link', r'(\[.*?\]\()(.+?)(\))', self._internal_link_rule,
+                        first_chars=r'\[',
+                        description='Internal links (remove .md, lowercase, dots to dashes, book prefix)')
+        engine.register('number_range', r'(\d+)--(\d+)', self._number_range_rule,
+                        first_chars=r'\d', description='-- between numbers becomes –')
+        engine.register('pe_spacing', self.PE_PATTERN, self._pe_spacing_rule,
+                        first_chars='.…', description='Single space around ...pe...')
+        return engine
+
+    @staticmethod
+    def _number_range_rule(text: str, groups: tuple, context) -> str:
+        return f"{groups[0]}–{groups[1]}"
+
+    def _internal_link_rule(self, text: str, groups: tuple, context) -> str:
+        # Number ranges are normalized before the link target is slugified and
+        # ...pe... spacing after it, matching the order of the original passes
+        pre, link, post = (context.rewrite(part, ('number_range',)) for part in groups)
+        normalized_link = self._normalize_internal_link(link, context.params.get('current_slug', ''))
+        return context.rewrite(f"{pre}{normalized_link}{post}", ('pe_spacing',))
+
+    def _pe_spacing_rule(self, text: str, groups: tuple, context) -> str:
+        pattern, rest = groups
+        prev_char = context.prev_char
+        next_char = context.next_char
+        has_prev = bool(prev_char) and not prev_char.isspace()
+        has_next = bool(next_char) and not next_char.isspace()
+
+        if '.' not in rest and '…' not in rest:
+            # A single pattern: the rest of the run cannot start another one
+            following = rest[0] if rest else next_char
+            if has_prev:
+                pattern = ' ' + pattern
+            if following and not following.isspace():
+                pattern = pattern + ' '
+            return pattern + rest
+
+        # Several patterns in one run: reuse the sequential passes, with a
+        # placeholder standing in for a non-space neighbour
+        padded = ('\0' if has_prev else '') + text + ('\0' if has_next else '')
+        spaced = self._normalize_pe_spacing(padded)
+        return spaced[1 if has_prev else 0:len(spaced) - 1 if has_next else len(spaced)]
+
+    def _legacy_normalize_content(self, content: str, file_path: Path) -> str:
+        """Multi-pass normalization kept as the reference for verify_normalization"""
+        # 1. แปลง -- เป็น – สำหรับตัวเลข (normalize number ranges)
+        content = re.sub(r'(\d+)--(\d+)', r'\1–\2', content)
+
+        link_pattern = re.compile(r'(\[.*?\]\()(.+?)(\))')
+        title_list_pattern = re.compile('^' + self.TITLE_LIST_PATTERN)
+        current_slug = self._slugify_link_segment(file_path.stem)
+
+        def fix_link(match):
+            pre, link, post = match.groups()
+            return f"{pre}{self._normalize_internal_link(link, current_slug)}{post}"
+
+        cleaned_lines = []
+        for line in content.split('\n'):
+            if '[Home](/)' in line or ('/' in line and line.count('[') >= 2 and line.count(']') >= 2):
+                continue
+            if line.startswith('[Go to '):
+                continue
+            if title_list_pattern.match(line):
+                continue
+            line = link_pattern.sub(fix_link, line)
+            line = self._normalize_pe_spacing(line)
+            cleaned_lines.append(line)
+
+        return '\n'.join(cleaned_lines).strip()
+
+    def verify_normalization(self, target_books: Optional[List[str]] = None, max_reports: int = 20) -> int:
+        """Compare the single-pass normalizer with the legacy passes on the source corpus
+
+        Returns the number of files whose output differs.
+        """
+        books = target_books or self.get_available_books()
+        checked = 0
+        mismatches = 0
+        for book_code in books:
+            candidates = [self.source_dir / f"{book_code}.md"]
+            book_dir = self.source_dir / book_code
+            if book_dir.exists():
+                candidates.extend(sorted(book_dir.rglob('*.md')))
+            for source_file in candidates:
+                raw = self._read_raw_file(source_file)
+                if raw is None:
+                    continue
+                checked += 1
+                expected = self._legacy_normalize_content(raw, source_file)
+                actual = self.normalizer.apply(
+                    raw, current_slug=self._slugify_link_segment(source_file.stem)
+                ).strip()
+                if actual != expected:
+                    mismatches += 1
+                    if mismatches <= max_reports:
+                        print(f"Mismatch: {source_file}")
+
+        print(f"Verified {checked} files: {mismatches} mismatches")
+        for line in format_stats(self.normalizer.snapshot()):
+            print(f"   {line}")
+        return mismatches
+
     def _ensure_paragraph_page_map(self):
         """Load paragraph -> page mappings from SQLite once per process"""
         if self._page_map_loaded:
@@ -451,30 +407,37 @@ class TipitakaMigrator:
                 return
             page_map: Dict[str, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(list))
             try:
-                db_path = Path(__file__).resolve().parent.parent / 'db' / 'tipitaka_pali.db'
+                db_path = DB_DIR / 'tipitaka_pali.db'
                 if not db_path.exists():
                     self.logger.warning(f"Paragraph mapping database not found at {db_path}")
                     self._division_page_map = {}
                     self._page_map_loaded = True
                     return
-                with sqlite3.connect(db_path) as conn:
-                    cursor = conn.cursor()
-                    cursor.execute(
-                        """
-                        SELECT book_abbrv, paragraph_number, page_number
-                        FROM paragraphs
-                        WHERE book_abbrv IS NOT NULL
-                          AND paragraph_number IS NOT NULL
-                          AND page_number IS NOT NULL
-                        ORDER BY book_abbrv, page_number, paragraph_number, rowid
-                        """
-                    )
-                    for book_abbrv, paragraph_number, page_number in cursor.fetchall():
-                        book_abbrv = (book_abbrv or '').strip()
-                        if not book_abbrv:
-                            continue
-                        key = str(int(paragraph_number))
-                        page_map[book_abbrv][key].append(int(page_number))
+                sql = """
+                    SELECT book_abbrv, paragraph_number, page_number
+                    FROM paragraphs
+                    WHERE book_abbrv IS NOT NULL
+                      AND paragraph_number IS NOT NULL
+                      AND page_number IS NOT NULL
+                    ORDER BY book_abbrv, page_number, paragraph_number, rowid
+                    """
+                with closing(connect_read_only(db_path)) as conn:
+                    # Persisted between runs and invalidated when the database changes;
+                    # any cache failure falls back to querying the database directly
+                    query_cache = QueryCache(db_path, disk_path=default_cache_path(db_path))
+                    try:
+                        rows = query_cache.fetchall(conn.execute, sql)
+                    except Exception as e:
+                        self.logger.warning(f"Query cache failed ({e}); reading the paragraphs table directly")
+                        rows = conn.execute(sql).fetchall()
+                    finally:
+                        query_cache.close()
+                for book_abbrv, paragraph_number, page_number in rows:
+                    book_abbrv = (book_abbrv or '').strip()
+                    if not book_abbrv:
+                        continue
+                    key = str(int(paragraph_number))
+                    page_map[book_abbrv][key].append(int(page_number))
             except Exception as e:
                 self.logger.error(f"Failed to load paragraph-page mapping: {e}")
                 page_map = defaultdict(lambda: defaultdict(list))
@@ -485,11 +448,54 @@ class TipitakaMigrator:
             }
             self._page_map_loaded = True
 
+    def _get_book_page_map(self, book_abbrv: str) -> Optional[Dict[str, List[int]]]:
+        """Paragraph -> pages map of one book
+
+        Uses the exported per-book maps, so only the book being migrated is
+        loaded, when there is no database or they were exported from it;
+        otherwise the whole table is read from SQLite once.
+        """
+        with self._page_map_lock:
+            if self._paragraph_map_store is None:
+                try:
+                    self._paragraph_map_store = ParagraphMapStore()
+                    db_path = DB_DIR / 'tipitaka_pali.db'
+                    if db_path.exists() and not self._paragraph_map_store.matches(db_path):
+                        self.logger.info(f"Per-book paragraph maps were not exported from {db_path}; "
+                                         f"using the database (re-export with paragraph_map.py)")
+                        self._paragraph_map_store = False
+                except (FileNotFoundError, ValueError) as e:
+                    self.logger.info(f"Per-book paragraph maps unavailable ({e}); using the database")
+                    self._paragraph_map_store = False
+            if self._paragraph_map_store:
+                if book_abbrv not in self._division_page_map:
+                    book_map = self._paragraph_map_store.book(book_abbrv)
+                    self._division_page_map[book_abbrv] = book_map.division_map() if book_map else {}
+                return self._division_page_map[book_abbrv]
+        self._ensure_paragraph_page_map()
+        return self._division_page_map.get(book_abbrv)
+
+    def preload_worker_state(self, target_books: List[str], target_locales: List[str]) -> float:
+        """
+        Do the expensive per-process setup once, before locale workers are forked
+        
+        Loads the paragraph page maps of the target books and warms aksharamukha
+        for the target scripts. Returns the seconds spent.
+        """
+        started = time.time()
+        for book_code in target_books:
+            book_abbrev = self.book_mappings.get(book_code, {}).get('abbrev')
+            if book_abbrev:
+                self._get_book_page_map(book_abbrev)
+        for locale in target_locales:
+            if locale != 'romn':
+                self.convert_text_with_aksharamukha('Namo tassa bhagavato arahato sammāsambuddhassa', locale)
+        return time.time() - started
+
     def _reset_page_tracking(self, book_abbrv: str):
         """Reset sequential mapping state for the specified book abbreviation"""
         if not book_abbrv:
             return
-        self._ensure_paragraph_page_map()
         self._division_page_state[book_abbrv] = {}
 
     def _get_book_number(self, book_abbrv: str) -> str:
@@ -599,6 +605,9 @@ class TipitakaMigrator:
             else:
                 return None
 
+        # The order now depends on the parent's links, even if none of them match
+        # (adding one later reorders the directory)
+        self._order_sources[source_dir] = parent_md
         content = self._read_raw_file(parent_md)
         if content is None:
             return None
@@ -626,6 +635,7 @@ class TipitakaMigrator:
 
     def _sort_directory_entries(self, source_dir: Path, book_code: str) -> List[Path]:
         """Sort directory entries, falling back to parent content when necessary"""
+        self._order_sources.pop(source_dir, None)
         entries = list(source_dir.iterdir())
         if not entries:
             return []
@@ -646,11 +656,10 @@ class TipitakaMigrator:
         """Retrieve the next page reference for a division, consuming sequential duplicates"""
         if not book_abbrv or not division_number:
             return None
-        self._ensure_paragraph_page_map()
         division_key = self._normalize_division_key(division_number)
         if not division_key:
             return None
-        book_map = self._division_page_map.get(book_abbrv)
+        book_map = self._get_book_page_map(book_abbrv)
         if not book_map:
             return None
         pages = book_map.get(division_key)
@@ -676,51 +685,13 @@ class TipitakaMigrator:
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
             
-            # Cache the raw content
-            self._file_content_cache[cache_key] = content
-            
             # ========== ทำการ normalize ทั้งหมดตั้งแต่อ่านไฟล์ ==========
-            
-            # 1. แปลง -- เป็น – สำหรับตัวเลข (normalize number ranges)
-            content = re.sub(r'(\d+)--(\d+)', r'\1–\2', content)
-            
-            # 2. ทำการ clean content พื้นฐาน
-            lines = content.split('\n')
-            cleaned_lines = []
-            
-            # Pattern สำหรับตรวจสอบ
-            link_pattern = re.compile(r'(\[.*?\]\()(.+?)(\))')
-            title_list_pattern = re.compile(r'^[ \t]*\*[ \t]+[A-Za-zāīūēōṅñṭḍṇḷṃṅḍṭṇḷṃāīūēōĀĪŪĒŌ, ]+[ \t]*$')
-
+            # All normalization rules run in a single scan (see _build_normalizer)
             current_slug = self._slugify_link_segment(file_path.stem)
+            content = self.normalizer.apply(content, current_slug=current_slug).strip()
             
-            for line in lines:
-                # 3. Skip breadcrumb lines
-                if '[Home](/)' in line or ('/' in line and line.count('[') >= 2 and line.count(']') >= 2):
-                    continue
-                    
-                # 4. Skip navigation lines
-                if line.startswith('[Go to '):
-                    continue
-                    
-                # 5. Skip title-only list items
-                if title_list_pattern.match(line):
-                    continue
-                
-                # 6. Fix internal links (remove .md, lowercase, dots to dashes, remove book_code prefix)
-                def fix_link(match):
-                    pre, link, post = match.groups()
-                    normalized_link = self._normalize_internal_link(link, current_slug)
-                    return f"{pre}{normalized_link}{post}"
-                
-                line = link_pattern.sub(fix_link, line)
-                
-                # 7. Normalize PE spacing
-                line = self._normalize_pe_spacing(line)
-                
-                cleaned_lines.append(line)
-            
-            content = '\n'.join(cleaned_lines).strip()
+            # Cache the normalized content, so a cache hit returns what a fresh read would
+            self._file_content_cache[cache_key] = content
             
             return content
             
@@ -787,6 +758,9 @@ class TipitakaMigrator:
                         # Write file
                         with open(file_path, 'w', encoding='utf-8') as f:
                             f.write(content)
+                        
+                        if self.record_outputs:
+                            self._written_outputs[loc].append(file_path.relative_to(self.target_dir).as_posix())
                             
                     except Exception as e:
                         self.logger.error(f"Failed to write {file_path}: {e}")
@@ -946,6 +920,9 @@ class TipitakaMigrator:
         if not config:
             return text  # Preserve original behavior - return unchanged text
         
+        # aksharamukha is slow to import, so it is loaded on the first conversion
+        from aksharamukha import transliterate
+        
         try:
             # Extract and protect markdown links from transliteration
             import re
@@ -1118,6 +1095,12 @@ class TipitakaMigrator:
 
         tipitaka_index = path_parts.index('tipitaka')
 
+        # The full book path decides first: single segments are ambiguous
+        # (mn/mula has 'mn', which is also the reference of the KN book 24Mn)
+        code = code_for_path('/'.join(path_parts[tipitaka_index:]))
+        if code:
+            return code
+
         # Preserve previous fallback behaviour in case a match is still not found
         primary_candidate = ''
         if tipitaka_index + 2 < len(path_parts):
@@ -1150,6 +1133,22 @@ class TipitakaMigrator:
                 return match
 
         return primary_candidate
+
+    def _book_id_for_directory(self, book_code: str, target_dir: Path) -> str:
+        """
+        Book id for every file written to target_dir: the code of the book being migrated
+        
+        The path-derived id (extract_book_id_from_path) is computed once per
+        directory as a consistency check; disagreements are recorded.
+        """
+        if target_dir not in self._resolved_book_ids:
+            resolved = self.extract_book_id_from_path(target_dir)
+            with self._cache_lock:
+                self._resolved_book_ids[target_dir] = resolved
+                if resolved != book_code:
+                    self._book_id_mismatches[str(target_dir)] = (book_code, resolved)
+                    self.logger.warning(f"Book id from path {target_dir} is '{resolved}', expected {book_code}")
+        return book_code
     
     def is_verses_content(self, content: str) -> bool:
         """Check if content appears to be verses based on italic markdown formatting"""
@@ -1640,6 +1639,8 @@ import TableOfContents from '@components/TableOfContents.astro';"""
             book_abbreviation = self.book_mappings.get(book_code, {}).get('abbrev')
             if book_abbreviation:
                 self._reset_page_tracking(book_abbreviation)
+            if self.dependency_graph is not None:
+                self.dependency_graph.start_unit(book_code, locale)
             
             # Migrate the main .md file first
             main_file = self.source_dir / f"{book_code}.md"
@@ -1720,9 +1721,13 @@ import TableOfContents from '@components/TableOfContents.astro';"""
         
         results['end_time'] = time.time()
         results['total_time'] = results['end_time'] - results['start_time']
+        results['normalization'] = self.normalizer.snapshot()
+        results['book_id_mismatches'] = dict(self._book_id_mismatches)
         
         # Flush any remaining batch writes for this locale
         self._flush_batch_writes(locale)
+        if self.record_outputs:
+            results['outputs'] = sorted(self._written_outputs.get(locale, []))
         
         # Update progress stats
         with self._progress_lock:
@@ -1734,42 +1739,12 @@ import TableOfContents from '@components/TableOfContents.astro';"""
 
     def get_target_path(self, book_code: str, relative_path: str, locale: str = 'romn') -> Path:
         """Generate target path based on hierarchical structure"""
-        if book_code not in self.book_mappings:
-            return None
-            
-        book_abbrev = self.book_mappings[book_code]['abbrev']
-        
-        # Determine the hierarchical path
-        base_path = self.target_dir / locale
-        
-        # Find the book in the structure and build path
-        if book_code.endswith('V'):  # Vinayapiṭaka
-            target_path = base_path / 'tipitaka' / 'vi' / book_abbrev
-        elif book_code.endswith('D'):  # Dīghanikāya
-            target_path = base_path / 'tipitaka' / 'su' / 'dn' / book_abbrev
-        elif book_code.endswith('M'):  # Majjhimanikāya
-            target_path = base_path / 'tipitaka' / 'su' / 'mn' / book_abbrev
-        elif book_code.startswith(('12S', '13S', '14S')):  # Saṃyuttanikāya
-            target_path = base_path / 'tipitaka' / 'su' / 'sn' / book_abbrev
-        elif book_code.startswith(('15A', '16A', '17A')):  # Aṅguttaranikāya
-            target_path = base_path / 'tipitaka' / 'su' / 'an' / book_abbrev
-        elif book_code.startswith(('18', '19', '20', '21', '22', '23', '24', '25', '26', '27', '28')):  # Khuddakanikāya
-            target_path = base_path / 'tipitaka' / 'su' / 'kn' / book_abbrev
-        elif book_code in ['29Dhs', '30Vbh', '31Dht', '31Pu', '32Kv']:  # Abhidhammapiṭaka direct
-            target_path = base_path / 'tipitaka' / 'ab' / book_abbrev
-        elif book_code.startswith(('33Y', '34Y', '35Y')):  # Yamaka
-            target_path = base_path / 'tipitaka' / 'ab' / 'yk' / book_abbrev
-        elif book_code.startswith('36P') or book_code.startswith('37P') or book_code.startswith('38P') or book_code.startswith('39P'):  # Paṭṭhāna - Dhammānuloma
-            target_path = base_path / 'tipitaka' / 'ab' / 'pt' / 'anu' / book_abbrev
-        elif book_code.startswith('40P') and int(book_code[3:]) <= 12:  # Paṭṭhāna - Dhammapaccanīya
-            target_path = base_path / 'tipitaka' / 'ab' / 'pt' / 'pac' / book_abbrev
-        elif book_code.startswith('40P') and 13 <= int(book_code[3:]) <= 18:  # Paṭṭhāna - Dhammānulomapaccanīya
-            target_path = base_path / 'tipitaka' / 'ab' / 'pt' / 'anupac' / book_abbrev
-        elif book_code.startswith('40P') and int(book_code[3:]) >= 19:  # Paṭṭhāna - Dhammapaccanīyānuloma
-            target_path = base_path / 'tipitaka' / 'ab' / 'pt' / 'pacanu' / book_abbrev
-        else:
+        book = BOOKS.get(book_code)
+        if book is None:
             return None
-            
+        
+        target_path = self.target_dir / locale / book.path
+        
         # Add the relative path
         if relative_path and relative_path != '.':
             target_path = target_path / relative_path
@@ -1778,65 +1753,20 @@ import TableOfContents from '@components/TableOfContents.astro';"""
     
     def _get_basket_for_book(self, book_code: str) -> str:
         """Determine basket based on book code using the structure mapping"""
-        # Check Vinayapiṭaka
-        if book_code in self.structure['tipitaka']['vi']['books']:
-            return 'vi'
-        
-        # Check Suttantapiṭaka
-        for nikaya in self.structure['tipitaka']['su'].values():
-            if isinstance(nikaya, dict) and 'books' in nikaya:
-                if book_code in nikaya['books']:
-                    return 'su'
-        
-        # Check Abhidhammapiṭaka
-        if book_code in self.structure['tipitaka']['ab']['books']:
-            return 'ab'
-        
-        # Check Yamaka
-        if book_code in self.structure['tipitaka']['ab']['yk']['books']:
-            return 'ab'
-        
-        # Check Paṭṭhāna sections
-        for section in self.structure['tipitaka']['ab']['pt'].values():
-            if isinstance(section, dict) and 'books' in section:
-                if book_code in section['books']:
-                    return 'ab'
-        
-        return None
+        return basket_of(book_code)
     
     def get_book_index_link(self, book_code: str, locale: str = 'romn') -> str:
         """Get the link to the book's index.mdx"""
-        book_abbrev = self.book_mappings.get(book_code, {}).get('abbrev', book_code.lower())
-        
-        # Determine book link based on its category
-        if book_code.endswith('V'):  # Vinayapiṭaka
-            return f"/{locale}/tipitaka/vi/{book_abbrev}/"
-        elif book_code.endswith('D'):  # Dīghanikāya
-            return f"/{locale}/tipitaka/su/dn/{book_abbrev}/"
-        elif book_code.endswith('M'):  # Majjhimanikāya
-            return f"/{locale}/tipitaka/su/mn/{book_abbrev}/"
-        elif book_code.startswith(('12S', '13S', '14S')):  # Saṃyuttanikāya
-            return f"/{locale}/tipitaka/su/sn/{book_abbrev}/"
-        elif book_code.startswith(('15A', '16A', '17A')):  # Aṅguttaranikāya
-            return f"/{locale}/tipitaka/su/an/{book_abbrev}/"
-        elif book_code.startswith(('18', '19', '20', '21', '22', '23', '24', '25', '26', '27', '28')):  # Khuddakanikāya
-            return f"/{locale}/tipitaka/su/kn/{book_abbrev}/"
-        elif book_code in ['29Dhs', '30Vbh', '31Dht', '31Pu', '32Kv']:  # Abhidhammapiṭaka direct
-            return f"/{locale}/tipitaka/ab/{book_abbrev}/"
-        elif book_code.startswith(('33Y', '34Y', '35Y')):  # Yamaka
-            return f"/{locale}/tipitaka/ab/yk/{book_abbrev}/"
-        elif book_code.startswith(('36P', '37P', '38P', '39P')):  # Paṭṭhāna - Dhammānuloma
-            return f"/{locale}/tipitaka/ab/pt/anu/{book_abbrev}/"
-        elif book_code.startswith('40P'):
-            book_num = int(book_code[3:])
-            if book_num <= 12:  # Dhammapaccanīya
-                return f"/{locale}/tipitaka/ab/pt/pac/{book_abbrev}/"
-            elif 13 <= book_num <= 18:  # Dhammānulomapaccanīya
-                return f"/{locale}/tipitaka/ab/pt/anupac/{book_abbrev}/"
-            else:  # Dhammapaccanīyānuloma
-                return f"/{locale}/tipitaka/ab/pt/pacanu/{book_abbrev}/"
-        
-        return f"/{locale}/tipitaka/{book_abbrev}/"
+        return index_link(book_code, locale)
+    
+    def get_target_file(self, book_code: str, source_file: Path, relative_path: str = '', locale: str = 'romn') -> Optional[Path]:
+        """Output file for a source file: index.mdx for the main book file, otherwise <safe stem>.mdx"""
+        target_path = self.get_target_path(book_code, relative_path, locale)
+        if target_path is None:
+            return None
+        if not relative_path and source_file.name == f"{book_code}.md":
+            return target_path / "index.mdx"
+        return target_path / output_name(source_file.name)
     
     def migrate_file(self, source_file: Path, book_code: str, relative_path: str = '', locale: str = 'romn', sidebar_order: int = 1):
         """Migrate a single file with improved safety and MDX component conversion"""
@@ -1885,9 +1815,9 @@ import TableOfContents from '@components/TableOfContents.astro';"""
             
         # Create target file
         # If it's a main book file (e.g. 1V.md), name it index.mdx
-        if not relative_path and source_file.name == f"{book_code}.md":
-            target_file = target_path / "index.mdx"
-            
+        target_file = self.get_target_file(book_code, source_file, relative_path, locale)
+        is_main_file = not relative_path and source_file.name == f"{book_code}.md"
+        if is_main_file:
             # Check for 0.md file in the book directory and extract Namo formula
             namo_content = self.get_namo_formula(book_code, locale)
             if namo_content:
@@ -1896,15 +1826,9 @@ import TableOfContents from '@components/TableOfContents.astro';"""
                     cleaned_content = namo_content + "\n\n" + cleaned_content
                 else:
                     cleaned_content = namo_content
-                    
-        else:
-            # Replace dots with dashes in filenames และแปลง -- เป็น –
-            safe_stem = source_file.stem.lower().replace('.', '-')
-            safe_stem = re.sub(r'(\d+)--(\d+)', r'\1–\2', safe_stem)
-            target_file = target_path / f"{safe_stem}.mdx"
         
         # Convert to MDX with components if content has divisions/paragraphs
-        book_id = self.extract_book_id_from_path(target_file)
+        book_id = self._book_id_for_directory(book_code, target_path)
         component_imports = ""
         
         # Get book abbreviation for frontmatter
@@ -1917,6 +1841,11 @@ import TableOfContents from '@components/TableOfContents.astro';"""
         has_paragraphs = re.search(r'^\d+\\?\.\s+', cleaned_content, re.MULTILINE)
         has_toc, _, _ = self.detect_table_of_contents(cleaned_content)
         
+        # Division page state before this file, for the dependency graph
+        division_state = None
+        if self.dependency_graph is not None and book_abbreviation and self._get_book_page_map(book_abbreviation):
+            division_state = dict(self._division_page_state.get(book_abbreviation, {}))
+        
         if has_divisions or has_paragraphs or has_toc:
             component_imports, cleaned_content = self.convert_to_mdx_with_components(cleaned_content, book_abbreviation, title)
         
@@ -1947,11 +1876,39 @@ import TableOfContents from '@components/TableOfContents.astro';"""
         # Use batch file writing for better performance
         self._batch_write_file(target_file, final_content, locale)
         
+        if self.dependency_graph is not None:
+            self._record_dependencies(source_file, target_file, book_code, locale, is_main_file, content,
+                                      book_abbreviation, division_state)
+        
         # Update progress
         self._update_progress()
     
-    def migrate_directory(self, source_dir: Path, book_code: str, relative_path: str = '', locale: str = 'romn'):
-        """Recursively migrate a directory"""
+    def _record_dependencies(self, source_file: Path, target_file: Path, book_code: str, locale: str,
+                             is_main_file: bool, content: str, book_abbrv: Optional[str], division_state: Optional[dict]):
+        """Add an output and the inputs it was built from to the dependency graph"""
+        depends_on = {}
+        if is_main_file:
+            depends_on[f"{book_code}/0.md"] = 'namo'
+        else:
+            # Sidebar order: position in the directory listing, or in the parent's links
+            depends_on[source_file.parent.relative_to(self.source_dir).as_posix() + '/'] = 'order'
+            parent_md = self._order_sources.get(source_file.parent)
+            if parent_md is not None:
+                depends_on[parent_md.relative_to(self.source_dir).as_posix()] = 'order'
+        record = {
+            'source': source_file.relative_to(self.source_dir).as_posix(),
+            'output': target_file.relative_to(self.target_dir).as_posix(),
+            'depends_on': depends_on,
+        }
+        if division_state is not None:
+            state = self._division_page_state.get(book_abbrv, {})
+            record['divisions'] = {key: count - division_state.get(key, 0)
+                                   for key, count in state.items() if count != division_state.get(key, 0)}
+            record['source_divisions'] = division_keys(content)
+        self.dependency_graph.record(book_code, locale, record)
+    
+    def _directory_file_order(self, source_dir: Path, book_code: str, relative_path: str = '') -> Iterator[Tuple[Path, str, int]]:
+        """(source file, relative path, sidebar order) of a directory's .md files, recursively, in migration order"""
         if not source_dir.exists():
             return
             
@@ -1962,13 +1919,27 @@ import TableOfContents from '@components/TableOfContents.astro';"""
         # Process files in current directory
         for item in entries:
             if item.is_file() and item.suffix == '.md':
-                self.migrate_file(item, book_code, relative_path, locale, sidebar_order)
+                yield item, relative_path, sidebar_order
                 sidebar_order += 1
             elif item.is_dir():
                 # Recursively process subdirectories, replacing dots with dashes in dir names
                 safe_dir_name = item.name.lower().replace('.', '-')
                 new_relative_path = (relative_path + '/' if relative_path else '') + safe_dir_name
-                self.migrate_directory(item, book_code, new_relative_path, locale)
+                yield from self._directory_file_order(item, book_code, new_relative_path)
+    
+    def book_file_order(self, book_code: str) -> List[Tuple[Path, str, int]]:
+        """Every source file of a book as (source file, relative path, sidebar order), in migration order"""
+        files = []
+        main_file = self.source_dir / f"{book_code}.md"
+        if main_file.exists():
+            files.append((main_file, '', 1))
+        files.extend(self._directory_file_order(self.source_dir / book_code, book_code))
+        return files
+    
+    def migrate_directory(self, source_dir: Path, book_code: str, relative_path: str = '', locale: str = 'romn'):
+        """Recursively migrate a directory"""
+        for source_file, file_relative_path, sidebar_order in self._directory_file_order(source_dir, book_code, relative_path):
+            self.migrate_file(source_file, book_code, file_relative_path, locale, sidebar_order)
     
     def migrate_book(self, book_code: str, locale: str = 'romn', show_progress: bool = True):
         """Migrate a complete book"""
@@ -1981,6 +1952,8 @@ import TableOfContents from '@components/TableOfContents.astro';"""
             book_abbreviation = self.book_mappings[book_code].get('abbrev')
             if book_abbreviation:
                 self._reset_page_tracking(book_abbreviation)
+        if self.dependency_graph is not None:
+            self.dependency_graph.start_unit(book_code, locale)
             
         # Show progress if requested
         if show_progress:
@@ -2250,6 +2223,11 @@ import TableOfContents from '@components/TableOfContents.astro';"""
     
     def create_navigator_js(self):
         """Create navigator.js file for sidebar configuration"""
+        # The labels are transliterated into every script; rather than writing
+        # roman labels for all of them, keep the existing (tracked) file
+        if not TRANSLITERATION_AVAILABLE:
+            raise RuntimeError("aksharamukha is not installed; navigator.js was left unchanged")
+        
         # Generate single sidebar structure with translations
         sidebar_structure = self.generate_sidebar_structure()
         
@@ -2284,12 +2262,174 @@ export default sidebarConfig;
                 books.extend(self._collect_all_books(item))
         return books
     
-    def migrate_all(self, target_locales=None, target_books=None):
+    def _book_source_size(self, book_code: str) -> int:
+        """Bytes of Markdown source of a book (main file plus its directory)"""
+        size = 0
+        main_file = self.source_dir / f"{book_code}.md"
+        if main_file.exists():
+            size += main_file.stat().st_size
+        book_dir = self.source_dir / book_code
+        if book_dir.exists():
+            size += sum(path.stat().st_size for path in book_dir.rglob('*.md'))
+        return size
+
+    def plan_shards(self, books: List[str], locales: List[str], shard_count: int) -> List[List[Tuple[str, str]]]:
+        """Split (book, locale) units into shard_count slices of similar total size
+        
+        Units are weighted by the book's source size and assigned largest first
+        to the least-loaded shard (ties go to the lower shard). The result only
+        depends on the source tree, so every shard computes the same plan.
+        """
+        book_order = {code: index for index, code in enumerate(ALL_BOOKS)}
+        locale_order = {locale: index for index, locale in enumerate(self.locales)}
+        sizes = {book: self._book_source_size(book) for book in set(books)}
+        units = sorted(((book, locale) for book in set(books) for locale in set(locales)),
+                       key=lambda unit: (-sizes[unit[0]], book_order.get(unit[0], len(book_order)),
+                                         locale_order.get(unit[1], len(locale_order))))
+        loads = [0] * shard_count
+        plan: List[List[Tuple[str, str]]] = [[] for _ in range(shard_count)]
+        for unit in units:
+            shard = min(range(shard_count), key=lambda index: (loads[index], index))
+            plan[shard].append(unit)
+            # Empty books still cost a process some work
+            loads[shard] += max(sizes[unit[0]], 1)
+        for shard_units in plan:
+            shard_units.sort(key=lambda unit: (book_order.get(unit[0], len(book_order)),
+                                               locale_order.get(unit[1], len(locale_order))))
+        return plan
+
+    @staticmethod
+    def plan_digest(plan: List[List[Tuple[str, str]]]) -> str:
+        return hashlib.sha1(json.dumps(plan, separators=(',', ':')).encode('utf-8')).hexdigest()[:16]
+
+    def _write_shard_manifest(self, manifest_dir: Path, shard: Tuple[int, int], plan, all_results: list):
+        """Record what one shard migrated, for merge_shards"""
+        shard_index, shard_count = shard
+        manifest = {
+            'shard': shard_index,
+            'shard_count': shard_count,
+            'plan': self.plan_digest(plan),
+            'units': plan[shard_index - 1],
+            'target_dir': str(self.target_dir.resolve()),
+            'locales': {
+                r['locale']: {
+                    'successful': r['successful'],
+                    'failed': r['failed'],
+                    'errors': r['errors'],
+                    'outputs': r.get('outputs', []),
+                } for r in all_results
+            },
+            'dependencies': self._merge_dependencies(all_results).units,
+            'completed': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+        manifest_dir.mkdir(parents=True, exist_ok=True)
+        manifest_path = manifest_dir / f"shard-{shard_index}-of-{shard_count}.json"
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1)
+        print(f"📝 Shard manifest: {manifest_path}")
+
+    @staticmethod
+    def _merge_dependencies(all_results: list) -> DependencyGraph:
+        graph = DependencyGraph()
+        for r in all_results:
+            graph.update(r.get('dependencies', {}))
+        return graph
+
+    def _save_dependencies(self, graph: DependencyGraph, deps_file=None):
+        deps_path = Path(deps_file or DEFAULT_GRAPH_PATH)
+        try:
+            graph.save(deps_path)
+            outputs = sum(len(records) for records in graph.units.values())
+            print(f"🕸️  Dependency graph: {outputs:,} outputs in {len(graph.units)} book/locale units -> {deps_path}")
+        except (OSError, ValueError) as e:
+            print(f"❌ Error saving dependency graph: {e}")
+
+    def merge_shards(self, manifest_dir: Path, deps_file=None) -> bool:
+        """
+        Assemble the shard outputs into target_dir and write navigator.js once
+        
+        Checks that every shard of one plan finished without failures, copies
+        outputs of shards that migrated into another tree, and writes a merged
+        migration-manifest.json and dependency graph. Returns True when the
+        merged tree is complete and navigator.js was written.
+        """
+        manifests = []
+        for path in sorted(Path(manifest_dir).glob('shard-*-of-*.json')):
+            with open(path, 'r', encoding='utf-8') as f:
+                manifests.append(json.load(f))
+        if not manifests:
+            print(f"No shard manifests found in {manifest_dir}")
+            return False
+        
+        plans = {(m['shard_count'], m['plan']) for m in manifests}
+        if len(plans) > 1:
+            print(f"Error: manifests come from different shard plans: {sorted(plans)}")
+            return False
+        shard_count = manifests[0]['shard_count']
+        found = {m['shard'] for m in manifests}
+        missing = [index for index in range(1, shard_count + 1) if index not in found]
+        
+        target_root = self.target_dir.resolve()
+        copied = 0
+        outputs_per_locale: Dict[str, int] = defaultdict(int)
+        errors = []
+        for manifest in sorted(manifests, key=lambda m: m['shard']):
+            shard_root = Path(manifest['target_dir'])
+            for locale, result in manifest['locales'].items():
+                outputs_per_locale[locale] += len(result['outputs'])
+                errors.extend(f"shard {manifest['shard']} {locale} {error}" for error in result['errors'])
+                if shard_root == target_root:
+                    continue
+                for relative in result['outputs']:
+                    destination = target_root / relative
+                    destination.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copy2(shard_root / relative, destination)
+                    copied += 1
+        
+        graph = DependencyGraph()
+        for manifest in manifests:
+            graph.update(manifest.get('dependencies', {}))
+        self._save_dependencies(graph, deps_file)
+        merged = {
+            'shard_count': shard_count,
+            'plan': manifests[0]['plan'],
+            'missing_shards': missing,
+            'units': {f"{book}/{locale}": m['shard'] for m in manifests for book, locale in m['units']},
+            'outputs': dict(sorted(outputs_per_locale.items())),
+            'errors': errors,
+        }
+        with open(Path(manifest_dir) / 'migration-manifest.json', 'w', encoding='utf-8') as f:
+            json.dump(merged, f, ensure_ascii=False, indent=1)
+        
+        print(f"🧩 Merged {len(manifests)}/{shard_count} shards: {len(merged['units'])} book/locale units, "
+              f"{sum(outputs_per_locale.values()):,} outputs ({copied:,} copied into {target_root})")
+        if missing:
+            print(f"   ⚠️  Missing shards: {', '.join(map(str, missing))}")
+        for error in errors[:5]:
+            print(f"   ⚠️  {error}")
+        
+        # After the manifest and graph, so a failure here leaves them written
+        try:
+            print("\n📋 Creating navigator.js...")
+            self.create_navigator_js()
+            print("✅ Navigator.js created successfully")
+        except Exception as e:
+            print(f"❌ Error creating navigator.js: {e}")
+            return False
+        return not missing and not errors
+
+    def migrate_all(self, target_locales=None, target_books=None, shard=None, manifest_dir=None, deps_file=None):
         """Migrate all content for specified locales with improved error handling
         
         Args:
             target_locales: List of locale codes to migrate (default: all locales)
             target_books: List of book codes to migrate (default: all books)
+            shard: (index, count) with 1 <= index <= count: migrate only that slice
+                of the (book, locale) units (see plan_shards); navigator.js is left
+                to merge_shards
+            manifest_dir: Where a shard writes its manifest (default: python/md/shards)
+            deps_file: Dependency graph updated with the migrated units
+                (default: python/md/migration-deps.json); shards leave it to merge_shards
         """
         if target_locales is None:
             target_locales = self.locales
@@ -2348,6 +2488,21 @@ export default sidebarConfig;
         
         sorted_books = sorted(list(set(all_books)), key=sort_key)
         
+        # Books each locale worker migrates (a shard only gets its own units)
+        locale_books = {locale: sorted_books for locale in target_locales}
+        plan = None
+        if shard:
+            shard_index, shard_count = shard
+            plan = self.plan_shards(sorted_books, target_locales, shard_count)
+            units = set(plan[shard_index - 1])
+            locale_books = {
+                locale: [book for book in sorted_books if (book, locale) in units]
+                for locale in target_locales
+            }
+            locale_books = {locale: books for locale, books in locale_books.items() if books}
+            print(f"🔀 Shard {shard_index}/{shard_count}: {len(units)} of "
+                  f"{sum(len(units) for units in plan)} book/locale units")
+        
         # Start parallel migration
         start_time = time.time()
         
@@ -2358,16 +2513,28 @@ export default sidebarConfig;
         print(f"{'='*60}")
         
         # Use ProcessPoolExecutor for locales (true parallelism)
-        max_processes = min(len(target_locales), os.cpu_count() or 1)
+        max_processes = max(1, min(len(locale_books), os.cpu_count() or 1))
+        
+        # Where fork is available, workers start from this process with the heavy state preloaded
+        global _WORKER_TEMPLATE
+        mp_context = _worker_mp_context()
+        if mp_context is not None:
+            shard_books = [book for book in sorted_books if any(book in books for books in locale_books.values())]
+            preload_time = self.preload_worker_state(shard_books, list(locale_books))
+            _WORKER_TEMPLATE = self
+            print(f"🧰 Preloaded worker state in {preload_time:.2f}s (workers forked from it)")
         
         all_results = []
         
-        with concurrent.futures.ProcessPoolExecutor(max_workers=max_processes) as executor:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_processes, mp_context=mp_context,
+                                                    initializer=_init_locale_worker,
+                                                    initargs=(time.time(),)) as executor:
             # Submit locale processing tasks
             future_to_locale = {
                 executor.submit(migrate_locale_worker, str(self.source_dir), str(self.target_dir), 
-                               locale, sorted_books, self.locales, self.max_workers): locale 
-                for locale in target_locales
+                               locale, books, self.locales, self.max_workers, time.time(),
+                               shard is not None): locale 
+                for locale, books in locale_books.items()
             }
             
             # Process completed locales
@@ -2378,8 +2545,10 @@ export default sidebarConfig;
                     
                     # Print summary for this locale
                     locale = result['locale']
+                    queued = f", queued {result['queue_wait']:.1f}s" if result['queue_wait'] >= 0.05 else ''
                     print(f"✅ {locale}: {result['successful']}/{result['total_books']} books "
-                          f"({result['total_time']:.1f}s)")
+                          f"({result['total_time']:.1f}s, worker startup {result['startup_time']:.2f}s"
+                          f"{', preloaded' if result['preloaded'] else ''}{queued})")
                     
                     if result['errors']:
                         print(f"   ⚠️  {len(result['errors'])} errors:")
@@ -2391,14 +2560,23 @@ export default sidebarConfig;
                 except Exception as e:
                     locale = future_to_locale[future]
                     print(f"❌ {locale}: Process failed - {e}")
+        _WORKER_TEMPLATE = None
         
-        # Always try to create navigator.js
-        try:
-            print("\n📋 Creating navigator.js...")
-            self.create_navigator_js()
-            print("✅ Navigator.js created successfully")
-        except Exception as e:
-            print(f"❌ Error creating navigator.js: {e}")
+        if shard:
+            self._write_shard_manifest(Path(manifest_dir or DEFAULT_SHARD_MANIFEST_DIR), shard, plan, all_results)
+        else:
+            self._save_dependencies(self._merge_dependencies(all_results), deps_file)
+        
+        # Always try to create navigator.js (a sharded run leaves it to merge_shards)
+        if shard:
+            print("\n📋 navigator.js is written when the shards are merged (--merge-shards)")
+        else:
+            try:
+                print("\n📋 Creating navigator.js...")
+                self.create_navigator_js()
+                print("✅ Navigator.js created successfully")
+            except Exception as e:
+                print(f"❌ Error creating navigator.js: {e}")
         
         # Final summary
         total_time = time.time() - start_time
@@ -2419,17 +2597,91 @@ export default sidebarConfig;
             books_per_minute = (total_books_processed / total_time) * 60
             print(f"   • Processing rate: {books_per_minute:.1f} books/minute")
         
+        startup_times = [r['startup_time'] for r in all_results]
+        if startup_times:
+            print(f"   • Worker startup: avg {sum(startup_times) / len(startup_times):.2f}s, "
+                  f"max {max(startup_times):.2f}s")
+            queue_waits = [r['queue_wait'] for r in all_results]
+            if max(queue_waits) >= 0.05:
+                print(f"   • Waiting for a free worker: max {max(queue_waits):.1f}s "
+                      f"({sum(wait >= 0.05 for wait in queue_waits)} locales)")
+        
+        normalization_stats = merge_stats(r.get('normalization') for r in all_results)
+        if normalization_stats:
+            print(f"🧹 Normalization:")
+            for line in format_stats(normalization_stats):
+                print(f"   • {line}")
+        
+        mismatches = {}
+        for r in all_results:
+            mismatches.update(r.get('book_id_mismatches', {}))
+        if mismatches:
+            print(f"🔎 {len(mismatches)} directories resolve to a different book id than their book code:")
+            for directory, (book_code, resolved) in sorted(mismatches.items())[:5]:
+                print(f"   • {directory}: '{resolved}' (book {book_code})")
+            if len(mismatches) > 5:
+                print(f"   ... and {len(mismatches) - 5} more")
+        
         print(f"{'='*60}")
 
+# Shard manifests (--shard) and the merged manifest (--merge-shards)
+DEFAULT_SHARD_MANIFEST_DIR = Path(__file__).parent / 'shards'
+
+# Preloaded migrator inherited by forked locale workers (set by migrate_all)
+_WORKER_TEMPLATE: Optional[TipitakaMigrator] = None
+# Seconds from pool creation until this worker process was up; reported by its first task only
+_WORKER_BOOT_TIME = 0.0
+
+def _init_locale_worker(pool_created):
+    """Pool initializer: record how long the process took to start (fork/spawn and imports)"""
+    global _WORKER_BOOT_TIME
+    _WORKER_BOOT_TIME = max(0.0, time.time() - pool_created)
+
+def _worker_mp_context():
+    """fork context where the platform supports it, so workers inherit the preloaded template"""
+    if sys.platform != 'win32' and 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return None
+
 # Worker function for multiprocessing (must be at module level)
-def migrate_locale_worker(source_dir, target_dir, locale, target_books, available_locales, max_workers):
+def migrate_locale_worker(source_dir, target_dir, locale, target_books, available_locales, max_workers,
+                          submitted_at=None, record_outputs=False):
     """Worker function to migrate a locale - must be at module level for multiprocessing"""
-    # Create a new migrator instance for this process
-    migrator = TipitakaMigrator(str(source_dir), str(target_dir))
+    global _WORKER_BOOT_TIME
+    started = time.time()
+    boot_time, _WORKER_BOOT_TIME = _WORKER_BOOT_TIME, 0.0
+    # Create a new migrator instance for this process, sharing the template's state when forked from it
+    template = _WORKER_TEMPLATE
+    if template is not None and (template.source_dir, template.target_dir) != (Path(source_dir), Path(target_dir)):
+        template = None
+    migrator = TipitakaMigrator(str(source_dir), str(target_dir), template=template)
     migrator.max_workers = max_workers
+    migrator.record_outputs = record_outputs
+    migrator.dependency_graph = DependencyGraph()
+    
+    # Startup: starting this process (first task in it only) plus setting up the migrator;
+    # the rest of the time since submission was spent waiting for a free worker
+    startup_time = boot_time + time.time() - started
+    queue_wait = max(0.0, started - submitted_at - boot_time) if submitted_at else 0.0
     
     # Process this locale
-    return migrator.migrate_locale_parallel(locale, target_books, show_progress=True)
+    results = migrator.migrate_locale_parallel(locale, target_books, show_progress=True)
+    results['startup_time'] = startup_time
+    results['queue_wait'] = queue_wait
+    results['preloaded'] = template is not None
+    results['dependencies'] = migrator.dependency_graph.units
+    return results
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """'2/4' -> (2, 4)"""
+    import argparse
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected I/N, got '{value}'") from None
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"shard index must be between 1 and {count}")
+    return index, count
 
 def main():
     """Main function with improved argument parsing"""
@@ -2461,6 +2713,11 @@ Examples:
   python {sys.argv[0]} romn                   # Migrate romn locale (all books)
   python {sys.argv[0]} romn --book 1V         # Migrate romn locale, book 1V only
   python {sys.argv[0]} thai sinh              # Migrate thai and sinh locales (all books)
+  python {sys.argv[0]} --verify-normalization # Check normalized output against the legacy passes
+  python {sys.argv[0]} --shard 2/4            # Migrate the second of four slices of the book/locale units
+  python {sys.argv[0]} --merge-shards         # Assemble shard outputs and write navigator.js
+  python {sys.argv[0]} romn --book 1V --watch # Re-migrate changed files of 1V as they are saved
+  python {sys.argv[0]} --invalidated 1V/0.md  # List the outputs a source change invalidates
 
 Available locales: {', '.join(migrator.locales)}
 Available books: {', '.join(migrator.get_available_books())}
@@ -2475,8 +2732,48 @@ Available sections: {', '.join(migrator.get_available_sections())}
                           help='Comma-separated list of book codes to migrate (e.g., 1V,2V)')
         parser.add_argument('--section', 
                           help='Section to migrate: vi (Vinaya), su (Sutta), or ab (Abhidhamma)')
+        parser.add_argument('--verify-normalization', action='store_true',
+                          help='Compare the normalization engine against the legacy passes and exit')
+        parser.add_argument('--shard', type=parse_shard, metavar='I/N',
+                          help='Migrate only slice I of N (1-based) of the book/locale units, weighted by size')
+        parser.add_argument('--merge-shards', action='store_true',
+                          help='Merge shard outputs into the target directory, write navigator.js and exit')
+        parser.add_argument('--source-dir',
+                          help=f'Markdown source directory (default: {source_dir})')
+        parser.add_argument('--target-dir',
+                          help=f'Output directory (default: {target_dir})')
+        parser.add_argument('--manifest-dir', default=str(DEFAULT_SHARD_MANIFEST_DIR),
+                          help='Directory for shard manifests (default: python/md/shards)')
+        parser.add_argument('--watch', action='store_true',
+                          help='Keep running and re-migrate changed source files and their dependents')
+        parser.add_argument('--interval', type=float, default=1.0,
+                          help='Seconds between source polls in --watch mode (default: 1.0)')
+        parser.add_argument('--deps-file', default=str(DEFAULT_GRAPH_PATH),
+                          help='Dependency graph written by migrations (default: python/md/migration-deps.json)')
+        parser.add_argument('--invalidated', metavar='PATHS',
+                          help='Comma-separated changed source files: list the outputs they invalidate and exit')
         
         args = parser.parse_args()
+        if args.source_dir:
+            migrator.source_dir = Path(args.source_dir)
+        if args.target_dir:
+            migrator.target_dir = Path(args.target_dir)
+        
+        if args.merge_shards:
+            sys.exit(0 if migrator.merge_shards(Path(args.manifest_dir), args.deps_file) else 1)
+        
+        if args.invalidated:
+            graph = DependencyGraph.load(args.deps_file)
+            changed = []
+            for path in (Path(value.strip()) for value in args.invalidated.split(',') if value.strip()):
+                if path.is_absolute():
+                    path = path.relative_to(migrator.source_dir.resolve())
+                changed.append(path.as_posix())
+            invalid = graph.invalidated(changed, migrator.source_dir)
+            for output, reason in sorted(invalid.items()):
+                print(f"{reason:<10} {output}")
+            print(f"🕸️  {len(invalid)} outputs invalidated by {len(changed)} changed source(s)")
+            return
         
         # Process arguments
         target_locales = args.locales if args.locales else None
@@ -2492,6 +2789,10 @@ Available sections: {', '.join(migrator.get_available_sections())}
                 return
             target_books = migrator.filter_books_by_section(args.section)
         
+        if args.verify_normalization:
+            mismatches = migrator.verify_normalization(target_books)
+            sys.exit(1 if mismatches else 0)
+        
         # Validate locales if provided
         if target_locales:
             invalid_locales = [loc for loc in target_locales if loc not in migrator.locales]
@@ -2500,8 +2801,17 @@ Available sections: {', '.join(migrator.get_available_sections())}
                 print(f"Valid locales: {', '.join(migrator.locales)}")
                 return
         
+        if args.watch:
+            from migration_watch import MigrationWatcher
+            migrator.dependency_graph = DependencyGraph.load(args.deps_file)
+            MigrationWatcher(migrator, target_locales or migrator.locales,
+                             target_books or migrator.get_available_books(), args.interval,
+                             deps_file=args.deps_file).run()
+            return
+        
         # Run migration
-        migrator.migrate_all(target_locales, target_books)
+        migrator.migrate_all(target_locales, target_books, shard=args.shard, manifest_dir=args.manifest_dir,
+                             deps_file=args.deps_file)
         
     else:
         # Backward compatibility: old format (locales only)
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Watch mode for migrate_tipitaka.py
+Keeps one TipitakaMigrator warm (page maps, transliteration and file caches) and
+polls the source tree; each round re-renders only the outputs affected by the
+changed .md files, in every watched locale
+"""
+
+import time
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+from book_catalog import BOOKS
+from dependency_graph import unit_key
+
+# Source file -> (mtime_ns, size)
+Snapshot = Dict[Path, Tuple[int, int]]
+
+
+class MigrationWatcher:
+    """
+    Re-migrates changed source files and the outputs that depend on them
+
+    Besides the changed file itself, a round re-renders:
+    - the book's index.mdx when 0.md changed (Namo formula, see get_namo_formula)
+    - files whose relative path or sidebar order moved, e.g. after a parent .md
+      reordered its links (_order_entries_from_parent) or a sibling was added
+    - later files of the book whose division page state changed (the p= of a
+      division depends on every earlier division of the book, _division_page_state)
+    and deletes the outputs of removed files. When the migrator has a dependency
+    graph, it supplies the division order of the last migration and is kept up
+    to date (and saved to deps_file) after every round.
+    """
+
+    def __init__(self, migrator, locales: List[str], books: List[str], interval: float = 1.0, deps_file=None):
+        """
+        Args:
+            migrator (TipitakaMigrator): Migrator kept warm between rounds
+            locales (list): Locales re-rendered on every change
+            books (list): Book codes whose sources are watched
+            interval (float): Seconds between polls
+            deps_file (str): Where the updated dependency graph is saved (None = not saved)
+        """
+        self.migrator = migrator
+        self.locales = locales
+        self.books = [code for code in books if (migrator.source_dir / code).exists()]
+        self.interval = interval
+        self.deps_file = deps_file
+        self._snapshots: Dict[str, Snapshot] = {}
+        self._file_orders: Dict[str, List[Tuple[Path, str, int]]] = {}
+        # Division page state before and after each rendered (locale, source file), per book;
+        # only kept for books with a page map, taken from the dependency graph or filled
+        # by the first change in the book
+        self._state_before: Dict[str, Dict[Tuple[str, Path], dict]] = {}
+        self._state_after: Dict[str, Dict[Tuple[str, Path], dict]] = {}
+
+    def scan_book(self, book_code: str) -> Snapshot:
+        """(mtime_ns, size) of the main file and every .md file of a book"""
+        source_dir = self.migrator.source_dir
+        snapshot = {}
+        for path in [source_dir / f"{book_code}.md", *(source_dir / book_code).rglob('*.md')]:
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.is_file():
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def _outputs(self, book_code: str, file_order, locale: str) -> Set[Path]:
+        return {self.migrator.get_target_file(book_code, source_file, relative_path, locale)
+                for source_file, relative_path, _ in file_order}
+
+    def _tracks_pages(self, book_code: str) -> bool:
+        return bool(self.migrator._get_book_page_map(BOOKS[book_code].abbrev))
+
+    def refresh_book(self, book_code: str, changed: Set[Path], removed: Set[Path]) -> Tuple[int, int]:
+        """Re-render the outputs of one book affected by changed/removed sources; returns (rendered, deleted)"""
+        migrator = self.migrator
+        for path in changed | removed:
+            migrator._file_content_cache.pop(str(path), None)
+
+        old_order = self._file_orders.get(book_code, [])
+        file_order = migrator.book_file_order(book_code)
+        self._file_orders[book_code] = file_order
+
+        affected = set(changed)
+        if migrator.source_dir / book_code / '0.md' in changed | removed:
+            affected.add(migrator.source_dir / f"{book_code}.md")
+        old_positions = {source_file: (relative_path, order) for source_file, relative_path, order in old_order}
+        for source_file, relative_path, order in file_order:
+            if old_positions.get(source_file) != (relative_path, order):
+                affected.add(source_file)
+
+        abbrev = BOOKS[book_code].abbrev
+        tracks_pages = self._tracks_pages(book_code)
+        graph = migrator.dependency_graph
+        if tracks_pages and book_code not in self._state_before:
+            if graph is not None and all(unit_key(book_code, locale) in graph.units for locale in self.locales):
+                self._seed_division_states(book_code)
+            else:
+                print(f"   {book_code}: first change, re-rendering the whole book to record division order")
+                affected.update(source_file for source_file, _, _ in file_order)
+        before = self._state_before.setdefault(book_code, {})
+        after = self._state_after.setdefault(book_code, {})
+
+        rendered = deleted = 0
+        for locale in self.locales:
+            for stale in self._outputs(book_code, old_order, locale) - self._outputs(book_code, file_order, locale):
+                if stale.exists():
+                    stale.unlink()
+                    deleted += 1
+
+            state = {}
+            for source_file, relative_path, order in file_order:
+                key = (locale, source_file)
+                if source_file in affected or (tracks_pages and state != before.get(key)):
+                    migrator._division_page_state[abbrev] = dict(state)
+                    if tracks_pages:
+                        before[key] = dict(state)
+                    migrator.migrate_file(source_file, book_code, relative_path, locale, order)
+                    state = dict(migrator._division_page_state.get(abbrev, {}))
+                    if tracks_pages:
+                        after[key] = state
+                    rendered += 1
+                elif tracks_pages:
+                    state = after[key]
+            migrator._flush_batch_writes(locale)
+            if graph is not None:
+                graph.reorder_unit(book_code, locale, [source_file.relative_to(migrator.source_dir).as_posix()
+                                                       for source_file, _, _ in file_order])
+        return rendered, deleted
+
+    def _seed_division_states(self, book_code: str):
+        """Division page state around each file as of the migration recorded in the dependency graph"""
+        source_dir = self.migrator.source_dir
+        before = self._state_before.setdefault(book_code, {})
+        after = self._state_after.setdefault(book_code, {})
+        for locale in self.locales:
+            for source, (state_before, state_after) in self.migrator.dependency_graph.division_states(book_code, locale).items():
+                before[(locale, source_dir / source)] = state_before
+                after[(locale, source_dir / source)] = state_after
+
+    def poll(self) -> Dict[str, Tuple[int, int, int]]:
+        """One polling round; returns {book: (changed sources, rendered, deleted)} for books that changed"""
+        report = {}
+        for book_code in self.books:
+            snapshot = self.scan_book(book_code)
+            previous = self._snapshots.get(book_code, {})
+            self._snapshots[book_code] = snapshot
+            changed = {path for path, stamp in snapshot.items() if previous.get(path) != stamp}
+            removed = set(previous) - set(snapshot)
+            if changed or removed:
+                rendered, deleted = self.refresh_book(book_code, changed, removed)
+                report[book_code] = (len(changed) + len(removed), rendered, deleted)
+        if report and self.deps_file and self.migrator.dependency_graph is not None:
+            self.migrator.dependency_graph.save(self.deps_file)
+        return report
+
+    def start(self):
+        """Record the current state of the watched books without rendering anything"""
+        for book_code in self.books:
+            self._snapshots[book_code] = self.scan_book(book_code)
+            self._file_orders[book_code] = self.migrator.book_file_order(book_code)
+
+    def run(self):
+        """Poll until interrupted"""
+        preload_time = self.migrator.preload_worker_state(self.books, self.locales)
+        self.start()
+        sources = sum(len(snapshot) for snapshot in self._snapshots.values())
+        print(f"👀 Watching {sources} source files in {len(self.books)} books "
+              f"({len(self.locales)} locales, preload {preload_time:.2f}s); Ctrl+C to stop")
+        try:
+            while True:
+                time.sleep(self.interval)
+                started = time.time()
+                report = self.poll()
+                for book_code, (changed, rendered, deleted) in report.items():
+                    print(f"🔄 {book_code}: {changed} changed source(s) -> {rendered} output(s) rendered"
+                          + (f", {deleted} removed" if deleted else ''))
+                if report:
+                    print(f"   done in {time.time() - started:.2f}s")
+        except KeyboardInterrupt:
+            print("\n👋 Stopped watching")
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Per-book paragraph <-> page maps
+Exports the paragraphs table as one columnar, delta-encoded JSON file per book
+(keyed by book_abbrv) plus index.json, and loads a single book on demand with
+bisect lookups in both directions. Replaces page_paragraph_mapping.json.
+index.json records the fingerprint of the database the maps were exported
+from, so readers can tell when they no longer match it.
+"""
+
+import argparse
+import json
+import sys
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+DB_DIR = PROJECT_ROOT / 'python' / 'db'
+if str(DB_DIR) not in sys.path:
+    sys.path.append(str(DB_DIR))
+from sqlite_profile import connect_read_only
+from query_cache import database_fingerprint
+
+MAP_FORMAT = 1
+DEFAULT_MAP_DIR = PROJECT_ROOT / 'public' / 'paragraph-map'
+DEFAULT_DB_PATH = DB_DIR / 'tipitaka_pali.db'
+
+# Rows: (book_abbrv, book_id, page_number, paragraph_number)
+Row = Tuple[str, str, int, int]
+
+
+def delta_encode(values: List[int]) -> List[int]:
+    previous = 0
+    encoded = []
+    for value in values:
+        encoded.append(value - previous)
+        previous = value
+    return encoded
+
+
+def delta_decode(values: List[int]) -> List[int]:
+    total = 0
+    decoded = []
+    for value in values:
+        total += value
+        decoded.append(total)
+    return decoded
+
+
+def rows_from_db(db_path) -> Iterable[Row]:
+    """Rows from the paragraphs table, skipping incomplete ones like the migrator does"""
+    with closing(connect_read_only(db_path)) as conn:
+        cursor = conn.execute(
+            """
+            SELECT book_abbrv, book_id, page_number, paragraph_number
+            FROM paragraphs
+            WHERE book_abbrv IS NOT NULL
+              AND paragraph_number IS NOT NULL
+              AND page_number IS NOT NULL
+            ORDER BY rowid
+            """
+        )
+        for book_abbrv, book_id, page_number, paragraph_number in cursor:
+            yield book_abbrv, book_id, int(page_number), int(paragraph_number)
+
+
+def rows_from_json(json_path) -> Iterable[Row]:
+    """Rows from the legacy flat page_paragraph_mapping.json"""
+    with open(json_path, 'r', encoding='utf-8') as f:
+        for item in json.load(f):
+            if item.get('book_abbrv') is None or item.get('page_number') is None \
+                    or item.get('paragraph_number') is None:
+                continue
+            yield item['book_abbrv'], item.get('book_id'), int(item['page_number']), int(item['paragraph_number'])
+
+
+def export_paragraph_map(rows: Iterable[Row], output_dir=DEFAULT_MAP_DIR, source: Optional[str] = None) -> Dict[str, dict]:
+    """
+    Write one file per book_abbrv and index.json
+
+    Each file holds rows sorted by page then paragraph as two delta-encoded
+    columns; book ids are listed once, with a per-row index only when a book
+    spans several of them. source is the fingerprint of the database the rows
+    come from (None for the legacy JSON).
+    """
+    by_book: Dict[str, List[Tuple[int, int, str]]] = defaultdict(list)
+    for book_abbrv, book_id, page_number, paragraph_number in rows:
+        book_abbrv = (book_abbrv or '').strip()
+        if book_abbrv:
+            by_book[book_abbrv].append((page_number, paragraph_number, book_id or ''))
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    index = {}
+    for book_abbrv in sorted(by_book):
+        entries = sorted(by_book[book_abbrv], key=lambda entry: (entry[0], entry[1]))
+        book_ids = list(dict.fromkeys(entry[2] for entry in entries))
+        shard = {
+            'format': MAP_FORMAT,
+            'book': book_abbrv,
+            'book_ids': book_ids,
+            'page': delta_encode([entry[0] for entry in entries]),
+            'paragraph': delta_encode([entry[1] for entry in entries]),
+        }
+        if len(book_ids) > 1:
+            position = {book_id: i for i, book_id in enumerate(book_ids)}
+            shard['book_index'] = [position[entry[2]] for entry in entries]
+        with open(output_dir / f"{book_abbrv}.json", 'w', encoding='utf-8') as f:
+            json.dump(shard, f, ensure_ascii=False, separators=(',', ':'))
+        index[book_abbrv] = {
+            'book_ids': book_ids,
+            'rows': len(entries),
+            'first_page': entries[0][0],
+            'last_page': entries[-1][0],
+        }
+
+    with open(output_dir / 'index.json', 'w', encoding='utf-8') as f:
+        json.dump({'format': MAP_FORMAT, 'source': source, 'books': index}, f, ensure_ascii=False, indent=1)
+    return index
+
+
+class BookParagraphMap:
+    """Decoded map of one book with bisect lookups"""
+
+    def __init__(self, shard: dict):
+        self.book = shard['book']
+        self.book_ids = shard['book_ids']
+        self.pages = delta_decode(shard['page'])
+        self.paragraphs = delta_decode(shard['paragraph'])
+        # Secondary order by paragraph; the sort is stable so pages stay ascending
+        order = sorted(range(len(self.paragraphs)), key=self.paragraphs.__getitem__)
+        self._sorted_paragraphs = [self.paragraphs[i] for i in order]
+        self._pages_by_paragraph = [self.pages[i] for i in order]
+
+    def paragraphs_on_page(self, page: int) -> List[int]:
+        """Paragraph numbers on a page, in page order"""
+        start = bisect_left(self.pages, page)
+        end = bisect_right(self.pages, page, start)
+        return self.paragraphs[start:end]
+
+    def pages_for_paragraph(self, paragraph: int) -> List[int]:
+        """Pages a paragraph appears on, ascending (one entry per row)"""
+        start = bisect_left(self._sorted_paragraphs, paragraph)
+        end = bisect_right(self._sorted_paragraphs, paragraph, start)
+        return self._pages_by_paragraph[start:end]
+
+    def division_map(self) -> Dict[str, List[int]]:
+        """{str(paragraph): [pages]} as used by the migrator's division page tracking"""
+        result: Dict[str, List[int]] = {}
+        for paragraph, page in zip(self._sorted_paragraphs, self._pages_by_paragraph):
+            result.setdefault(str(paragraph), []).append(page)
+        return result
+
+
+class ParagraphMapStore:
+    """Loads book maps from an exported directory, one book at a time"""
+
+    def __init__(self, directory=DEFAULT_MAP_DIR):
+        self.directory = Path(directory)
+        index_path = self.directory / 'index.json'
+        if not index_path.exists():
+            raise FileNotFoundError(f"Paragraph map index not found: {index_path}")
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        self.books = index['books']
+        self.source = index.get('source')
+        self._loaded: Dict[str, BookParagraphMap] = {}
+
+    def matches(self, db_path) -> bool:
+        """Whether the maps were exported from this database"""
+        return self.source is not None and self.source == database_fingerprint(db_path, with_mtime=False)
+
+    def book(self, book_abbrv: str) -> Optional[BookParagraphMap]:
+        """Map for one book, or None if the book has no paragraphs"""
+        book_map = self._loaded.get(book_abbrv)
+        if book_map is None and book_abbrv in self.books:
+            with open(self.directory / f"{book_abbrv}.json", 'r', encoding='utf-8') as f:
+                book_map = BookParagraphMap(json.load(f))
+            self._loaded[book_abbrv] = book_map
+        return book_map
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export per-book paragraph/page maps.')
+    parser.add_argument('--db', help=f'SQLite database to read (default: {DEFAULT_DB_PATH})')
+    parser.add_argument('--from-json', help='Convert a legacy page_paragraph_mapping.json instead of reading the database')
+    parser.add_argument('--output', default=str(DEFAULT_MAP_DIR), help=f'Output directory (default: {DEFAULT_MAP_DIR})')
+    args = parser.parse_args()
+
+    if args.from_json:
+        rows, source = rows_from_json(args.from_json), None
+    else:
+        db_path = args.db or DEFAULT_DB_PATH
+        rows, source = rows_from_db(db_path), database_fingerprint(db_path, with_mtime=False)
+    index = export_paragraph_map(rows, args.output, source)
+    total = sum(book['rows'] for book in index.values())
+    print(f"Wrote {len(index)} books ({total:,} rows) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Single-pass text normalization engine
+Rules are registered once and compiled into one combined regular expression,
+so every normalization is applied during a single scan over the text
+"""
+
+import re
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Handler signature: (matched_text, groups, context) -> replacement
+RuleHandler = Callable[[str, Tuple[Optional[str], ...], 'NormalizationContext'], str]
+
+
+class NormalizationRule:
+    """A named normalization registered with a NormalizationEngine"""
+
+    def __init__(self, name: str, pattern: str, handler: Optional[RuleHandler] = None,
+                 drop_line: bool = False, first_chars: Optional[str] = None, description: str = ''):
+        if not drop_line and handler is None:
+            raise ValueError(f"Rule '{name}' needs a handler unless it drops lines")
+        self.name = name
+        self.pattern = pattern
+        self.handler = handler
+        self.drop_line = drop_line
+        # Character class body (e.g. r'\d.') every match starts with; lets the
+        # scanner skip positions where no rule can match
+        self.first_chars = '\\n' if drop_line else first_chars
+        self.description = description
+        # Validate the pattern up front and remember how many groups it owns
+        self.group_count = re.compile(pattern, re.MULTILINE).groups
+
+    def scanner_pattern(self) -> str:
+        """Pattern used inside the combined scanner"""
+        if self.drop_line:
+            # Line rules only need to match a prefix of the line; the engine
+            # consumes the rest of the line together with the newline before it
+            return rf'\n(?:{self.pattern})[^\n]*'
+        return self.pattern
+
+
+class NormalizationContext:
+    """State handed to rule handlers while a text is being scanned"""
+
+    __slots__ = ('engine', 'source', 'output', 'start', 'end', 'params')
+
+    def __init__(self, engine: 'NormalizationEngine', source: str, params: Dict):
+        self.engine = engine
+        self.source = source
+        self.output: List[str] = []
+        self.start = 0
+        self.end = 0
+        self.params = params
+
+    @property
+    def prev_char(self) -> str:
+        """Last character already emitted (after earlier rewrites); a text
+        behaves as if it were preceded by a newline"""
+        for chunk in reversed(self.output):
+            if chunk:
+                return chunk[-1]
+        return ''
+
+    @property
+    def next_char(self) -> str:
+        """Character following the current match in the source, or ''"""
+        return self.source[self.end] if self.end < len(self.source) else ''
+
+    def rewrite(self, text: str, rule_names: Iterable[str]) -> str:
+        """Apply a subset of rules to a fragment (e.g. inside a matched link)"""
+        return self.engine.apply(text, rule_names=tuple(rule_names), **self.params)
+
+
+class NormalizationEngine:
+    """Registry of normalization rules compiled into a single scanner"""
+
+    def __init__(self):
+        self._rules: List[NormalizationRule] = []
+        self._scanners: Dict[Optional[Tuple[str, ...]], Tuple[re.Pattern, Dict[int, Tuple[NormalizationRule, int]]]] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._scan_stats = {'texts': 0, 'chars': 0, 'seconds': 0.0}
+
+    @property
+    def rules(self) -> List[NormalizationRule]:
+        return list(self._rules)
+
+    def register(self, name: str, pattern: str, handler: Optional[RuleHandler] = None,
+                 drop_line: bool = False, first_chars: Optional[str] = None,
+                 description: str = '') -> NormalizationRule:
+        """Register a rule; line-dropping rules are always tried before inline rules"""
+        if any(rule.name == name for rule in self._rules):
+            raise ValueError(f"Normalization rule '{name}' is already registered")
+        rule = NormalizationRule(name, pattern, handler, drop_line, first_chars, description)
+        self._rules.append(rule)
+        self._stats[name] = {'hits': 0, 'seconds': 0.0}
+        self._scanners.clear()
+        return rule
+
+    def _get_scanner(self, rule_names: Optional[Tuple[str, ...]]):
+        scanner = self._scanners.get(rule_names)
+        if scanner is not None:
+            return scanner
+
+        if rule_names is None:
+            selected = self._rules
+        else:
+            unknown = set(rule_names) - {rule.name for rule in self._rules}
+            if unknown:
+                raise KeyError(f"Unknown normalization rule(s): {', '.join(sorted(unknown))}")
+            selected = [rule for rule in self._rules if rule.name in rule_names]
+        # Line rules must win at the start of a line, so they go first
+        ordered = [rule for rule in selected if rule.drop_line] + [rule for rule in selected if not rule.drop_line]
+
+        parts = []
+        lookup: Dict[int, Tuple[NormalizationRule, int]] = {}
+        group_index = 1
+        for rule in ordered:
+            parts.append(f'({rule.scanner_pattern()})')
+            lookup[group_index] = (rule, group_index)
+            group_index += 1 + rule.group_count
+
+        pattern = '|'.join(parts) if parts else r'(?!)'
+        if parts and all(rule.first_chars for rule in ordered):
+            # A cheap lookahead on the first character avoids trying every
+            # alternative at every position of the text
+            leading = ''.join(dict.fromkeys(rule.first_chars for rule in ordered))
+            pattern = f'(?=[{leading}])(?:{pattern})'
+        regex = re.compile(pattern, re.MULTILINE)
+        scanner = (regex, lookup)
+        self._scanners[rule_names] = scanner
+        return scanner
+
+    def apply(self, text: str, rule_names: Optional[Tuple[str, ...]] = None, **params) -> str:
+        """Normalize text in one scan; params are passed to handlers via the context"""
+        if not text:
+            return text
+
+        regex, lookup = self._get_scanner(rule_names)
+        # Line rules match from the newline before a line, so the text gets a
+        # leading newline that is removed again once the scan is done
+        text = '\n' + text
+        context = NormalizationContext(self, text, params)
+        output = context.output
+        stats = self._stats
+        position = 0
+        started = time.perf_counter()
+
+        for match in regex.finditer(text):
+            start, end = match.span()
+            if start > position:
+                output.append(text[position:start])
+            rule, group_index = lookup[match.lastindex]
+            rule_stats = stats[rule.name]
+            rule_stats['hits'] += 1
+            if rule.drop_line:
+                replacement = ''
+            else:
+                context.start, context.end = start, end
+                groups = match.groups()[group_index:group_index + rule.group_count]
+                handler_started = time.perf_counter()
+                replacement = rule.handler(match.group(group_index), groups, context)
+                rule_stats['seconds'] += time.perf_counter() - handler_started
+            output.append(replacement)
+            position = end
+
+        output.append(text[position:])
+        # Either the added newline survived, or a dropped first line took it
+        # and the newline of the next kept line now leads the output
+        result = ''.join(output)[1:]
+
+        if rule_names is None:
+            self._scan_stats['texts'] += 1
+            self._scan_stats['chars'] += len(text) - 1
+            self._scan_stats['seconds'] += time.perf_counter() - started
+        return result
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Return a picklable copy of the per-rule counters"""
+        snapshot = {name: dict(values) for name, values in self._stats.items()}
+        snapshot[SCAN_STATS_KEY] = dict(self._scan_stats)
+        return snapshot
+
+    def reset_stats(self):
+        for values in self._stats.values():
+            values['hits'] = 0
+            values['seconds'] = 0.0
+        self._scan_stats = {'texts': 0, 'chars': 0, 'seconds': 0.0}
+
+
+SCAN_STATS_KEY = '__scan__'
+
+
+def merge_stats(snapshots: Iterable[Dict[str, Dict[str, float]]]) -> Dict[str, Dict[str, float]]:
+    """Combine snapshots from several engines (e.g. one per worker process)"""
+    merged: Dict[str, Dict[str, float]] = {}
+    for snapshot in snapshots:
+        if not snapshot:
+            continue
+        for name, values in snapshot.items():
+            target = merged.setdefault(name, {})
+            for key, value in values.items():
+                target[key] = target.get(key, 0) + value
+    return merged
+
+
+def format_stats(stats: Dict[str, Dict[str, float]]) -> List[str]:
+    """Render merged statistics as report lines"""
+    lines = []
+    scan = stats.get(SCAN_STATS_KEY, {})
+    if scan:
+        lines.append(f"Scanned {int(scan.get('texts', 0)):,} texts "
+                     f"({int(scan.get('chars', 0)):,} chars) in {scan.get('seconds', 0.0):.2f}s")
+    for name, values in stats.items():
+        if name == SCAN_STATS_KEY:
+            continue
+        lines.append(f"{name:<16} {int(values.get('hits', 0)):>10,} hits  "
+                     f"{values.get('seconds', 0.0) * 1000:>10.1f} ms in handler")
+    return lines
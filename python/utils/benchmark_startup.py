@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for the Python command-line tools
+Runs each tool in a fresh interpreter (with --help, or just importing it when it
+has no argument parser) and reports the median wall time, plus the slowest
+imports from python -X importtime so dependencies loaded at startup stand out
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+PYTHON_DIR = Path(__file__).resolve().parent.parent
+
+# (script relative to python/, arguments); None = import the module only
+TOOLS = [
+    ('md/migrate_tipitaka.py', ['--help']),
+    ('md/generate_toc.py', ['--help']),
+    ('md/manage_review_status.py', ['--help']),
+    ('md/paragraph_map.py', ['--help']),
+    ('md/count_words.py', None),
+    ('db/build_tree.py', ['--help']),
+    ('db/api_server.py', ['--help']),
+    ('db/search_index.py', ['--help']),
+    ('db/dictionary_lookup.py', ['--help']),
+    ('db/page_compression.py', ['--help']),
+    ('db/optimize_db.py', ['--help']),
+    ('db/crossref.py', ['--help']),
+    ('db/benchmark_bulk_read.py', ['--help']),
+    ('utils/crop_image.py', None),
+    ('utils/generate_page_counts.py', None),
+]
+
+
+def _command(script: Path, args) -> List[str]:
+    if args is None:
+        return [sys.executable, '-c', f"import {script.stem}"]
+    return [sys.executable, str(script)] + args
+
+
+def time_startup(script: Path, args, repeat: int) -> Tuple[float, str]:
+    """Median seconds for one invocation, and the error output of a failed run"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = subprocess.run(_command(script, args), cwd=script.parent,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        timings.append(time.perf_counter() - started)
+        if result.returncode != 0:
+            lines = result.stderr.strip().splitlines()
+            return statistics.median(timings), lines[-1] if lines else f"exit code {result.returncode}"
+    return statistics.median(timings), ''
+
+
+def slowest_imports(script: Path, args, top: int) -> List[Tuple[float, str]]:
+    """(cumulative seconds, module) of the slowest top-level imports"""
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + _command(script, args)[1:],
+                            cwd=script.parent, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    imports = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|', 2)
+        if name.startswith('  ') or not cumulative.strip().isdigit():
+            continue  # nested import; counted in its parent's cumulative time
+        imports.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(imports, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure how long each Python tool takes to start.')
+    parser.add_argument('tools', nargs='*', help='Scripts relative to python/ (default: all known tools)')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per tool; the median is reported')
+    parser.add_argument('--imports', type=int, default=0, metavar='N',
+                        help='Also list the N slowest top-level imports of each tool')
+    args = parser.parse_args()
+
+    known = dict(TOOLS)
+    selected = [(tool, known.get(tool, ['--help'])) for tool in args.tools] if args.tools else TOOLS
+
+    print(f"Python {sys.version.split()[0]}, median of {args.repeat} runs")
+    baseline, _ = time_startup(PYTHON_DIR / 'utils' / 'benchmark_startup.py', ['--help'], args.repeat)
+    print(f"{'(interpreter + argparse)':<32} {baseline * 1000:8.1f} ms")
+    total = 0.0
+    for tool, tool_args in selected:
+        script = PYTHON_DIR / tool
+        if not script.exists():
+            print(f"{tool:<32} {'missing':>8}")
+            continue
+        elapsed, error = time_startup(script, tool_args, args.repeat)
+        total += elapsed
+        print(f"{tool:<32} {elapsed * 1000:8.1f} ms" + (f"   FAILED: {error}" if error else ''))
+        for seconds, module in slowest_imports(script, tool_args, args.imports) if args.imports else []:
+            print(f"    {seconds * 1000:8.1f} ms  {module}")
+    print(f"{'total':<32} {total * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,12 +17,10 @@ import sys
 import subprocess
 import math
 from pathlib import Path
-from PIL import Image, ImageFile
-import numpy as np
 from typing import List, Tuple, Optional
 
-# Enable loading of truncated images
-ImageFile.LOAD_TRUNCATED_IMAGES = True
+# Pillow, numpy, OpenCV and scikit-image are imported where they are used, so
+# --help and the package check in main() do not wait for (or require) them
 
 # Supported image formats
 SUPPORTED_FORMATS = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif', '.webp'}
@@ -74,6 +72,14 @@ def install_requirements():
                 return False
     return True
 
+def load_pil():
+    """Import Pillow on first use, allowing truncated images to load"""
+    from PIL import Image, ImageFile
+    
+    # Enable loading of truncated images
+    ImageFile.LOAD_TRUNCATED_IMAGES = True
+    return Image
+
 def mm_to_pixels(mm: float, dpi: int = 300) -> int:
     """
     Convert millimeters to pixels based on DPI.
@@ -88,7 +94,7 @@ def mm_to_pixels(mm: float, dpi: int = 300) -> int:
     inches = mm / 25.4  # 1 inch = 25.4 mm
     return int(inches * dpi)
 
-def get_image_dpi(image: Image.Image) -> Tuple[int, int]:
+def get_image_dpi(image: 'Image.Image') -> Tuple[int, int]:
     """
     Get DPI from image metadata, with fallback to 300 DPI.
     
@@ -115,6 +121,7 @@ def deskew_image_opencv(image_path: Path) -> bool:
     """
     try:
         import cv2
+        import numpy as np
         from deskew import determine_skew
         from skimage import io
         from skimage.color import rgb2gray
@@ -228,8 +235,11 @@ def deskew_image_pil(image_path: Path) -> bool:
         True if successful, False otherwise
     """
     try:
+        import numpy as np
         from deskew import determine_skew
         
+        Image = load_pil()
+        
         # Load image with PIL
         with Image.open(image_path) as img:
             # Convert to numpy for skew detection
@@ -302,6 +312,7 @@ def process_image(image_path: Path, target_size: Optional[Tuple[int, int]] = Non
         Tuple of (success, final_size)
     """
     try:
+        Image = load_pil()
         with Image.open(image_path) as img:
             # Get image DPI
             dpi_x, dpi_y = get_image_dpi(img)
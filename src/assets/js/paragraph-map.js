@@ -0,0 +1,115 @@
+// @ts-nocheck
+/**
+ * Per-book paragraph <-> page maps
+ * Loads /paragraph-map/<book>.json (written by python/md/paragraph_map.py) on demand
+ */
+
+class BookParagraphMap {
+    /**
+     * @param {{book: string, book_ids: Array<string>, page: Array<number>, paragraph: Array<number>}} shard
+     */
+    constructor(shard) {
+        /** @type {string} */
+        this.book = shard.book;
+
+        /** @type {Array<string>} */
+        this.bookIds = shard.book_ids;
+
+        /** @type {Array<number>} */
+        this.pages = BookParagraphMap.deltaDecode(shard.page); // Sorted by page, then paragraph
+
+        /** @type {Array<number>} */
+        this.paragraphs = BookParagraphMap.deltaDecode(shard.paragraph);
+
+        // Second order by paragraph; Array.prototype.sort is stable so pages stay ascending
+        const order = this.paragraphs.map((_, i) => i).sort((a, b) => this.paragraphs[a] - this.paragraphs[b]);
+        /** @type {Array<number>} */
+        this.sortedParagraphs = order.map(i => this.paragraphs[i]);
+        /** @type {Array<number>} */
+        this.pagesByParagraph = order.map(i => this.pages[i]);
+    }
+
+    /**
+     * @param {Array<number>} values
+     * @returns {Array<number>}
+     */
+    static deltaDecode(values) {
+        let total = 0;
+        return values.map(value => (total += value));
+    }
+
+    /**
+     * First index whose value is >= (or > when upper) target
+     * @param {Array<number>} values
+     * @param {number} target
+     * @param {boolean} upper
+     * @returns {number}
+     */
+    static bisect(values, target, upper = false) {
+        let low = 0;
+        let high = values.length;
+        while (low < high) {
+            const mid = (low + high) >> 1;
+            if (values[mid] < target || (upper && values[mid] === target)) {
+                low = mid + 1;
+            } else {
+                high = mid;
+            }
+        }
+        return low;
+    }
+
+    /**
+     * @param {number} page
+     * @returns {Array<number>} Paragraph numbers on the page
+     */
+    paragraphsOnPage(page) {
+        const start = BookParagraphMap.bisect(this.pages, page);
+        const end = BookParagraphMap.bisect(this.pages, page, true);
+        return this.paragraphs.slice(start, end);
+    }
+
+    /**
+     * @param {number} paragraph
+     * @returns {Array<number>} Pages the paragraph appears on, ascending
+     */
+    pagesForParagraph(paragraph) {
+        const start = BookParagraphMap.bisect(this.sortedParagraphs, paragraph);
+        const end = BookParagraphMap.bisect(this.sortedParagraphs, paragraph, true);
+        return this.pagesByParagraph.slice(start, end);
+    }
+}
+
+class ParagraphMapLoader {
+    /**
+     * @param {string} baseUrl
+     */
+    constructor(baseUrl = '/paragraph-map') {
+        /** @type {string} */
+        this.baseUrl = baseUrl;
+
+        /** @type {Map<string, Promise<BookParagraphMap|null>>} */
+        this.books = new Map(); // One request per book, shared by concurrent callers
+    }
+
+    /**
+     * @param {string} bookAbbrv
+     * @returns {Promise<BookParagraphMap|null>} null when the book has no map
+     */
+    load(bookAbbrv) {
+        if (!this.books.has(bookAbbrv)) {
+            const request = fetch(`${this.baseUrl}/${encodeURIComponent(bookAbbrv)}.json`)
+                .then(response => (response.ok ? response.json() : null))
+                .then(shard => (shard ? new BookParagraphMap(shard) : null))
+                .catch(error => {
+                    console.warn(`Paragraph map for ${bookAbbrv} could not be loaded:`, error);
+                    this.books.delete(bookAbbrv);
+                    return null;
+                });
+            this.books.set(bookAbbrv, request);
+        }
+        return this.books.get(bookAbbrv);
+    }
+}
+
+window.paragraphMaps = new ParagraphMapLoader();